@@ -0,0 +1,199 @@
+"""
+Assessment HTTP API
+Programmatic scoring service, independent of the Streamlit UI.
+
+    python api.py --port 8080 --workers 4
+
+POST /assess?industry=Retail   body: ledger as text/csv, application/json or Arrow IPC
+                               (&lang=Hindi adds localized tax and security guidance)
+GET  /health                   liveness and queue depth
+GET  /metrics                  Prometheus stage timings
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from utlis.pipeline import CONTENT_TYPES, assess_payload
+from utlis.instrumentation import enable, is_enabled, stage, registry
+
+
+def _warm_worker(instrumented=False):
+    # Importing the pipeline in the initializer keeps first-request latency low
+    import utlis.pipeline  # noqa: F401
+    if instrumented:
+        enable()
+
+
+def _assess_in_worker(payload, fmt, industry, lang):
+    """
+    Runs one assessment in a pool worker. Returns (result, stage stats), the
+    stats covering only this task so the parent can merge them into /metrics
+    """
+    registry.reset()
+    result = assess_payload(payload, fmt, industry, lang)
+    return result, registry.snapshot()
+
+
+class AssessmentService:
+    """
+    Runs assessments on a bounded process pool.
+
+    At most `max_pending` requests may be queued or running; beyond that new
+    requests are rejected immediately (HTTP 503) instead of queueing unbounded.
+    A request that times out (HTTP 504) keeps its slot until its worker
+    actually finishes, since a running task cannot be cancelled.
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=5.0, max_body_bytes=50 * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 2
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                         initargs=(is_enabled(),))
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        # Start every worker now rather than on the first requests
+        for future in [self._pool.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, payload, fmt, industry, lang=None):
+        """
+        Returns (status_code, body_dict)
+        """
+        if not self._slots.acquire(blocking=False):
+            return 503, {"error": "Server busy, retry later"}
+
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            future = self._pool.submit(_assess_in_worker, payload, fmt, industry, lang)
+        except Exception as e:
+            self._finished(None)
+            return 500, {"error": str(e)}
+        # The slot is freed when the worker is done, not when this request gives up
+        future.add_done_callback(self._finished)
+
+        try:
+            result, _ = future.result(timeout=self.timeout)
+            return 200, result
+        except FutureTimeout:
+            future.cancel()   # only succeeds while the task is still queued
+            return 504, {"error": f"Assessment exceeded {self.timeout}s"}
+        except (ValueError, KeyError) as e:
+            return 422, {"error": f"Invalid ledger: {e}"}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    def _finished(self, future):
+        if future is not None and not future.cancelled() and future.exception() is None:
+            registry.merge(future.result()[1])
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def shutdown(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+class AssessmentHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "pending": self.service.pending,
+                                  "max_pending": self.service.max_pending})
+        elif path == "/metrics":
+            data = registry.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/assess":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(400, {"error": "Empty body"})
+            return
+        if length > self.service.max_body_bytes:
+            self._send_json(413, {"error": "Ledger too large"})
+            return
+
+        content_type = (self.headers.get("Content-Type") or "text/csv").split(";")[0].strip()
+        fmt = CONTENT_TYPES.get(content_type)
+        if fmt is None:
+            self._send_json(415, {"error": f"Unsupported Content-Type {content_type}"})
+            return
+
+        query = parse_qs(url.query)
+        industry = query.get("industry", ["Services"])[0]
+        lang = query.get("lang", [None])[0]
+        payload = self.rfile.read(length)
+
+        started = time.perf_counter()
+        with stage("api.assess"):
+            status, body = self.service.submit(payload, fmt, industry, lang)
+        headers = {"X-Elapsed-Ms": f"{(time.perf_counter() - started) * 1000:.1f}"}
+        if status == 503:
+            headers["Retry-After"] = "1"
+        self._send_json(status, body, headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SME assessment HTTP API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    AssessmentHandler.service = AssessmentService(args.workers, args.max_pending, args.timeout)
+    server = ThreadingHTTPServer((args.host, args.port), AssessmentHandler)
+    server.daemon_threads = True
+    print(f"Assessment API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        AssessmentHandler.service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import os
+import uuid
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -10,195 +11,37 @@ from utlis.scoring import health_score
 from utlis.ai_advisor import get_advice
 from utlis.report import generate_pdf
 from utlis.tax_compliance import check_tax_compliance, get_tax_deductions, compliance_recommendations_by_language
-from utlis.working_capital import analyze_working_capital, suggest_working_capital_products
+from utlis.working_capital import analyze_working_capital, suggest_working_capital_products, working_capital_timeseries
 from utlis.cost_optimization import analyze_cost_structure, get_cost_reduction_strategies
 from utlis.creditworthiness import detailed_creditworthiness_assessment
 from utlis.forecasting import forecast_financial_metrics, analyze_trends, project_scenarios
 from utlis.products_recommender import recommend_financial_products
 from utlis.data_validation import validate_financial_data, sanitize_financial_data
 from utlis.security_compliance import ComplianceChecker, get_security_recommendations
-
-# -------------------------------------------------
-# LANGUAGE TRANSLATIONS
-# -------------------------------------------------
-translations = {
-    "English": {
-        "language": "Language",
-        "title": "📊 SME Financial Health Assessment Tool",
-        "upload_file": "Upload CSV or Excel",
-        "select_industry": "Select Industry",
-        "use_demo_data": "Use Demo Data",
-        "demo_loaded": "Demo data loaded successfully",
-        "data_loaded": "Data loaded successfully",
-        "raw_data": "Raw Data",
-        "metrics": "Metrics",
-        "industry_benchmark": "Industry Benchmark",
-        "industry_avg": "Industry Avg Margin",
-        "your_margin": "Your Margin",
-        "below_avg": "Below industry average",
-        "above_avg": "Above industry average",
-        "creditworthiness": "Creditworthiness",
-        "eligible_loan": "Eligible: Working Capital Loan, MSME Term Loan",
-        "eligible_credit": "Eligible: Small Credit Line",
-        "high_risk_loan": "High Risk: Loan not recommended",
-        "working_capital": "Working Capital Status",
-        "healthy_wc": "Healthy working capital",
-        "negative_wc": "Negative working capital — improve collections",
-        "financial_health": "Financial Health Score",
-        "business_health": "Business Health",
-        "key_metrics": "Key Metrics",
-        "revenue": "Revenue",
-        "profit_margin": "Profit Margin %",
-        "expense_ratio": "Expense Ratio %",
-        "gst_estimate": "GST & Tax Estimate",
-        "gst_liability": "Estimated GST Liability",
-        "expense_breakdown": "Expense Breakdown",
-        "profit": "Profit",
-        "expenses": "Expenses",
-        "revenue_vs_expense": "Revenue vs Expense Trend",
-        "revenue_forecast": "Revenue Forecast (Simple Prediction)",
-        "ai_advisor": "AI Financial Advisor",
-        "generate_insights": "Generate Insights",
-        "download_report": "Download Report",
-        "download_pdf": "Download PDF Report",
-        "pdf_generated": "PDF report generated and ready for download",
-        "integrations": "Integrations",
-        "connect_bank": "Connect Bank (Demo)",
-        "bank_connected": "Bank connected successfully (Demo)",
-        "transactions_synced": "Transactions synced",
-        "import_gst": "Import GST Data (Demo)",
-        "gst_imported": "GST data imported (Demo)",
-        "gst_summary": "GST Summary",
-        "investor_report": "Investor Financial Health Report",
-        "secure": "Data processed locally • Secure • For demo purposes only",
-        "healthy": "Business is financially healthy",
-        "moderate_risk": "Moderate financial risk detected",
-        "high_risk": "High financial risk detected",
-        "required_columns": "Required columns (Date, Revenue, Expense) not found for chart"
-    },
-    "Hindi": {
-        "language": "भाषा",
-        "title": "📊 एसएमई वित्तीय स्वास्थ्य मूल्यांकन उपकरण",
-        "upload_file": "CSV या Excel अपलोड करें",
-        "select_industry": "उद्योग चुनें",
-        "use_demo_data": "डेमो डेटा का उपयोग करें",
-        "demo_loaded": "डेमो डेटा सफलतापूर्वक लोड हुआ",
-        "data_loaded": "डेटा सफलतापूर्वक लोड हुआ",
-        "raw_data": "कच्चा डेटा",
-        "metrics": "मेट्रिक्स",
-        "industry_benchmark": "उद्योग बेंचमार्क",
-        "industry_avg": "उद्योग औसत मार्जिन",
-        "your_margin": "आपका मार्जिन",
-        "below_avg": "उद्योग औसत से नीचे",
-        "above_avg": "उद्योग औसत से ऊपर",
-        "creditworthiness": "साख",
-        "eligible_loan": "पात्र: कार्यशील पूंजी ऋण, एमएसएमई टर्म ऋण",
-        "eligible_credit": "पात्र: छोटा क्रेडिट लाइन",
-        "high_risk_loan": "उच्च जोखिम: ऋण की सिफारिश नहीं की जाती",
-        "working_capital": "कार्यशील पूंजी स्थिति",
-        "healthy_wc": "स्वस्थ कार्यशील पूंजी",
-        "negative_wc": "नकारात्मक कार्यशील पूंजी — संग्रह में सुधार करें",
-        "financial_health": "वित्तीय स्वास्थ्य स्कोर",
-        "business_health": "व्यावसायिक स्वास्थ्य",
-        "key_metrics": "मुख्य मेट्रिक्स",
-        "revenue": "राजस्व",
-        "profit_margin": "लाभ मार्जिन %",
-        "expense_ratio": "व्यय अनुपात %",
-        "gst_estimate": "जीएसटी और कर अनुमान",
-        "gst_liability": "अनुमानित जीएसटी देयता",
-        "expense_breakdown": "व्यय का विभाजन",
-        "profit": "लाभ",
-        "expenses": "व्यय",
-        "revenue_vs_expense": "राजस्व बनाम व्यय प्रवृत्ति",
-        "revenue_forecast": "राजस्व पूर्वानुमान (सरल भविष्यवाणी)",
-        "ai_advisor": "एआई वित्तीय सलाहकार",
-        "generate_insights": "अंतर्दृष्टि उत्पन्न करें",
-        "download_report": "रिपोर्ट डाउनलोड करें",
-        "download_pdf": "पीडीएफ रिपोर्ट डाउनलोड करें",
-        "pdf_generated": "पीडीएफ रिपोर्ट उत्पन्न और डाउनलोड के लिए तैयार",
-        "integrations": "एकीकरण",
-        "connect_bank": "बैंक कनेक्ट करें (डेमो)",
-        "bank_connected": "बैंक सफलतापूर्वक कनेक्ट हो गया (डेमो)",
-        "transactions_synced": "लेनदेन सिंक हो गया",
-        "import_gst": "जीएसटी डेटा आयात करें (डेमो)",
-        "gst_imported": "जीएसटी डेटा आयात किया गया (डेमो)",
-        "gst_summary": "जीएसटी सारांश",
-        "investor_report": "निवेशक वित्तीय स्वास्थ्य रिपोर्ट",
-        "secure": "डेटा स्थानीय रूप से संसाधित • सुरक्षित • डेमो उद्देश्यों के लिए",
-        "healthy": "व्यवसाय वित्तीय रूप से स्वस्थ है",
-        "moderate_risk": "मध्यम वित्तीय जोखिम का पता चला",
-        "high_risk": "उच्च वित्तीय जोखिम का पता चला",
-        "required_columns": "आवश्यक स्तंभ (तारीख, राजस्व, व्यय) चार्ट के लिए नहीं मिले"
-    },
-    "Tamil": {
-        "language": "மொழி",
-        "title": "📊 எஸ்எমிஇ நிதி ஆரோக்கியம் மதிப்பீட்டு கருவி",
-        "upload_file": "CSV அல்லது Excel பதிவேற்றவும்",
-        "select_industry": "தொழிலைத் தேர்ந்தெடுக்கவும்",
-        "use_demo_data": "டெமோ தரவைப் பயன்படுத்தவும்",
-        "demo_loaded": "டெமோ தரவு வெற்றிகரமாக ஏற்றப்பட்டது",
-        "data_loaded": "தரவு வெற்றிகரமாக ஏற்றப்பட்டது",
-        "raw_data": "மூல தரவு",
-        "metrics": "அளவீடுகள்",
-        "industry_benchmark": "தொழில் சாராংசம்",
-        "industry_avg": "தொழில் சராசரி விளிம்பு",
-        "your_margin": "உங்கள் விளிம்பு",
-        "below_avg": "தொழில் சராசரிக்கு கீழே",
-        "above_avg": "தொழில் சராசரிக்கு மேல்",
-        "creditworthiness": "கடன் மூল்যம்",
-        "eligible_loan": "தகுதி: பணிநிலை பூंजி கடன், எம்எসএমஇ கால கடன்",
-        "eligible_credit": "தகுதி: சிறிய கடன் வரிசை",
-        "high_risk_loan": "உচ்च ஆபத்து: கடன் பரிந்துரைக்கப்படவில்லை",
-        "working_capital": "பணிநிலை மூலதன நிலை",
-        "healthy_wc": "ஆரோக்கியமான பணிநிலை மூலதனம்",
-        "negative_wc": "எதிர்மறை பணிநிலை மூலதனம் — சேகரணை மேம்படுத்தவும்",
-        "financial_health": "நிதி ஆரோக்கியம் மதிப்பீடு",
-        "business_health": "ব্যবসায়িক ஆরோக்கியம்",
-        "key_metrics": "முக்கிய அளவீடுகள்",
-        "revenue": "வருவாய்",
-        "profit_margin": "லாभ விளிம்பு %",
-        "expense_ratio": "செலவு விகிதம் %",
-        "gst_estimate": "GST மற்றும் வரி மதிப்பீடு",
-        "gst_liability": "மதிப்பிடப்பட்ட GST பொறுப்பு",
-        "expense_breakdown": "செலவு பிரிப்பு",
-        "profit": "லாभ",
-        "expenses": "செலவுகள்",
-        "revenue_vs_expense": "வருவாய் மற்றும் செலவு போக்கு",
-        "revenue_forecast": "வருவாய் முன்னறிவிப்பு (எளிய கணிப்பு)",
-        "ai_advisor": "AI நிதி ஆலோசகர்",
-        "generate_insights": "நுண்ணறிவு உருவாக்கவும்",
-        "download_report": "அறிக்கை பதிவிறக்கவும்",
-        "download_pdf": "PDF அறிக்கை பதிவிறக்கவும்",
-        "pdf_generated": "PDF அறிக்கை உருவாக்கப்பட்டு பதிவிறக்கத்திற்குத் தயாரிக்கப்பட்டுள்ளது",
-        "integrations": "ஒருங்கிணைப்புகள்",
-        "connect_bank": "வங்கி இணைக்கவும் (டெமோ)",
-        "bank_connected": "வங்கி வெற்றிகரமாக இணைக்கப்பட்டது (டெமோ)",
-        "transactions_synced": "பரிவர்த்தனைகள் ஒத்திசைக்கப்பட்டுள்ளன",
-        "import_gst": "GST தரவை இறக்குமதி செய்யவும் (டெமோ)",
-        "gst_imported": "GST தரவு இறக்குமதி செய்யப்பட்டது (டெமோ)",
-        "gst_summary": "GST சுருக்கம்",
-        "investor_report": "முதலீட்டாளர் நிதி ஆரோக்கியம் அறிக்கை",
-        "secure": "தரவு உள்நாட்டில் செயல்படுத்தப்பட்டது • பாதுகாப்பு • டெமோ நோக்கங்களுக்காக",
-        "healthy": "ব්যবসায় আর্থিকভাবে সুস্থ",
-        "moderate_risk": "মধ্যম আর্থিক ঝুঁকি সনাক্ত হয়েছে",
-        "high_risk": "উচ্চ আর্থিক ঝুঁকি সনাক্ত হয়েছে",
-        "required_columns": "প্রয়োজনীয় কলাম (তারিখ, রাজস্ব, ব্যয়) চার্টের জন্য পাওয়া যায়নি"
-    }
-}
+from utlis.audit_log import record_audit_event
+from utlis.instrumentation import stage, begin_session_trace, session_trace, is_enabled, registry
+from utlis.ingestion import read_ledger_bytes
+from utlis.benchmarking import record_and_rank
+from utlis.similarity import find_similar_companies
+from utlis.what_if import WhatIfSession, slider_bounds, tornado
+from utlis.liquidity import company_profile, liquidity_summary
+from utlis.period_analytics import period_table
+from utlis.localization import LANGUAGES, LANGUAGE_LABELS, INDUSTRIES, get_bundle
+from utlis.charts import revenue_expense_chart, seasonal_forecast_chart, health_gauge, profit_expense_pie
 
 # -------------------------------------------------
 # PAGE SETUP
 # -------------------------------------------------
 st.set_page_config(page_title="SME Financial Health Tool", layout="wide")
+begin_session_trace()
 
 # Language Selection at the top
 col_lang1, col_lang2 = st.columns([1, 10])
 with col_lang1:
-    lang = st.selectbox("🌐", ["English", "हिन्दी (Hindi)", "தமிழ் (Tamil)"])
+    lang_code = st.selectbox("🌐", list(LANGUAGES), format_func=LANGUAGE_LABELS.get)
 
-# Map language code for translations
-lang_code = "English" if lang == "English" else "Hindi" if "Hindi" in lang else "Tamil"
-t = translations[lang_code]
+bundle = get_bundle(lang_code)
+t = bundle.section("ui")
 
 st.title(t["title"])
 
@@ -212,45 +55,41 @@ if "advice" not in st.session_state:
 if "df" not in st.session_state:
     st.session_state.df = None
 
+if "user_id" not in st.session_state:
+    st.session_state.user_id = f"session-{uuid.uuid4().hex[:12]}"
+
 
 # -------------------------------------------------
 # FILE INPUT
 # -------------------------------------------------
 file = st.file_uploader(t["upload_file"], type=["csv", "xlsx"])
 
-# Industry selection
-industries = {
-    "English": ["Retail", "Manufacturing", "Services", "Agriculture", "E-commerce"],
-    "Hindi": ["खुदरा", "विनिर्माण", "सेवाएं", "कृषि", "ई-कॉमर्स"],
-    "Tamil": ["சில்பக", "உற்பादனம்", "சேவைகள்", "விவசாயம்", "ই-வணிகம்"]
-}
+# Industry selection (the value is the English industry key, shown localized)
+industry = st.selectbox(t["select_industry"], INDUSTRIES, format_func=bundle.section("industry").get)
 
-industry = st.selectbox(t["select_industry"], industries[lang_code])
-
-industry_avg = {
-    "Retail": 12, "खुदरा": 12, "சில்பக": 12,
-    "Manufacturing": 18, "विनिर्माण": 18, "உற்பादனம்": 18,
-    "Services": 25, "सेवाएं": 25, "சேவைகள்": 25,
-    "Agriculture": 10, "कृषि": 10, "விவசாயம்": 10,
-    "E-commerce": 15, "ई-कॉमर्स": 15, "ई-வணிகம்": 15
-}
+industry_avg = {"Retail": 12, "Manufacturing": 18, "Services": 25, "Agriculture": 10, "E-commerce": 15}
 
 col1, col2 = st.columns([1, 5])
 
 with col1:
     if st.button(t["use_demo_data"]):
         demo_path = os.path.join(os.path.dirname(__file__), "demo.csv")
-        st.session_state.df = pd.read_csv(demo_path)
+        with open(demo_path, "rb") as f:
+            st.session_state.df = read_ledger_bytes(f.read(), "demo.csv")
+        record_audit_event("upload", st.session_state.user_id, "demo.csv")
         st.success(t["demo_loaded"])
         st.write(st.session_state.df.head())
 
 
 # Load uploaded file
+# Parse only when the upload itself changes, not on every rerun
 if file:
-    if file.name.endswith(".csv"):
-        st.session_state.df = pd.read_csv(file)
-    else:
-        st.session_state.df = pd.read_excel(file)
+    upload_key = getattr(file, "file_id", None) or (file.name, file.size)
+    if st.session_state.get("upload_key") != upload_key:
+        with stage("app.load"):
+            st.session_state.df = read_ledger_bytes(file.getvalue(), file.name)
+        st.session_state.upload_key = upload_key
+        record_audit_event("upload", st.session_state.user_id, file.name)
 
 
 df = st.session_state.df
@@ -273,8 +112,15 @@ if df is not None:
     # -----------------------
     # METRICS
     # -----------------------
-    metrics = calculate_metrics(df)
-    score = health_score(metrics)
+    with stage("app.metrics", rows=len(df)):
+        metrics = calculate_metrics(df)
+    with stage("app.score"):
+        score = health_score(metrics)
+    # Once per dataset and industry, not on every rerun
+    assessment_key = (df.attrs.get("dataset_id"), industry)
+    if st.session_state.get("audited_assessment") != assessment_key:
+        st.session_state.audited_assessment = assessment_key
+        record_audit_event("assessment", st.session_state.user_id, "financial_metrics", industry=industry)
 
     # -----------------------
     # INDUSTRY BENCHMARK & CREDITWORTHINESS
@@ -290,6 +136,13 @@ if df is not None:
         else:
             st.success(t["above_avg"])
 
+    # Percentile against every company assessed so far in the same industry
+    peer_rank = record_and_rank(industry, metrics, company_id=df.attrs.get("dataset_id"))
+    if "Profit Margin" in peer_rank:
+        margin_rank = peer_rank["Profit Margin"]
+        st.write(f"{t['peer_percentile']}: {margin_rank['percentile']:.0f} "
+                 f"({margin_rank['cohort_size']} {t['peer_companies']})")
+
     st.subheader(t["creditworthiness"])
     if score > 75:
         st.success(t["eligible_loan"])
@@ -312,20 +165,7 @@ if df is not None:
     st.subheader(t["financial_health"])
 
     # Gauge chart
-    gauge_fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=score,
-        title={'text': t["business_health"]},
-        gauge={
-            'axis': {'range': [0, 100]},
-            'bar': {'thickness': 0.3},
-            'steps': [
-                {'range': [0, 40], 'color': "red"},
-                {'range': [40, 70], 'color': "orange"},
-                {'range': [70, 100], 'color': "green"}
-            ]
-        }
-    ))
+    gauge_fig = health_gauge(score, t["business_health"], lang_code)
 
     st.plotly_chart(gauge_fig, use_container_width=True)
 
@@ -360,11 +200,8 @@ if df is not None:
 
         st.subheader(t["expense_breakdown"])
         if metrics.get("Revenue") is not None and metrics.get("Expense Ratio") is not None:
-            fig = px.pie(
-                values=[metrics["Revenue"] - metrics["Revenue"] * metrics["Expense Ratio"] / 100,
-                        metrics["Revenue"] * metrics["Expense Ratio"] / 100],
-                names=[t["profit"], t["expenses"]]
-            )
+            fig = profit_expense_pie(metrics["Revenue"], metrics["Expense Ratio"],
+                                     [t["profit"], t["expenses"]], lang_code)
             st.plotly_chart(fig)
         else:
             st.warning(t["required_columns"])
@@ -376,7 +213,7 @@ if df is not None:
     # -----------------------
     st.subheader(t["revenue_vs_expense"])
 
-    fig = px.line(df, x="Date", y=["Revenue", "Expense"]) if "Revenue" in df.columns and "Expense" in df.columns else None
+    fig = revenue_expense_chart(df, lang_code) if "Revenue" in df.columns and "Expense" in df.columns else None
     if fig is not None:
         st.plotly_chart(fig, use_container_width=True)
     else:
@@ -388,8 +225,7 @@ if df is not None:
     st.subheader(t["revenue_forecast"])
     try:
         if "Revenue" in df.columns:
-            df["Forecast"] = df["Revenue"].rolling(2).mean()
-            fig_forecast = px.line(df, x="Date", y=["Revenue", "Forecast"]) if "Date" in df.columns else None
+            fig_forecast = seasonal_forecast_chart(df, lang_code) if "Date" in df.columns else None
             if fig_forecast is not None:
                 st.plotly_chart(fig_forecast, use_container_width=True)
         else:
@@ -414,16 +250,23 @@ if df is not None:
     st.subheader(t["download_report"])
 
     if st.button(t["download_pdf"]):
-        filepath = generate_pdf(metrics, score)
-
-        with open(filepath, "rb") as f:
-            st.download_button(
-                label=t["download_pdf"],
-                data=f,
-                file_name="financial_report.pdf",
-                mime="application/pdf"
-            )
-        st.success(t["pdf_generated"])
+        try:
+            with stage("app.pdf"):
+                filepath = generate_pdf(metrics, score, lang=lang_code, df=df, industry=industry)
+        except RuntimeError as e:
+            # Missing Devanagari/Tamil font: say so instead of serving a PDF of empty boxes
+            st.error(str(e))
+        else:
+            with open(filepath, "rb") as f:
+                st.download_button(
+                    label=t["download_pdf"],
+                    data=f,
+                    file_name="financial_report.pdf",
+                    mime="application/pdf",
+                    on_click=record_audit_event,
+                    args=("report_download", st.session_state.user_id, "financial_report.pdf")
+                )
+            st.success(t["pdf_generated"])
     
     # Create tabs for advanced features
     st.markdown("---")
@@ -438,7 +281,7 @@ if df is not None:
         "Products & Loans"
     ])
     
-    with tab1:
+    with tab1, stage("app.tab.tax"):
         st.header("💰 Tax Compliance & Regulations")
         
         # Tax compliance check
@@ -477,7 +320,7 @@ if df is not None:
         st.metric("Total Available Deductions", f"₹{deductions['total_deductions']:.0f}")
         st.metric("Estimated Taxable Income", f"₹{deductions['estimated_taxable_income']:.0f}")
     
-    with tab2:
+    with tab2, stage("app.tab.working_capital"):
         st.header("💧 Working Capital Optimization")
         
         # Working capital analysis
@@ -491,6 +334,29 @@ if df is not None:
         col4.metric("Cash Cycle", f"{wc_analysis['cash_conversion_cycle']:.0f} days")
         
         st.metric("WC Efficiency", wc_analysis["working_capital_efficiency"])
+
+        # Rolling trend of the working capital cycle
+        if "Date" in df.columns and "Revenue" in df.columns:
+            wc_trend = working_capital_timeseries(df)
+            if len(wc_trend) > 1:
+                st.subheader("📉 Working Capital Trend (3-month rolling)")
+                fig_wc = px.line(
+                    wc_trend, x="Date",
+                    y=["receivables_days", "inventory_days", "payables_days", "cash_conversion_cycle"],
+                    labels={"value": "Days", "variable": ""}
+                )
+                st.plotly_chart(fig_wc, use_container_width=True)
+
+        # Cash runway under revenue, collection and interest-rate shocks
+        st.subheader("🧯 Liquidity Stress Test (24 months)")
+        stress = liquidity_summary(company_profile(df, metrics, wc_analysis))
+        st.dataframe(pd.DataFrame([
+            {"Scenario": row["scenario"],
+             "Cash Runway": f"{row['runway_months']:.0f} months" if row["runway_months"] is not None else "24+ months",
+             "Cash Shortfall Probability": f"{row['out_of_cash_probability']:.1f}%",
+             "Covenant Breach Probability": f"{row['breach_probability']:.1f}%"}
+            for row in stress
+        ]), use_container_width=True)
         
         if wc_analysis["recommendations"]:
             st.info("💡 Optimization Recommendations:")
@@ -508,7 +374,7 @@ if df is not None:
                 st.write(f"**Tenor:** {product['tenor']}")
                 st.write(f"**Ideal For:** {product['ideal_for']}")
     
-    with tab3:
+    with tab3, stage("app.tab.cost"):
         st.header("📊 Cost Structure & Optimization")
         
         # Cost analysis
@@ -552,11 +418,12 @@ if df is not None:
                     for i, strategy in enumerate(strat_list, 1):
                         st.write(f"{i}. {strategy}")
     
-    with tab4:
+    with tab4, stage("app.tab.credit"):
         st.header("🎖️ Creditworthiness & Risk Assessment")
         
         # Detailed creditworthiness assessment
-        credit_assessment = detailed_creditworthiness_assessment(metrics, score, industry, metrics.get("Revenue", 0))
+        credit_assessment = detailed_creditworthiness_assessment(metrics, score, industry, metrics.get("Revenue", 0),
+                                                                 wc_analysis)
         
         col1, col2 = st.columns(2)
         
@@ -600,8 +467,59 @@ if df is not None:
         st.subheader("✅ Financial Strengths")
         for strength in credit_assessment["strengths"]:
             st.write(f"✓ {strength}")
+        
+        # Similar companies (nearest neighbours on normalized metrics)
+        similar = find_similar_companies(
+            metrics, wc_analysis, k=5, company_id=df.attrs.get("dataset_id"),
+            label={"Industry": industry, "Health Score": score, "Credit Rating": rating["rating"]}
+        )
+        if similar:
+            st.subheader("👥 Similar Companies")
+            st.dataframe(pd.DataFrame([
+                {"Company": s["company_id"][:10], "Industry": s.get("Industry"),
+                 "Health Score": s.get("Health Score"), "Credit Rating": s.get("Credit Rating"),
+                 "Similarity Distance": round(s["distance"], 3)}
+                for s in similar
+            ]), use_container_width=True)
+
+        # What-if sliders: only the moved metric's score component is recomputed
+        st.subheader("🎛️ What-If Analysis")
+        what_if_key = (df.attrs.get("dataset_id"), score)
+        if st.session_state.get("what_if_key") != what_if_key:
+            st.session_state.what_if_key = what_if_key
+            st.session_state.what_if = WhatIfSession(metrics)
+        what_if = st.session_state.what_if
+
+        wcol1, wcol2 = st.columns(2)
+        with wcol1:
+            for metric, label in [("Profit Margin", "Profit Margin (%)"), ("Expense Ratio", "Expense Ratio (%)"),
+                                  ("Growth %", "Growth (%)")]:
+                what_if.set(metric, st.slider(label, *slider_bounds(metric, what_if.base[metric]), 0.5))
+            what_if.set("Working Capital", 1.0 if st.checkbox("Positive Working Capital", what_if.base["Working Capital"] > 0) else -1.0)
+        with wcol2:
+            outcome = what_if.result()
+            st.metric("What-If Health Score", outcome["score"], delta=outcome["score_change"])
+            st.metric("What-If Credit Rating", outcome["rating"])
+            st.write(", ".join(loan.replace("_", " ").title() for loan, ok in outcome["eligible"].items() if ok) or "No loan products eligible")
+
+        sensitivity = tornado(metrics, {
+            "Profit Margin": (-5, 5), "Expense Ratio": (-10, 10),
+            "Growth %": (-5, 5), "Working Capital": (-abs(wc) - 1, abs(wc) + 1),
+        })
+        tornado_fig = go.Figure()
+        tornado_fig.add_trace(go.Bar(
+            y=[row["metric"] for row in sensitivity["rows"]],
+            x=[row["low_score"] - sensitivity["base_score"] for row in sensitivity["rows"]],
+            orientation="h", name="Downside"))
+        tornado_fig.add_trace(go.Bar(
+            y=[row["metric"] for row in sensitivity["rows"]],
+            x=[row["high_score"] - sensitivity["base_score"] for row in sensitivity["rows"]],
+            orientation="h", name="Upside"))
+        tornado_fig.update_layout(barmode="overlay", title="Health Score Sensitivity", xaxis_title="Score change",
+                                  yaxis={"autorange": "reversed"})
+        st.plotly_chart(tornado_fig, use_container_width=True)
     
-    with tab5:
+    with tab5, stage("app.tab.forecasting"):
         st.header("📈 Financial Forecasting & Trends")
         
         # Analyze trends
@@ -658,8 +576,19 @@ if df is not None:
         
         fig_forecast.update_layout(title="Revenue Forecast Scenarios", hovermode="x unified")
         st.plotly_chart(fig_forecast, use_container_width=True)
+
+        # Month / quarter / year comparison tables (computed once per dataset)
+        if "Date" in df.columns and "Revenue" in df.columns:
+            st.subheader("🗓️ Period Comparison")
+            period = st.radio("Period", ["month", "quarter", "year"], index=1, horizontal=True,
+                              format_func=str.title, key="period_comparison")
+            table = period_table(df, period)
+            growth_col = {"month": "Revenue MoM %", "quarter": "Revenue QoQ %", "year": "Revenue YoY %"}[period]
+            fig_period = px.bar(table, x="Label", y="Revenue", hover_data=[growth_col, "Revenue YoY %", "Profit Margin"])
+            st.plotly_chart(fig_period, use_container_width=True)
+            st.dataframe(table.drop(columns=["Period"]).set_index("Label"), use_container_width=True)
     
-    with tab6:
+    with tab6, stage("app.tab.products"):
         st.header("💳 Recommended Financial Products")
         
         # Get product recommendations
@@ -720,3 +649,12 @@ if st.button(t["import_gst"]):
 st.header(t["investor_report"])
 st.markdown("---")
 st.caption(t["secure"])
+
+# -------------------------------------------------
+# DEBUG: PER-STAGE TIMINGS (only when instrumentation is enabled)
+# -------------------------------------------------
+if is_enabled():
+    with st.sidebar.expander("⏱ Stage timings"):
+        st.dataframe(pd.DataFrame(session_trace()), use_container_width=True)
+        st.download_button("Prometheus metrics", registry.to_prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from utlis.ai_advisor import AdviceCache, AdvisorEngine, AdvisorProvider, rule_based_advice
+
+METRICS = {"Revenue": 50000.0, "Profit Margin": 12.0, "Expense Ratio": 60.0}
+
+
+class _LoopBoundClient:
+    """
+    Stands in for an SDK client wrapping an httpx.AsyncClient: unusable once its loop has closed
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+
+    async def create(self, prompt):
+        assert asyncio.get_running_loop() is self.loop and not self.loop.is_closed()
+        assert not self.closed
+        return f"advice for {len(prompt)}"
+
+    async def close(self):
+        self.closed = True
+
+
+class _SdkProvider(AdvisorProvider):
+    name = "sdk"
+
+    def __init__(self):
+        super().__init__()
+        self.made = []
+
+    def _make_client(self):
+        client = _LoopBoundClient()
+        self.made.append(client)
+        return client
+
+    async def acomplete(self, prompt):
+        return await self.client().create(prompt)
+
+
+def test_each_batch_gets_a_client_on_its_own_loop_and_closes_it():
+    provider = _SdkProvider()
+    engine = AdvisorEngine(provider=provider, cache=AdviceCache(ttl_seconds=0))
+
+    first = engine.advise_many([METRICS, dict(METRICS, Revenue=9000.0)])
+    second = engine.advise_many([METRICS])
+
+    assert first[0].startswith("advice for") and second[0].startswith("advice for")
+    # One client per batch (shared by its concurrent calls), each closed with its loop
+    assert len(provider.made) == 2
+    assert provider.made[0].loop is not provider.made[1].loop
+    assert all(client.closed for client in provider.made)
+    assert provider._clients == {}
+
+
+def test_batch_inside_a_running_loop_uses_the_helper_thread_loop():
+    provider = _SdkProvider()
+    engine = AdvisorEngine(provider=provider)
+
+    async def caller():
+        return engine.advise_many([METRICS])
+
+    assert asyncio.run(caller())[0].startswith("advice for")
+    assert provider.made[0].closed
+
+
+class _SlowProvider(AdvisorProvider):
+    name = "slow"
+
+    async def acomplete(self, prompt):
+        await asyncio.sleep(0.3)
+        return "provider advice"
+
+
+def test_time_queued_for_a_slot_counts_against_the_deadline():
+    engine = AdvisorEngine(provider=_SlowProvider(), cache=AdviceCache(ttl_seconds=0), max_concurrency=1,
+                           timeout=0.5)
+    batch = [dict(METRICS, Revenue=float(revenue)) for revenue in (20000, 30000, 40000)]
+
+    advice = engine.advise_many(batch)
+    # Only the first call fits; the others run out of time waiting for the single slot
+    assert advice[0] == "provider advice"
+    assert advice[1:] == [rule_based_advice(m) for m in batch[1:]]
+
+
+def test_errors_on_the_helper_thread_reach_the_caller():
+    engine = AdvisorEngine(provider=None)
+
+    async def caller():
+        return engine.advise_many([{"Revenue": 1.0}])   # rule-based advice needs a Profit Margin
+
+    with pytest.raises(KeyError, match="Profit Margin"):
+        asyncio.run(caller())
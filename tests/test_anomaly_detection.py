@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utlis import anomaly_detection
+from utlis.anomaly_detection import DEFAULT_THRESHOLD, MAD_SCALE, MIN_RELATIVE_MAD, detect_anomalies
+
+
+def _ledger(revenue, company="C1"):
+    return pd.DataFrame({"company_id": company, "Date": pd.date_range("2024-01-01", periods=len(revenue), freq="MS"),
+                         "Revenue": revenue})
+
+
+def test_rolling_baseline_excludes_the_scored_point():
+    result = detect_anomalies(_ledger([100.0] * 6 + [1000.0]), columns=["Revenue"], method="rolling", window=2,
+                              min_periods=2)
+    # Baseline of the spike is the two months before it: median 100, MAD floored at 5% of it
+    expected = (1000 - 100) / (MAD_SCALE * MIN_RELATIVE_MAD * 100)
+    assert result["scores"]["Revenue"][-1] == pytest.approx(expected)
+    assert result["masks"]["Revenue"].tolist() == [False] * 6 + [True]
+
+
+def test_rolling_windows_stay_within_each_company_and_need_min_periods():
+    df = pd.concat([_ledger([100.0, 100.0, 100.0, 100.0], "A"), _ledger([5000.0, 5000.0, 5000.0, 5000.0], "B")])
+    result = detect_anomalies(df.sample(frac=1, random_state=1), columns=["Revenue"], method="rolling",
+                              window=3, min_periods=3)
+    assert not result["any"].any()
+    assert np.count_nonzero(result["scores"]["Revenue"]) == 0
+
+
+def test_seasonal_baseline_leaves_the_scored_point_out():
+    # Monthly revenue of 100 for five years, with two January spikes
+    revenue = np.full(60, 100.0)
+    revenue[[12, 36]] = 1000.0
+    result = detect_anomalies(_ledger(revenue), columns=["Revenue"], min_periods=3)
+
+    flagged = np.flatnonzero(result["masks"]["Revenue"])
+    assert flagged.tolist() == [12, 36]
+    # Each spike is scored against the other four Januaries: median 100, MAD floored
+    expected = (1000 - 100) / (MAD_SCALE * MIN_RELATIVE_MAD * 100)
+    assert result["scores"]["Revenue"][12] == pytest.approx(expected)
+    # The ordinary Januaries see both spikes in their baseline, but not enough to be flagged
+    assert -DEFAULT_THRESHOLD < result["scores"]["Revenue"][0] < 0
+
+
+def test_seasonal_baseline_needs_min_periods_of_other_years(monkeypatch):
+    df = pd.concat([_ledger([100.0] * 24 + [900.0] * 12, "A"), _ledger([50.0] * 24, "B")])
+    shuffled = df.sample(frac=1, random_state=3)
+    # Every month of A has two other years, and of B only one
+    assert not detect_anomalies(shuffled, columns=["Revenue"], min_periods=3)["any"].any()
+
+    result = detect_anomalies(shuffled, columns=["Revenue"], min_periods=2)
+    flagged = shuffled[result["any"]]
+    assert len(flagged) == 12 and (flagged["Revenue"] == 900.0).all()
+
+    # Same scores when the keys are processed a few at a time
+    monkeypatch.setattr(anomaly_detection, "_CHUNK_CELLS", 20)
+    chunked = detect_anomalies(shuffled, columns=["Revenue"], min_periods=2)
+    np.testing.assert_array_equal(chunked["scores"]["Revenue"], result["scores"]["Revenue"])
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+import api
+from utlis.instrumentation import MetricsRegistry, registry
+
+
+def _slow_task(payload, fmt, industry, lang):
+    time.sleep(float(payload))
+    return {"ok": True}, {"test.slow": {"count": 1, "wall_seconds": 0.5, "cpu_seconds": 0.0, "rows": 7,
+                                        "max_wall_seconds": 0.5, "peak_bytes": 0}}
+
+
+def _failing_task(payload, fmt, industry, lang):
+    raise ValueError("no Date column")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    def make(task):
+        monkeypatch.setattr(api, "_assess_in_worker", task)
+        svc = api.AssessmentService(workers=1, max_pending=1, timeout=0.2)
+        created.append(svc)
+        return svc
+    created = []
+    yield make
+    for svc in created:
+        svc.shutdown()
+
+
+def _wait_idle(svc, limit=10.0):
+    deadline = time.monotonic() + limit
+    while svc.pending and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_timed_out_task_holds_its_slot_until_the_worker_finishes(service):
+    registry.reset()
+    svc = service(_slow_task)
+    status, _ = svc.submit(b"1.0", "csv", "Retail")
+    assert status == 504
+    # Still running in the worker: still counted, and no room for another request
+    assert svc.pending == 1
+    assert svc.submit(b"0", "csv", "Retail")[0] == 503
+
+    _wait_idle(svc)
+    assert svc.pending == 0
+    assert svc.submit(b"0", "csv", "Retail") == (200, {"ok": True})
+    _wait_idle(svc)
+    assert registry.snapshot()["test.slow"]["count"] == 2
+
+
+def test_worker_errors_release_the_slot(service):
+    svc = service(_failing_task)
+    status, body = svc.submit(b"", "csv", "Retail")
+    assert status == 422 and "no Date column" in body["error"]
+    _wait_idle(svc)
+    assert svc.pending == 0
+
+
+def test_merge_adds_counters_and_keeps_maxima():
+    target = MetricsRegistry()
+    target.record("stage", 0.2, 0.1, rows=10, peak_bytes=100)
+    target.merge({"stage": {"count": 2, "wall_seconds": 0.5, "cpu_seconds": 0.3, "rows": 5,
+                            "max_wall_seconds": 0.4, "peak_bytes": 50}})
+    stats = target.snapshot()["stage"]
+    assert stats["count"] == 3 and stats["rows"] == 15
+    assert stats["wall_seconds"] == pytest.approx(0.7)
+    assert stats["max_wall_seconds"] == 0.4 and stats["peak_bytes"] == 100
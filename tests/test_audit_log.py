@@ -0,0 +1,74 @@
+import os
+import threading
+
+import pytest
+
+from utlis.audit_log import AuditLogWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    created = []
+
+    def make(**kwargs):
+        w = AuditLogWriter(str(tmp_path), flush_interval=0.02, **kwargs)
+        created.append(w)
+        return w
+    yield make
+    for w in created:
+        w.close()
+
+
+def test_full_queue_spills_to_disk_instead_of_dropping(writer, tmp_path):
+    w = writer(max_queue=1, put_timeout=0.01)
+    gate = threading.Event()
+    write_batch = w._write_batch
+    w._write_batch = lambda batch: (gate.wait(), write_batch(batch))
+
+    for i in range(6):
+        w.log("upload", "u1", f"file{i}.csv")
+    assert os.path.exists(tmp_path / AuditLogWriter.SPILL_FILE)
+
+    gate.set()
+    assert w.flush()
+    assert w.dropped == 0
+    assert sorted(e["data_accessed"] for e in w.query("u1")) == [f"file{i}.csv" for i in range(6)]
+    assert not os.path.exists(tmp_path / AuditLogWriter.SPILL_FILE)
+
+
+def test_writer_survives_a_failed_write(writer):
+    w = writer()
+    write_batch = w._write_batch
+    failures = []
+
+    def flaky(batch):
+        if not failures:
+            failures.append(batch)
+            raise OSError("disk full")
+        write_batch(batch)
+    w._write_batch = flaky
+
+    w.log("assessment", "u2", "financial_metrics")
+    # The flush marker may have been drained with the failed batch
+    assert w.flush(timeout=0.5) or w.flush()
+    assert failures and w._thread.is_alive()
+    assert [e["action"] for e in w.query("u2")] == ["assessment"]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_writer_thread_is_restarted(writer):
+    w = writer()
+    drain = w._drain
+
+    def crash():
+        w._drain = drain
+        raise SystemExit   # not an Exception: ends the thread
+    w._drain = crash
+    dead = w._thread
+    dead.join(timeout=2.0)
+    assert not dead.is_alive()
+
+    w.log("upload", "u3", "ledger.csv")
+    assert w._thread is not dead and w._thread.is_alive()
+    assert w.flush()
+    assert len(w.query("u3")) == 1
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from utlis.benchmarking import PeerBenchmark, SortedCohort
+
+
+def test_buffered_cohort_matches_a_fully_sorted_array():
+    rng = np.random.default_rng(3)
+    base = rng.normal(size=5000)
+    extra = rng.normal(size=200)
+    cohort = SortedCohort(base)
+    for value in extra:
+        cohort.add(value)
+    cohort.add(float("nan"))
+
+    # Still buffered: queries must see buffered values without a merge
+    assert len(cohort._pending) == len(extra)
+    reference = np.sort(np.concatenate([base, extra]))
+    assert len(cohort) == len(reference)
+    for q in (0.0, 0.1, 0.5, 0.9, 1.0):
+        assert cohort.quantile(q) == pytest.approx(np.quantile(reference, q))
+    for value in (extra[0], -0.5, 0.0, 3.0):
+        below = np.searchsorted(reference, value, "left") + np.searchsorted(reference, value, "right")
+        assert cohort.percentile(value) == pytest.approx(below / 2 / len(reference) * 100)
+    assert np.array_equal(cohort.values(), reference)
+
+
+def test_buffer_is_merged_once_it_outgrows_its_share():
+    cohort = SortedCohort()
+    for value in range(SortedCohort.MERGE_MIN + 1):
+        cohort.add(float(value))
+    assert cohort._pending == [] and len(cohort._sorted) == SortedCohort.MERGE_MIN + 1
+
+
+def test_saves_are_debounced_and_flushed(tmp_path):
+    path = str(tmp_path / "benchmarks.npz")
+    benchmark = PeerBenchmark(min_cohort_size=1)
+    benchmark.add("Retail", {"Profit Margin": 10.0}, company_id="a")
+    assert not benchmark.save_if_due(path, interval=3600)
+    assert not (tmp_path / "benchmarks.npz").exists()
+    assert benchmark.save_if_due(path, interval=0)
+
+    benchmark.add("Retail", {"Profit Margin": 20.0}, company_id="b")
+    assert not benchmark.save_if_due(path, interval=3600)
+    benchmark.flush(path)
+    loaded = PeerBenchmark.load(path, min_cohort_size=1)
+    assert loaded.cohort_size("Retail") == 2
+    assert not loaded.add("Retail", {"Profit Margin": 30.0}, company_id="b")
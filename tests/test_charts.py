@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utlis.charts import downsample_frame, lttb_indices, minmax_indices
+
+
+@pytest.mark.parametrize("n, n_out", [(3000, 2500), (1001, 1000), (10, 4), (100000, 2000)])
+def test_minmax_keeps_extremes_and_bounds(n, n_out):
+    y = np.random.default_rng(0).random(n)
+    idx = minmax_indices(y, n_out)
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0) and len(idx) <= n_out + 2
+    assert y.argmax() in idx and y.argmin() in idx
+
+
+def test_minmax_with_nan_runs():
+    y = np.random.default_rng(1).random(3000)
+    y[100:400] = np.nan
+    idx = minmax_indices(y, 500)
+    assert not np.isnan(y[idx[1:-1]]).any()
+    assert np.nanargmax(y) in idx
+
+
+def test_minmax_all_nan():
+    idx = minmax_indices(np.full(100, np.nan), 10)
+    assert idx.tolist() == [0, 99]
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    y = np.zeros(5000)
+    y[1234] = 100.0
+    idx = lttb_indices(np.arange(5000), y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == 4999 and 1234 in idx
+
+
+def test_downsample_frame_merges_series():
+    df = pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=10000, freq="h"),
+                       "Revenue": np.random.default_rng(2).random(10000),
+                       "Expense": np.random.default_rng(3).random(10000)})
+    out = downsample_frame(df, "Date", ["Revenue", "Expense"], max_points=1000, method="minmax")
+    assert len(out) < len(df)
+    assert df["Revenue"].idxmax() in out.index and df["Expense"].idxmin() in out.index
+    assert downsample_frame(df.head(50), "Date", ["Revenue"]) is not None
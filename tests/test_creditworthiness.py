@@ -0,0 +1,30 @@
+import numpy as np
+
+from utlis.creditworthiness import calculate_default_risk
+from utlis.default_model import PD_FEATURES, LogisticPDModel
+
+METRICS = {"Revenue": 100000.0, "Profit Margin": 15.0, "Expense Ratio": 85.0, "Growth %": 5.0,
+           "Working Capital": 20000.0, "Avg Loan": 10000.0}
+
+
+def _cycle_only_model(tmp_path, monkeypatch):
+    # Default risk driven by the cash conversion cycle alone
+    model = LogisticPDModel()
+    model.mean = np.zeros(len(PD_FEATURES))
+    model.std = np.ones(len(PD_FEATURES))
+    model.coef = np.zeros(len(PD_FEATURES))
+    model.coef[PD_FEATURES.index("Cash Conversion Cycle")] = 0.05
+    model.intercept = -3.0
+    path = tmp_path / "pd_model.json"
+    model.save(str(path))
+    monkeypatch.setenv("PD_MODEL_PATH", str(path))
+
+
+def test_cash_conversion_cycle_reaches_the_pd_model(tmp_path, monkeypatch):
+    _cycle_only_model(tmp_path, monkeypatch)
+    short = calculate_default_risk(METRICS, 60, {"cash_conversion_cycle": 10})
+    long = calculate_default_risk(METRICS, 60, {"cash_conversion_cycle": 120})
+    assert float(short["default_probability"].rstrip("%")) < 10
+    assert float(long["default_probability"].rstrip("%")) > 90
+    # Without a working capital analysis the feature is imputed with the training mean
+    assert calculate_default_risk(METRICS, 60)["default_probability"] == "4.7%"
@@ -0,0 +1,56 @@
+import os
+import time
+
+import pandas as pd
+
+from utlis.dataset_store import DatasetStore
+from utlis.ingestion import parsed_cache, read_ledger_bytes
+
+CSV = b"Date,Revenue,Expense,PAN,Account Number\n2024-01-31,100,60,ABCDE1234F,00123\n2024-02-29,120,70,ABCDE1234F,00123\n"
+
+
+def _frame():
+    return pd.DataFrame({"Date": pd.to_datetime(["2024-01-31"]), "Revenue": [100.0], "Expense": [60.0],
+                         "PAN": ["ABCDE1234F"]})
+
+
+def test_put_stores_only_canonical_columns(tmp_path):
+    store = DatasetStore(tmp_path)
+    assert store.put("ab" * 16, _frame())
+    stored = pd.read_feather(store.path_for("ab" * 16))
+    assert list(stored.columns) == ["Date", "Revenue", "Expense"]
+    assert b"ABCDE1234F" not in open(store.path_for("ab" * 16), "rb").read()
+
+
+def test_read_ledger_bytes_same_columns_from_parse_and_store(tmp_path):
+    store = DatasetStore(tmp_path)
+    parsed_cache.clear()
+    fresh = read_ledger_bytes(CSV, "ledger.csv", store=store)
+    parsed_cache.clear()
+    stored = read_ledger_bytes(CSV, "ledger.csv", store=store)
+    assert "PAN" not in fresh.columns and "Account Number" not in fresh.columns
+    assert list(fresh.columns) == list(stored.columns)
+    assert fresh.attrs["dataset_id"] == stored.attrs["dataset_id"]
+
+
+def test_evicts_expired_datasets(tmp_path):
+    store = DatasetStore(tmp_path, max_age_days=1)
+    store.put("aa" * 16, _frame())
+    store.put("bb" * 16, _frame())
+    old = time.time() - 3 * 86400
+    os.utime(store.path_for("aa" * 16), (old, old))
+    assert store.evict() == 1
+    assert "aa" * 16 not in store and "bb" * 16 in store
+
+
+def test_evicts_least_recently_used_above_size_limit(tmp_path):
+    store = DatasetStore(tmp_path, max_bytes=10 ** 9)
+    ids = ["aa" * 16, "bb" * 16, "cc" * 16]
+    for i, dataset_id in enumerate(ids):
+        store.put(dataset_id, _frame())
+        stamp = time.time() - 100 + i
+        os.utime(store.path_for(dataset_id), (stamp, stamp))
+    store.get(ids[0])   # most recently used now
+    store.max_bytes = os.path.getsize(store.path_for(ids[0])) * 2
+    assert store.evict() == 1
+    assert ids[1] not in store and ids[0] in store and ids[2] in store
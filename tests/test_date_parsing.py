@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from utlis.date_parsing import format_cache, infer_date_format, parse_dates
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    format_cache.clear()
+    yield
+    format_cache.clear()
+
+
+def _dates(*values):
+    return [pd.Timestamp(v) for v in values]
+
+
+def test_day_first_is_preferred_when_ambiguous():
+    assert infer_date_format(["03/04/2024", "05/06/2024"]) == "%d/%m/%Y"
+    assert parse_dates(pd.Series(["03/04/2024"])).tolist() == _dates("2024-04-03")
+
+
+def test_cached_day_first_format_is_not_applied_to_month_first_file():
+    day_first = parse_dates(pd.Series(["13/01/2024", "05/02/2024", "04/03/2024"]))
+    assert day_first.tolist() == _dates("2024-01-13", "2024-02-05", "2024-03-04")
+
+    month_first = parse_dates(pd.Series(["01/13/2024", "02/05/2024", "03/04/2024"]))
+    assert month_first.tolist() == _dates("2024-01-13", "2024-02-05", "2024-03-04")
+
+
+def test_layout_settled_by_value_outside_the_sample():
+    days = pd.date_range("2024-01-01", periods=12, freq="D")
+    months = [pd.Timestamp(2020 + y, m, d.day) for y in range(10) for m in (1, 2) for d in days]
+    values = [ts.strftime("%m/%d/%Y") for ts in months]
+    # One month-first date with a day > 12, away from the evenly spaced sample
+    values.insert(5, "01/25/2031")
+    months.insert(5, pd.Timestamp("2031-01-25"))
+    assert parse_dates(pd.Series(values)).tolist() == months
+
+
+def test_repeated_values_and_missing():
+    series = pd.Series(["2024-01-05", None, "2024-01-05", "not a date"])
+    parsed = parse_dates(series)
+    assert parsed.iloc[0] == parsed.iloc[2] == pd.Timestamp("2024-01-05")
+    assert parsed.iloc[1:].isna().tolist() == [True, False, True]
+
+
+def test_datetime_input_passes_through():
+    series = pd.Series(pd.date_range("2024-01-01", periods=3))
+    assert parse_dates(series) is series
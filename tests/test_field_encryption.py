@@ -0,0 +1,99 @@
+import struct
+
+import pandas as pd
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from utlis.field_encryption import (
+    FILE_ID_SIZE, LEDGER_MAGIC, TenantKeyring, decrypt_columns, encrypt_columns,
+    iter_encrypted_ledger, read_encrypted_ledger, write_encrypted_ledger,
+)
+
+HEADER = len(LEDGER_MAGIC) + FILE_ID_SIZE
+
+
+@pytest.fixture
+def keyring():
+    return TenantKeyring(b"test-master-key")
+
+
+@pytest.fixture
+def ledger():
+    return pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=10, freq="D"),
+        "Revenue": [float(i * 100) for i in range(10)],
+        "Account Number": [f"{i:05d}" for i in range(10)],
+    })
+
+
+def _chunks(path):
+    """(header bytes, [raw chunk records])"""
+    data = open(path, "rb").read()
+    header, body = data[:HEADER + 4], data[HEADER + 4:]
+    records = []
+    while body:
+        (size,) = struct.unpack(">Q", body[:8])
+        end = 8 + 12 + size
+        records.append(body[:end])
+        body = body[end:]
+    return header, records
+
+
+def test_ledger_round_trip_keeps_dtypes(tmp_path, keyring, ledger):
+    path = tmp_path / "ledger.enc"
+    write_encrypted_ledger(ledger, path, "tenant-a", chunk_rows=3, keyring=keyring)
+    out = read_encrypted_ledger(path, "tenant-a", keyring=keyring)
+    pd.testing.assert_frame_equal(out, ledger)
+    assert out["Account Number"].iloc[1] == "00001"
+    assert len(list(iter_encrypted_ledger(path, "tenant-a", keyring=keyring))) == 4
+
+
+def test_wrong_tenant_fails(tmp_path, keyring, ledger):
+    path = tmp_path / "ledger.enc"
+    write_encrypted_ledger(ledger, path, "tenant-a", keyring=keyring)
+    with pytest.raises(InvalidTag):
+        read_encrypted_ledger(path, "tenant-b", keyring=keyring)
+
+
+def test_lowered_chunk_count_is_rejected(tmp_path, keyring, ledger):
+    path = tmp_path / "ledger.enc"
+    write_encrypted_ledger(ledger, path, "tenant-a", chunk_rows=3, keyring=keyring)
+    header, records = _chunks(path)
+    path.write_bytes(header[:HEADER] + struct.pack(">I", 2) + b"".join(records[:2]))
+    with pytest.raises(InvalidTag):
+        read_encrypted_ledger(path, "tenant-a", keyring=keyring)
+
+
+def test_truncated_file_is_rejected(tmp_path, keyring, ledger):
+    path = tmp_path / "ledger.enc"
+    write_encrypted_ledger(ledger, path, "tenant-a", chunk_rows=3, keyring=keyring)
+    header, records = _chunks(path)
+    path.write_bytes(header + b"".join(records[:-1]))
+    with pytest.raises(ValueError, match="truncated"):
+        read_encrypted_ledger(path, "tenant-a", keyring=keyring)
+
+
+def test_spliced_chunk_from_other_file_is_rejected(tmp_path, keyring, ledger):
+    first, second = tmp_path / "a.enc", tmp_path / "b.enc"
+    write_encrypted_ledger(ledger, first, "tenant-a", chunk_rows=3, keyring=keyring)
+    write_encrypted_ledger(ledger.assign(Revenue=-1.0), second, "tenant-a", chunk_rows=3, keyring=keyring)
+    header, records = _chunks(first)
+    _, other = _chunks(second)
+    first.write_bytes(header + records[0] + other[1] + b"".join(records[2:]))
+    with pytest.raises(InvalidTag):
+        read_encrypted_ledger(first, "tenant-a", keyring=keyring)
+
+
+def test_trailing_data_is_rejected(tmp_path, keyring, ledger):
+    path = tmp_path / "ledger.enc"
+    write_encrypted_ledger(ledger, path, "tenant-a", keyring=keyring)
+    path.write_bytes(path.read_bytes() + b"x")
+    with pytest.raises(ValueError, match="after its last chunk"):
+        read_encrypted_ledger(path, "tenant-a", keyring=keyring)
+
+
+def test_column_tokens_round_trip(keyring, ledger):
+    encrypted = encrypt_columns(ledger, "tenant-a", keyring=keyring)
+    assert encrypted["Account Number"].str.startswith("enc1:").all()
+    decrypted = decrypt_columns(encrypted, "tenant-a", keyring=keyring)
+    assert decrypted["Account Number"].tolist() == ledger["Account Number"].tolist()
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from utlis.holt_winters import ForecastCache, monthly_series, series_key
+
+
+def _ledger(months):
+    dates = pd.date_range("2021-01-01", periods=months, freq="MS")
+    season = 1 + 0.3 * np.sin(np.arange(months) * 2 * np.pi / 12)
+    return pd.DataFrame({"Date": dates, "Revenue": 1000 * season + 10 * np.arange(months)})
+
+
+def test_key_survives_appended_months_but_not_a_different_ledger():
+    this_month = monthly_series(_ledger(30))
+    next_month = monthly_series(_ledger(31))
+    assert series_key(this_month) == series_key(next_month)
+
+    other = _ledger(31).assign(Revenue=lambda d: d["Revenue"] * 2)
+    assert series_key(monthly_series(other)) != series_key(next_month)
+
+
+def test_next_upload_warm_starts_from_the_previous_fit():
+    cache = ForecastCache()
+    first = monthly_series(_ledger(30))
+    key = series_key(first)
+    cache.forecast_many({key: first.to_numpy()})
+    fitted_at = cache._entries[key]["fitted_steps"]
+
+    second = monthly_series(_ledger(31))
+    cache.forecast_many({series_key(second): second.to_numpy()})
+    entry = cache._entries[key]
+    # Updated by one step from the stored state, not refitted
+    assert entry["steps"] == 31 and entry["fitted_steps"] == fitted_at == 30
+    assert len(cache) == 1
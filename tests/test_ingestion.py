@@ -0,0 +1,32 @@
+import io
+
+import pytest
+from openpyxl import Workbook
+
+from utlis.ingestion import read_excel_fast
+
+
+def _xlsx(*sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets:
+        ws = workbook.create_sheet(name)
+        for row in rows:
+            ws.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_blank_header_row_is_a_clear_error():
+    data = _xlsx(("Sheet1", [[None, None, None], ["2024-01-31", 100, 60]]))
+    with pytest.raises(ValueError, match="no sheet with a header row"):
+        read_excel_fast(data)
+
+
+def test_blank_sheets_are_skipped():
+    data = _xlsx(("Cover", [[None, None], [None, "notes"]]),
+                 ("Ledger", [["Date", "Sales", "Expenses"], ["2024-01-31", 100, 60], ["2024-02-29", 120, 70]]))
+    df = read_excel_fast(data)
+    assert list(df.columns) == ["Date", "Revenue", "Expense"]
+    assert df["Revenue"].tolist() == [100.0, 120.0]
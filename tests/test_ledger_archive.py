@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utlis.ledger_archive import LedgerArchive
+
+
+def _ledger(rows):
+    return pd.DataFrame(rows, columns=["company_id", "Date", "Revenue", "Expense"])
+
+
+def test_same_day_transactions_are_all_kept(tmp_path):
+    archive = LedgerArchive.write(_ledger([
+        ("C1", "2024-01-05", 100.0, 10.0),
+        ("C1", "2024-01-05", 250.0, 20.0),
+        ("C1", "2024-02-01", 50.0, 5.0),
+        ("C2", "2024-01-05", 70.0, 7.0),
+    ]), root=str(tmp_path))
+
+    history = archive.history("C1")
+    assert history["Revenue"].tolist() == [100.0, 250.0, 50.0]
+    panel, months = archive.monthly_panel("Revenue", companies=["C1", "C2"])
+    assert panel[0].tolist() == [350.0, 50.0]
+    assert np.isnan(panel[1, 1])
+
+
+def test_merge_replaces_a_day_without_doubling_it(tmp_path):
+    archive = LedgerArchive.write(_ledger([
+        ("C1", "2024-01-05", 100.0, 10.0),
+        ("C1", "2024-01-05", 250.0, 20.0),
+        ("C1", "2024-01-06", 40.0, 4.0),
+    ]), root=str(tmp_path))
+
+    corrected = _ledger([
+        ("C1", "2024-01-05", 120.0, 10.0),
+        ("C1", "2024-01-05", 250.0, 20.0),
+        ("C1", "2024-01-07", 60.0, 6.0),
+    ])
+    archive = archive.merge(corrected)
+    archive = archive.merge(corrected)   # merging the same period twice changes nothing
+
+    assert archive.history("C1")["Revenue"].tolist() == [120.0, 250.0, 40.0, 60.0]
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+import utlis.liquidity
+from utlis.liquidity import PROFILE_FIELDS, company_profile, stress_test
+
+
+def _profile(**overrides):
+    profile = {
+        "monthly_revenue": 1000.0,
+        "monthly_expense": 1200.0,
+        "monthly_growth": 0.0,
+        "revenue_volatility": 0.0,
+        "opening_cash": 2000.0,
+        "receivables_days": 0.0,
+        "payables_days": 0.0,
+        "avg_loan": 0.0,
+    }
+    profile.update(overrides)
+    return profile
+
+
+def _portfolio(n=12):
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "monthly_revenue": rng.uniform(500, 5000, n),
+        "monthly_expense": rng.uniform(400, 5500, n),
+        "monthly_growth": rng.uniform(-0.05, 0.05, n),
+        "revenue_volatility": rng.uniform(0.0, 0.4, n),
+        "opening_cash": rng.uniform(-500, 20000, n),
+        "receivables_days": rng.uniform(0, 90, n),
+        "payables_days": rng.uniform(0, 60, n),
+        "avg_loan": rng.uniform(0, 10000, n),
+    }, columns=PROFILE_FIELDS)
+
+
+def test_known_burn_runs_out_in_eleven_months():
+    result = stress_test([_profile()], shocks=[{"name": "Baseline"}], n_paths=50)
+    # -200 a month from 2000: exactly zero after month 10, below it in month 11
+    assert result["runway_months"][0, 0] == 11
+    assert result["out_of_cash_probability"][0, 0] == 1.0
+    assert result["breach_probability"][0, 0] == 1.0
+
+
+def test_profitable_company_survives_the_horizon():
+    result = stress_test([_profile(monthly_expense=800.0)], shocks=[{"name": "Baseline"}], horizon=12, n_paths=50)
+    assert np.isinf(result["runway_months"][0, 0])
+    assert result["out_of_cash_probability"][0, 0] == 0.0
+
+
+def test_shocks_never_lengthen_the_runway():
+    # Includes companies spending well past their revenue and collecting slower than they pay
+    result = stress_test(_portfolio(60), n_paths=200)
+    runway = dict(zip(result["shocks"], result["runway_months"]))
+    out_of_cash = dict(zip(result["shocks"], result["out_of_cash_probability"]))
+    for name in result["shocks"][1:]:
+        assert (runway[name] <= runway["Baseline"]).all()
+        assert (out_of_cash[name] >= out_of_cash["Baseline"]).all()
+
+
+def test_chunking_does_not_change_results(monkeypatch):
+    profiles = _portfolio()
+    whole = stress_test(profiles, n_paths=40, horizon=12, seed=5)
+
+    # Small enough for one company per chunk
+    monkeypatch.setattr(utlis.liquidity, "_CHUNK_CELLS", 1)
+    chunked = stress_test(profiles, n_paths=40, horizon=12, seed=5)
+    for key in ("runway_months", "out_of_cash_probability", "breach_probability"):
+        np.testing.assert_allclose(chunked[key], whole[key])
+
+
+def test_company_profile_spreads_totals_over_months():
+    df = pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=4, freq="MS"),
+        "Revenue": [100.0, 110.0, 121.0, 133.1],
+    })
+    metrics = {"Revenue": 464.1, "Expense Ratio": 50.0, "Growth %": 33.1, "Working Capital": 75.0, "Avg Loan": np.nan}
+    profile = company_profile(df, metrics, {"receivables_days": 20, "payables_days": 40})
+    assert profile["monthly_revenue"] == 116.025
+    assert round(profile["monthly_growth"], 6) == 0.1
+    assert round(profile["revenue_volatility"], 6) == 0.0
+    assert profile["opening_cash"] == 75.0 and profile["avg_loan"] == 0.0
@@ -0,0 +1,53 @@
+import json
+import shutil
+import warnings
+
+import pytest
+
+from utlis import localization
+
+
+@pytest.fixture
+def locales(tmp_path, monkeypatch):
+    directory = tmp_path / "locales"
+    shutil.copytree(localization.LOCALE_DIR, directory)
+    monkeypatch.setattr(localization, "LOCALE_DIR", str(directory))
+    monkeypatch.setattr(localization, "MESSAGE_TABLE", str(directory / "messages.json"))
+    monkeypatch.setattr(localization, "_table", None)
+    monkeypatch.setattr(localization, "_bundles", {})
+    monkeypatch.setenv("LOCALE_BUNDLE_DIR", str(tmp_path / "bundles"))
+    return directory
+
+
+def _add_english_key(directory, key, text):
+    path = directory / "en.json"
+    catalog = json.loads(path.read_text(encoding="utf-8"))
+    catalog["ui"][key] = text
+    path.write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+
+
+def test_key_missing_from_the_message_table_still_resolves(locales):
+    _add_english_key(locales, "new_key", "Fresh text")
+    with pytest.warns(UserWarning, match="ui.new_key"):
+        table = localization.get_message_table()
+    assert table.keys[-1] == "ui.new_key"
+
+    # Untranslated in Tamil: English text, by key, ID and section view
+    tamil = localization.get_bundle("Tamil")
+    assert tamil["ui.new_key"] == "Fresh text"
+    assert tamil[localization.message_id("ui.new_key")] == "Fresh text"
+    assert tamil.section("ui")["new_key"] == "Fresh text"
+
+
+def test_compile_makes_the_new_id_permanent(locales):
+    _add_english_key(locales, "new_key", "Fresh text")
+    before = json.loads((locales / "messages.json").read_text(encoding="utf-8"))
+    assert localization.update_message_table() == 1
+    after = json.loads((locales / "messages.json").read_text(encoding="utf-8"))
+    assert after == before + ["ui.new_key"]
+
+    localization._table = None
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert localization.get_message_table().keys == tuple(after)
+
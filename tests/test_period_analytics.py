@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from utlis.period_analytics import compute_period_tables, period_analytics, period_cache
+
+
+def _ledger():
+    # March 2024 is missing; Q3 2024 is the only full quarter
+    dates = ["2024-01-15", "2024-02-10", "2024-04-20", "2024-07-01", "2024-08-01", "2024-09-01", "2025-01-10"]
+    revenue = [100.0, 150.0, 120.0, 100.0, 100.0, 100.0, 200.0]
+    return pd.DataFrame({
+        "Date": pd.to_datetime(dates),
+        "Revenue": revenue,
+        "Expense": [r * 0.5 for r in revenue],
+    })
+
+
+def _row(table, label):
+    return table.set_index("Label").loc[label]
+
+
+def test_growth_skips_missing_periods():
+    tables = compute_period_tables(_ledger())
+    month = tables["month"]
+    assert month["Label"].tolist()[:3] == ["2024-01", "2024-02", "2024-04"]
+    assert _row(month, "2024-02")["Revenue MoM %"] == 50.0
+    assert np.isnan(_row(month, "2024-04")["Revenue MoM %"])   # March has no data
+    assert _row(month, "2025-01")["Revenue YoY %"] == 100.0
+
+    quarter = tables["quarter"]
+    assert _row(quarter, "2024-Q2")["Revenue QoQ %"] == -52.0
+    assert _row(quarter, "2025-Q1")["Revenue YoY %"] == -20.0
+    assert _row(quarter, "2024-Q1")["Profit Margin"] == 50.0
+
+    year = tables["year"]
+    assert _row(year, "2025")["Revenue YoY %"] == -70.15
+    assert "Revenue MoM %" not in year and "Revenue QoQ %" not in year
+
+
+def test_complete_marks_periods_with_every_month():
+    tables = compute_period_tables(_ledger())
+    quarter = tables["quarter"].set_index("Label")["complete"]
+    assert quarter.to_dict() == {"2024-Q1": False, "2024-Q2": False, "2024-Q3": True, "2025-Q1": False}
+    assert not tables["year"]["complete"].any()
+    assert tables["month"]["complete"].all()
+
+
+def test_closing_balance_is_the_latest_reading_in_the_month():
+    df = pd.DataFrame({
+        "Date": pd.to_datetime(["2024-01-31", "2024-01-05", "2024-01-31", "2024-02-03", "2024-03-30"]),
+        "Revenue": [10.0, 10.0, 10.0, 10.0, 10.0],
+        "Receivable": [40.0, 999.0, 50.0, 70.0, 80.0],
+    })
+    tables = compute_period_tables(df)
+    # Jan 5 comes after Jan 31 in the rows but is not the month's latest date
+    assert tables["month"]["Receivable"].tolist() == [50.0, 70.0, 80.0]
+    assert tables["quarter"]["Receivable"].tolist() == [80.0]
+    assert tables["quarter"]["Revenue"].tolist() == [50.0]
+
+
+def test_companies_are_tabled_separately():
+    a = _ledger().assign(company_id="A")
+    b = _ledger().assign(company_id="B", Revenue=lambda d: d["Revenue"] * 2)
+    df = pd.concat([b, a], ignore_index=True)
+
+    quarter = compute_period_tables(df, company_col="company_id")["quarter"]
+    assert quarter.columns[0] == "company_id"
+    assert quarter["company_id"].tolist() == ["A"] * 4 + ["B"] * 4
+    by_company = quarter.set_index(["company_id", "Label"])
+    assert by_company.loc[("B", "2024-Q1"), "Revenue"] == 500.0
+    # Growth never compares one company's quarter with another's
+    assert np.isnan(by_company.loc[("B", "2024-Q1"), "Revenue QoQ %"])
+    assert by_company.loc[("B", "2024-Q2"), "Revenue QoQ %"] == -52.0
+
+
+def test_cache_tells_portfolios_apart_by_company():
+    period_cache.clear()
+    a = pd.concat([_ledger().assign(company_id="A"), _ledger().assign(company_id="B")], ignore_index=True)
+    b = a.assign(company_id=a["company_id"].map({"A": "X", "B": "Y"}))
+
+    assert set(period_analytics(a, "company_id")["month"]["company_id"]) == {"A", "B"}
+    assert set(period_analytics(b, "company_id")["month"]["company_id"]) == {"X", "Y"}
+    assert period_analytics(a, "company_id") is period_analytics(a.copy(), "company_id")
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utlis.pipeline
+from utlis.portfolio_runner import MANIFEST_NAME, PortfolioRunner, iter_results
+
+
+def _portfolio(n_companies=7, months=6):
+    frames = []
+    for i in range(n_companies):
+        revenue = 1000.0 * (i + 1) + np.arange(months) * 10
+        frames.append(pd.DataFrame({
+            "company_id": f"c{i}",
+            "industry": "Retail",
+            "Date": pd.date_range("2024-01-01", periods=months, freq="MS"),
+            "Revenue": revenue,
+            "Expense": revenue * 0.8,
+            "Loan": 500.0,
+            "Receivable": 200.0,
+            "Payable": 150.0,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _runner(out_dir, **kwargs):
+    return PortfolioRunner(str(out_dir), workers=1, shard_size=3, log=lambda message: None, **kwargs)
+
+
+def test_rerun_only_assesses_missing_shards(tmp_path):
+    df = _portfolio()
+    summary = _runner(tmp_path).run(df)
+    assert summary["shards"] == 3 and summary["skipped_shards"] == 0 and summary["errors"] == 0
+    first = list(iter_results(tmp_path))
+    assert [r["company_id"] for r in first] == [f"c{i}" for i in range(7)]
+    assert all("result" in r for r in first)
+
+    # A crash after shard 0 finished, mid-way through shard 1
+    (tmp_path / "shard-000001.jsonl").unlink()
+    (tmp_path / "shard-000001.jsonl.tmp").write_text('{"company_id": "c3"', encoding="utf-8")
+    untouched = (tmp_path / "shard-000000.jsonl").stat().st_mtime_ns
+
+    summary = _runner(tmp_path).run(df)
+    assert summary["skipped_shards"] == 2 and summary["companies"] == 7
+    assert not (tmp_path / "shard-000001.jsonl.tmp").exists()
+    assert (tmp_path / "shard-000000.jsonl").stat().st_mtime_ns == untouched
+    assert list(iter_results(tmp_path)) == first
+
+
+def test_refuses_a_different_portfolio_or_shard_size(tmp_path):
+    df = _portfolio()
+    _runner(tmp_path).run(df)
+    assert (tmp_path / MANIFEST_NAME).exists()
+
+    with pytest.raises(ValueError, match="different portfolio"):
+        _runner(tmp_path).run(df[df["company_id"] != "c6"])
+    with pytest.raises(ValueError, match="shard size"):
+        PortfolioRunner(str(tmp_path), workers=1, shard_size=2, log=lambda message: None).run(df)
+
+
+def test_a_failing_company_only_fails_its_own_record(tmp_path, monkeypatch):
+    assess = utlis.pipeline.run_assessment
+
+    def flaky(df, *args, **kwargs):
+        if df["Revenue"].iloc[0] == 4000.0:
+            raise ZeroDivisionError("bad ledger")
+        return assess(df, *args, **kwargs)
+
+    # Workers are forked when the run starts, so they inherit the patched function
+    monkeypatch.setattr(utlis.pipeline, "run_assessment", flaky)
+    summary = _runner(tmp_path).run(_portfolio())
+    assert summary["errors"] == 1
+
+    records = {r["company_id"]: r for r in iter_results(tmp_path)}
+    assert records["c3"]["error"] == "ZeroDivisionError: bad ledger"
+    assert "result" not in records["c3"]
+    assert all("result" in records[c] for c in records if c != "c3")
@@ -0,0 +1,46 @@
+import json
+import os
+import shutil
+import unicodedata
+
+import pytest
+import reportlab
+
+from utlis import report
+from utlis.localization import LOCALE_DIR
+
+
+@pytest.fixture
+def font_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPORT_FONT_DIR", str(tmp_path))
+    monkeypatch.setattr(report, "FONT_DIRS", [])
+    monkeypatch.setattr(report, "_font_files", None)
+    monkeypatch.setattr(report, "_fonts", {})
+    return tmp_path
+
+
+def test_indic_text_without_a_font_fails_loudly(font_dir):
+    assert report.markup("Revenue 100") == "Revenue 100"
+    with pytest.raises(RuntimeError, match="No Tamil font.*NotoSansTamil-Regular.ttf"):
+        report.markup("வருவாய்")
+
+
+def test_font_provisioned_after_a_failure_is_picked_up(font_dir):
+    with pytest.raises(RuntimeError):
+        report.script_font("Tamil")
+    shutil.copy(os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf"),
+                font_dir / "NotoSansTamil-Regular.ttf")
+    assert report.markup("லாபம்", bold=True) == '<font name="ReportTamil">லாபம்</font>'
+
+
+@pytest.mark.parametrize("code, script", [("ta", "TAMIL"), ("hi", "DEVANAGARI")])
+def test_catalog_is_written_in_its_own_script(code, script):
+    with open(os.path.join(LOCALE_DIR, f"{code}.json"), encoding="utf-8") as f:
+        catalog = json.load(f)
+    foreign = {
+        f"{section}.{key}"
+        for section, entries in catalog.items() for key, text in entries.items()
+        if any(ord(c) > 0x900 and unicodedata.category(c).startswith(("L", "M"))
+               and not unicodedata.name(c, "").startswith(script) for c in text)
+    }
+    assert not foreign
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from utlis.schema import has_required_columns, normalize_ledger, resolve_columns
+
+STATEMENT = pd.DataFrame({
+    "Txn Date": ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05", "2024-01-06"],
+    "Narration": ["NEFT ACME RETAIL INV 1021", "TERM LOAN DISBURSAL 5512", "UPI RENT JAN",
+                  "IMPS TRANSFER TO OWN ACCOUNT", None],
+    "Deposit Amt": [50000, 200000, None, None, 700],
+    "Withdrawal Amt": [None, None, 15000, 40000, 300],
+})
+
+
+def test_bank_columns_stay_separate_from_revenue_and_expense():
+    mapping = resolve_columns(("Date", "Credit", "Debit", "Narration"))
+    assert mapping == {"Date": "Date", "Credit": "Credit", "Debit": "Debit", "Narration": "Description"}
+    assert has_required_columns(mapping.values())
+    assert not has_required_columns(["Date", "Credit"])
+
+
+def test_non_operating_flows_are_left_out_of_revenue_and_expense():
+    df = normalize_ledger(STATEMENT)
+    assert df["Credit"].sum() == 250700
+    # The loan disbursal is a credit but not revenue; the own-account transfer is not an expense
+    assert df["Revenue"].tolist() == [50000, 0, 0, 0, 700]
+    assert df["Expense"].tolist() == [0, 0, 15000, 0, 300]
+
+
+def test_explicit_revenue_is_not_overridden():
+    df = normalize_ledger(pd.DataFrame({"Date": ["2024-01-02"], "Sales": [10.0], "Credit": [99.0],
+                                        "Expense": [4.0]}))
+    assert df["Revenue"].tolist() == [10.0] and df["Credit"].tolist() == [99.0]
@@ -0,0 +1,97 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utlis.shared_frame import SharedFrame, SharedFramePool
+
+
+def _ledger():
+    return pd.DataFrame({
+        "company_id": ["b", "a", None, "b", "a", "c", None],
+        "Revenue": [1.5, np.nan, 3.0, 4.0, 5.0, 6.0, 7.0],
+        "Units": np.arange(7, dtype=np.int64),
+        "Flag": [True, False, True, True, False, False, True],
+        "Maybe": pd.array([True, None, False, True, None, False, True], dtype="boolean"),
+        "Date": pd.date_range("2024-01-01", periods=7, freq="D", tz="Asia/Kolkata"),
+        "Category": ["rent", "sales", None, "sales", "rent", "tax", "rent"],
+    }, index=[70, 10, 60, 20, 50, 30, 40])
+
+
+def _expected(df):
+    """
+    The source rows as the shared view encodes them
+    """
+    return df.assign(
+        Maybe=df["Maybe"].astype("float64"),
+        Date=df["Date"].dt.tz_convert("UTC").dt.tz_localize(None).astype("datetime64[ns]"),
+        Category=df["Category"].astype(object),
+        company_id=df["company_id"].astype(object),
+    )
+
+
+def _as_source(view):
+    return view.astype({name: object for name in view.columns if isinstance(view[name].dtype, pd.CategoricalDtype)})
+
+
+def _rows(df):
+    return df
+
+
+def _group_rows(df):
+    return df
+
+
+def test_frame_round_trips_every_column_kind():
+    df = _ledger()
+    with SharedFrame.publish(df) as shared:
+        view = shared.frame()
+        assert isinstance(view["Category"].dtype, pd.CategoricalDtype)
+        assert view["Category"].cat.codes.dtype == np.int8
+        pd.testing.assert_frame_equal(_as_source(view), _expected(df))
+        pd.testing.assert_frame_equal(_as_source(shared.frame(2, 5)), _as_source(view).iloc[2:5])
+
+
+def test_range_index_keeps_its_start():
+    df = pd.DataFrame({"Revenue": [1.0, 2.0, 3.0]}, index=pd.RangeIndex(5, 8))
+    with SharedFrame.publish(df) as shared:
+        pd.testing.assert_frame_equal(shared.frame(1, 3), df.iloc[1:3])
+
+
+def test_groups_sort_missing_keys_last_and_skip_them():
+    df = _ledger()
+    with SharedFrame.publish(df, group_col="company_id") as shared:
+        assert shared.groups == ["a", "b", "c"]
+        assert shared.offsets.tolist() == [0, 2, 4, 5]
+        assert len(shared) == 7   # the two rows without a company sit past the last offset
+
+        ordered = _expected(df).sort_values("company_id", kind="stable").drop(columns="company_id")
+        for i, company in enumerate(shared.groups):
+            expected = ordered[df["company_id"].reindex(ordered.index) == company]
+            pd.testing.assert_frame_equal(_as_source(shared.group(i)), expected)
+
+
+def test_pool_workers_see_the_same_rows():
+    df = _ledger()
+    with SharedFramePool(df, workers=2, group_col="company_id", warm_modules=()) as pool:
+        local = pool.shared
+        by_group = pool.map_groups(_group_rows, chunksize=1)
+        assert list(by_group) == ["a", "b", "c"]
+        for i, company in enumerate(local.groups):
+            pd.testing.assert_frame_equal(by_group[company], local.group(i))
+
+        rows = pool.submit(_rows, rows=(1, 6), columns=["Revenue", "Date"]).result()
+        pd.testing.assert_frame_equal(rows, local.frame(1, 6, columns=["Revenue", "Date"]))
+
+
+def test_close_and_unlink_free_the_blocks():
+    shared = SharedFrame.publish(_ledger(), group_col="company_id")
+    names = list(shared.layout["blocks"].values())
+    assert "__offsets__" in shared.layout["blocks"] and "Category.categories" in shared.layout["blocks"]
+
+    shared.close()
+    shared.unlink()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
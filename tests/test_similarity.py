@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+
+from utlis.similarity import SIMILARITY_FEATURES, SimilarityIndex
+
+
+def _index(n=40, rebuild_every=16):
+    rng = np.random.default_rng(7)
+    index = SimilarityIndex(rebuild_every=rebuild_every)
+    matrix = rng.normal(size=(n, len(SIMILARITY_FEATURES)))
+    for i in range(n):
+        index.add([f"c{i}"], matrix[i], [{"Industry": "Retail", "Health Score": np.int64(i)}])
+    return index, matrix
+
+
+def test_round_trip_without_pickle(tmp_path):
+    index, matrix = _index()
+    path = str(tmp_path / "similarity_index.npz")
+    index.save(path)
+
+    with np.load(path, allow_pickle=False) as data:
+        assert data["raw"].shape == matrix.shape
+    meta = json.loads((tmp_path / "similarity_index.labels.json").read_text())
+    assert meta["labels"][3] == {"Industry": "Retail", "Health Score": 3}
+
+    loaded = SimilarityIndex.load(path)
+    assert len(loaded) == len(index) and "c5" in loaded
+    # Same neighbours from the rebuilt tree plus the unbuilt tail
+    assert loaded.query(matrix[5], k=4) == index.query(matrix[5], k=4)
+
+
+def test_load_lines_up_a_sidecar_written_ahead_of_the_vectors(tmp_path):
+    index, matrix = _index(n=10)
+    path = str(tmp_path / "similarity_index.npz")
+    index.save(path)
+    # Crash after the sidecar write but before the vectors: one id too many
+    with open(index._labels_path(path), "w", encoding="utf-8") as f:
+        json.dump({"ids": index.ids + ["late"], "labels": [{} for _ in range(11)]}, f)
+
+    loaded = SimilarityIndex.load(path)
+    assert len(loaded) == 10 and "late" not in loaded
+
+
+def test_saves_are_debounced(tmp_path):
+    index, matrix = _index(n=3)
+    path = str(tmp_path / "similarity_index.npz")
+    assert not index.save_if_due(path, interval=3600)
+    assert not (tmp_path / "similarity_index.npz").exists()
+    index.flush(path)
+    assert len(SimilarityIndex.load(path)) == 3
+    assert not index.save_if_due(path, interval=0)   # nothing new since the flush
+
+
+def test_inserts_grow_the_buffer_geometrically():
+    index = SimilarityIndex(rebuild_every=10_000)
+    rng = np.random.default_rng(1)
+    buffers = set()
+    for i in range(500):
+        index.add([f"c{i}"], rng.normal(size=len(SIMILARITY_FEATURES)))
+        buffers.add(id(index._buffer))
+    assert len(index._raw) == 500
+    assert len(buffers) <= 5   # 64, 128, 256, 512: one copy per doubling, not per insert
+
+
+def test_missing_features_count_as_the_median():
+    index = SimilarityIndex(rebuild_every=1)
+    revenue_scale = np.array([[5.0, 60.0, 2.0, 1e6, 40.0],
+                              [10.0, 70.0, 4.0, 2e6, 50.0],
+                              [15.0, 80.0, 6.0, 3e6, 60.0]])
+    index.add(["low", "mid", "high"], revenue_scale)
+    gap = np.array([10.0, 70.0, 4.0, np.nan, 50.0])
+    index.add(["gap"], gap)
+
+    # NaN Working Capital sits on the median company, not at zero
+    assert index.query(gap, k=1, exclude_id="gap")[0]["company_id"] == "mid"
+    assert {r["company_id"] for r in index.query(revenue_scale[1], k=2)} == {"mid", "gap"}
+    assert index._center[3] == index._raw[1, 3]
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from utlis.scoring import health_score
+from utlis.what_if import SLIDER_RANGES, WhatIfSession, evaluate_grid, slider_bounds, tornado
+
+BASE = {"Profit Margin": 12.0, "Expense Ratio": 80.0, "Growth %": 5.0, "Working Capital": 1000.0}
+
+
+@pytest.mark.parametrize("metric, value", [
+    ("Profit Margin", -180.4), ("Profit Margin", 75.0),
+    ("Expense Ratio", 312.7), ("Expense Ratio", -3.0),
+    ("Growth %", 455.0), ("Growth %", -99.9),
+])
+def test_slider_bounds_contain_out_of_range_base(metric, value):
+    lo, hi, default = slider_bounds(metric, value)
+    assert lo <= default <= hi
+    assert lo <= SLIDER_RANGES[metric][0] and hi >= SLIDER_RANGES[metric][1]
+
+
+def test_slider_bounds_keep_default_range_for_in_range_base():
+    assert slider_bounds("Profit Margin", 12.34) == (-50.0, 60.0, 12.3)
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_slider_bounds_non_finite_base(value):
+    lo, hi, default = slider_bounds("Growth %", value)
+    assert np.isfinite([lo, hi, default]).all() and lo <= default <= hi
+
+
+def test_grid_matches_scalar_score():
+    deltas = {"Profit Margin": [-20, 0, 20], "Expense Ratio": [-30, 0, 30]}
+    grid = evaluate_grid(BASE, deltas)
+    assert grid["score"].shape == (3, 3)
+    for i, dm in enumerate(deltas["Profit Margin"]):
+        for j, de in enumerate(deltas["Expense Ratio"]):
+            metrics = dict(BASE, **{"Profit Margin": BASE["Profit Margin"] + dm,
+                                    "Expense Ratio": BASE["Expense Ratio"] + de})
+            assert grid["score"][i, j] == health_score(metrics)
+
+
+def test_grid_rejects_unknown_metric():
+    with pytest.raises(ValueError):
+        evaluate_grid(BASE, {"Revenue": [1, 2]})
+
+
+def test_session_tracks_grid():
+    session = WhatIfSession(BASE)
+    assert session.base_score == health_score(BASE)
+    session.set("Profit Margin", -200.0)
+    expected = int(evaluate_grid(BASE, {"Profit Margin": [-212.0]})["score"][0])
+    assert session.result()["score"] == expected
+    session.reset()
+    assert session.result()["score_change"] == 0
+
+
+def test_tornado_sorted_by_swing():
+    rows = tornado(BASE, {"Profit Margin": (-5, 5), "Growth %": (-1, 1)})["rows"]
+    assert [row["swing"] for row in rows] == sorted((row["swing"] for row in rows), reverse=True)
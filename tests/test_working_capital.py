@@ -0,0 +1,30 @@
+import pandas as pd
+
+from utlis.working_capital import analyze_working_capital, working_capital_timeseries
+
+
+def _ledger(**balances):
+    dates = pd.date_range("2024-01-01", periods=6, freq="MS")
+    return pd.DataFrame({"Date": dates, "Revenue": 1000.0, "Expense": 600.0, **balances})
+
+
+def test_missing_balances_use_the_same_defaults_in_both_paths():
+    df = _ledger()
+    scalar = analyze_working_capital(df, df["Revenue"].sum(), df["Expense"].sum())
+    series = working_capital_timeseries(df)
+    for column in ("receivables_days", "payables_days", "inventory_days", "cash_conversion_cycle"):
+        assert (series[column] == scalar[column]).all(), column
+    assert scalar["cash_conversion_cycle"] == 30 + 60 - 45
+
+
+def test_balance_without_flow_falls_back_to_the_default():
+    df = _ledger(Inventory=500.0).assign(Expense=0.0)
+    assert analyze_working_capital(df, df["Revenue"].sum(), 0.0)["inventory_days"] == 60
+    assert (working_capital_timeseries(df)["inventory_days"] == 60).all()
+
+
+def test_reported_balances_give_turnover_days():
+    df = _ledger(Receivable=1000.0)
+    # 1000 receivable against 1000 revenue a month: about one month of sales outstanding
+    days = working_capital_timeseries(df)["receivables_days"]
+    assert days.between(28, 32).all()
@@ -1,4 +1,23 @@
-def get_advice(metrics):
+"""
+AI Advisor Module
+Generates financial advice from metrics using a pluggable LLM backend,
+with a rule-based fallback when no provider is available
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utlis.instrumentation import instrument
+
+
+# =====================================================
+# RULE-BASED ADVICE (FALLBACK)
+# =====================================================
+def rule_based_advice(metrics):
 
     advice = []
 
@@ -27,3 +46,349 @@ def get_advice(metrics):
     return "\n\n".join(advice)
 
 
+# =====================================================
+# PROMPT
+# =====================================================
+PROMPT_METRICS = ["Revenue", "Profit Margin", "Expense Ratio", "Growth %", "Avg Loan", "Working Capital"]
+
+
+def build_prompt(metrics):
+    """
+    Builds the advisor prompt from a metrics dict.
+    Values are rounded so near-identical profiles share one prompt (and one cache entry)
+    """
+    lines = []
+    for key in PROMPT_METRICS:
+        if key in metrics:
+            lines.append(f"- {key}: {round(float(metrics[key]), 1)}")
+
+    return (
+        "You are a financial advisor for Indian small and medium businesses.\n"
+        "Given these financial metrics, give 3-5 short, actionable recommendations "
+        "as separate paragraphs.\n\n" + "\n".join(lines)
+    )
+
+
+# =====================================================
+# RESPONSE CACHE
+# =====================================================
+class AdviceCache:
+    """
+    Thread-safe LRU cache of advice text keyed by prompt, with a TTL per entry
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider_name, prompt):
+        return hashlib.sha256(f"{provider_name}\x00{prompt}".encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# =====================================================
+# PROVIDERS
+# =====================================================
+class AdvisorProvider:
+    """
+    Base class for advice backends. Subclasses implement `acomplete`, and
+    `_make_client` when they talk to an async SDK.
+
+    An async SDK client is bound to the event loop it first runs on, and every
+    `advise_many` call runs its own loop, so clients are kept per running loop
+    and closed by `aclose` when that loop's batch is done
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def _make_client(self):
+        return None
+
+    def client(self):
+        """
+        The SDK client for the running event loop, created on first use
+        """
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = self._make_client()
+            return client
+
+    async def aclose(self):
+        with self._clients_lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    async def acomplete(self, prompt):
+        raise NotImplementedError
+
+
+class MockProvider(AdvisorProvider):
+    """
+    Offline provider for tests and demos. Echoes rule-based advice after an optional delay
+    """
+
+    name = "mock"
+
+    def __init__(self, delay=0.0, fail=False):
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def acomplete(self, prompt):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("Mock provider failure")
+
+        metrics = {}
+        for line in prompt.splitlines():
+            if line.startswith("- ") and ": " in line:
+                key, value = line[2:].split(": ", 1)
+                metrics[key] = float(value)
+        return "🤖 " + rule_based_advice(metrics)
+
+
+class OpenAIProvider(AdvisorProvider):
+    """
+    OpenAI chat completions backend (requires `openai` and OPENAI_API_KEY)
+    """
+
+    name = "openai"
+
+    def __init__(self, model=None, api_key=None):
+        import openai  # noqa: F401  (fail here, not on the first request)
+
+        super().__init__()
+        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+
+    def _make_client(self):
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(api_key=self.api_key)
+
+    async def acomplete(self, prompt):
+        response = await self.client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=400,
+        )
+        return response.choices[0].message.content
+
+
+class AnthropicProvider(AdvisorProvider):
+    """
+    Anthropic messages backend (requires `anthropic` and ANTHROPIC_API_KEY)
+    """
+
+    name = "anthropic"
+
+    def __init__(self, model=None, api_key=None):
+        import anthropic  # noqa: F401  (fail here, not on the first request)
+
+        super().__init__()
+        self.model = model or os.getenv("ANTHROPIC_MODEL", "claude-3-5-haiku-latest")
+        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+
+    def _make_client(self):
+        from anthropic import AsyncAnthropic
+
+        return AsyncAnthropic(api_key=self.api_key)
+
+    async def acomplete(self, prompt):
+        response = await self.client().messages.create(
+            model=self.model,
+            max_tokens=400,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return "".join(block.text for block in response.content if getattr(block, "text", None))
+
+
+PROVIDERS = {
+    "mock": MockProvider,
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+}
+
+
+def get_provider(name=None):
+    """
+    Returns a provider instance by name (defaults to the ADVISOR_PROVIDER env var).
+    Returns None when no provider is configured or its client library is missing
+    """
+    name = (name or os.getenv("ADVISOR_PROVIDER", "")).lower()
+    if name not in PROVIDERS:
+        return None
+    try:
+        return PROVIDERS[name]()
+    except Exception:
+        return None
+
+
+# =====================================================
+# ADVISOR ENGINE
+# =====================================================
+class AdvisorEngine:
+    """
+    Runs advice requests against a provider with caching, coalescing of identical
+    prompts, bounded concurrency and a per-request latency budget
+    """
+
+    def __init__(self, provider=None, cache=None, max_concurrency=8, timeout=5.0):
+        self.provider = provider
+        self.cache = cache if cache is not None else AdviceCache()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    async def _advise_one(self, metrics, semaphore, in_flight):
+        prompt = build_prompt(metrics)
+        if self.provider is None:
+            return rule_based_advice(metrics)
+
+        key = AdviceCache.make_key(self.provider.name, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Coalesce identical prompts into one provider call
+        task = in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call_provider(prompt, semaphore))
+            in_flight[key] = task
+
+        text = await task
+        if text is None:
+            return rule_based_advice(metrics)
+
+        self.cache.set(key, text)
+        return text
+
+    async def _call_provider(self, prompt, semaphore):
+        async def call():
+            async with semaphore:
+                return await self.provider.acomplete(prompt)
+
+        # One deadline covers queueing for a slot and the call itself
+        try:
+            text = await asyncio.wait_for(call(), self.timeout)
+        except Exception:
+            return None
+        return text or None
+
+    async def advise_many_async(self, metrics_list):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        in_flight = {}
+        try:
+            return await asyncio.gather(
+                *(self._advise_one(m, semaphore, in_flight) for m in metrics_list)
+            )
+        finally:
+            # The provider's client belongs to this loop, which ends with the batch
+            if self.provider is not None:
+                await self.provider.aclose()
+
+    def advise_many(self, metrics_list):
+        """
+        Synchronous entry point. Safe to call from threads with or without a running loop
+        """
+        metrics_list = list(metrics_list)
+        if not metrics_list:
+            return []
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.advise_many_async(metrics_list))
+
+        # Already inside an event loop: run on a helper thread
+        result = {}
+
+        def run():
+            try:
+                result["value"] = asyncio.run(self.advise_many_async(metrics_list))
+            except BaseException as e:
+                result["error"] = e
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        worker.join()
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_default_engine():
+    """
+    Returns the process-wide engine, configured from environment variables on first use
+    """
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = AdvisorEngine(
+                provider=get_provider(),
+                max_concurrency=int(os.getenv("ADVISOR_MAX_CONCURRENCY", "8")),
+                timeout=float(os.getenv("ADVISOR_TIMEOUT", "5")),
+            )
+        return _default_engine
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+@instrument("ai_advisor.get_advice")
+def get_advice(metrics, engine=None):
+    """
+    Returns advice text for one metrics dict
+    """
+    engine = engine or get_default_engine()
+    return engine.advise_many([metrics])[0]
+
+
+@instrument("ai_advisor.get_portfolio_advice")
+def get_portfolio_advice(metrics_list, engine=None):
+    """
+    Returns advice text for many companies, issuing provider calls concurrently
+    """
+    engine = engine or get_default_engine()
+    return engine.advise_many(metrics_list)
@@ -0,0 +1,214 @@
+"""
+Anomaly Detection Module
+Vectorized robust outlier scoring against rolling and seasonal (calendar month)
+baselines, across one or many companies at once
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+
+# Scale factor that makes MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+DEFAULT_THRESHOLD = 3.5
+# MAD floor as a fraction of the baseline, so a handful of near-identical
+# months does not turn ordinary noise into "outliers"
+MIN_RELATIVE_MAD = 0.05
+
+# Upper bound on cells per chunk of the leave-one-out seasonal baseline
+_CHUNK_CELLS = 4_000_000
+
+
+def _robust_z(values, median, mad):
+    mad = np.maximum(mad, MIN_RELATIVE_MAD * np.abs(median))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (values - median) / (MAD_SCALE * mad)
+    z[~np.isfinite(z)] = 0.0
+    return z
+
+
+def _trailing_baseline(values, keys, order, window):
+    """
+    Median, MAD and count of the previous `window` points of each key, with
+    rows in `order` (by key, then date). Baselines come from previous points
+    only (shift before rolling), so a spike never dilutes its own baseline
+    """
+    sorted_keys = keys[order]
+    s = pd.Series(values[order])
+    grouped = s.groupby(sorted_keys)
+    previous = grouped.shift(1)
+    rolling_median = previous.groupby(sorted_keys).rolling(window, min_periods=1).median().to_numpy()
+    deviation = pd.Series(np.abs(values[order] - rolling_median)).groupby(sorted_keys).shift(1)
+    rolling_mad = deviation.groupby(sorted_keys).rolling(window, min_periods=1).median().to_numpy()
+    rolling_count = grouped.cumcount().to_numpy()
+
+    median = np.empty_like(values)
+    mad = np.empty_like(values)
+    counts = np.empty(len(values))
+    median[order] = rolling_median
+    mad[order] = rolling_mad
+    counts[order] = np.minimum(rolling_count, window)
+    return median, mad, counts
+
+
+def _leave_one_out_baseline(values, keys):
+    """
+    Median, MAD and count of the other points with the same key, so a spike
+    never dilutes its own baseline. Each key's values are padded into one row
+    of a (keys, n) matrix and every point is masked out of its own copy of that
+    row; keys are processed in chunks of at most _CHUNK_CELLS cells
+    """
+    order = np.argsort(keys, kind="stable")
+    _, group, sizes = np.unique(keys[order], return_inverse=True, return_counts=True)
+    position = np.arange(len(order)) - np.concatenate([[0], np.cumsum(sizes)[:-1]])[group]
+    width = int(sizes.max(initial=1))
+    padded = np.full((len(sizes), width), np.nan)
+    padded[group, position] = values[order]
+
+    median = np.empty(padded.shape)
+    mad = np.empty(padded.shape)
+    counts = np.empty(padded.shape)
+    chunk = max(1, _CHUNK_CELLS // (width * width))
+    diagonal = np.arange(width)
+    for start in range(0, len(sizes), chunk):
+        others = np.repeat(padded[start:start + chunk, None, :], width, axis=1)
+        others[:, diagonal, diagonal] = np.nan
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # keys with a single point
+            block_median = np.nanmedian(others, axis=2)
+            mad[start:start + chunk] = np.nanmedian(np.abs(others - block_median[..., None]), axis=2)
+        median[start:start + chunk] = block_median
+        counts[start:start + chunk] = np.count_nonzero(~np.isnan(others), axis=2)
+
+    out = [np.empty(len(values)) for _ in range(3)]
+    for target, source in zip(out, (median, mad, counts)):
+        target[order] = source[group, position]
+    return tuple(out)
+
+
+@instrument("anomaly_detection.detect_anomalies")
+def detect_anomalies(df, columns=("Revenue", "Expense"), company_col="company_id", date_col="Date",
+                     method="seasonal", window=12, min_periods=3, threshold=DEFAULT_THRESHOLD):
+    """
+    Scores every row of a (possibly multi-company) ledger in one pass.
+
+    method="seasonal": baseline is the median/MAD of the same calendar month
+    in the company's other years, leaving the scored point out (needs a few
+    years of history to be meaningful).
+    method="rolling": baseline is a rolling median/MAD of the previous
+    `window` periods for the same company.
+
+    Returns {"scores": {col: float array}, "masks": {col: bool array},
+    "any": bool array}, all aligned with df's row order
+    """
+    columns = [c for c in columns if c in df.columns]
+    companies = df[company_col] if company_col in df.columns else pd.Series(0, index=df.index)
+    company_codes = pd.factorize(companies)[0]
+
+    if method == "seasonal":
+        months = pd.to_datetime(df[date_col]).dt.month.to_numpy() - 1
+        keys = company_codes * 12 + months
+    else:
+        keys = company_codes
+        # Sort by company then date so rolling windows stay within each company
+        order = np.lexsort((pd.to_datetime(df[date_col]).to_numpy(), keys)) \
+            if date_col in df.columns else np.argsort(keys, kind="stable")
+
+    scores, masks = {}, {}
+    for col in columns:
+        values = df[col].to_numpy(dtype=float)
+        if method == "seasonal":
+            median, mad, counts = _leave_one_out_baseline(values, keys)
+        else:
+            median, mad, counts = _trailing_baseline(values, keys, order, window)
+        z = _robust_z(values, median, mad)
+        z[counts < min_periods] = 0.0
+        scores[col] = z
+        masks[col] = np.abs(z) > threshold
+
+    any_mask = np.zeros(len(df), dtype=bool)
+    for mask in masks.values():
+        any_mask |= mask
+
+    return {"scores": scores, "masks": masks, "any": any_mask}
+
+
+class SeasonalBaseline:
+    """
+    Streaming per-company, per-calendar-month baselines.
+
+    Keeps the last `depth` observations for every (company, month, column) in a
+    ring buffer of shape (companies, 12, depth). Scoring a new month of data for
+    the whole portfolio is one gather + nanmedian over that buffer; recording it
+    is one scatter.
+    """
+
+    def __init__(self, columns=("Revenue", "Expense"), depth=5, min_periods=3, threshold=DEFAULT_THRESHOLD):
+        self.columns = list(columns)
+        self.depth = depth
+        self.min_periods = min_periods
+        self.threshold = threshold
+        self.company_index = pd.Index([])
+        self._history = {col: np.full((0, 12, depth), np.nan) for col in self.columns}
+        self._cursor = np.zeros((0, 12), dtype=np.int64)
+
+    def _positions(self, company_ids):
+        company_ids = pd.Index(company_ids)
+        new = company_ids.difference(self.company_index).unique()
+        if len(new):
+            self.company_index = self.company_index.append(new)
+            grow = len(new)
+            for col in self.columns:
+                pad = np.full((grow, 12, self.depth), np.nan)
+                self._history[col] = np.concatenate([self._history[col], pad])
+            self._cursor = np.concatenate([self._cursor, np.zeros((grow, 12), dtype=np.int64)])
+        return self.company_index.get_indexer(company_ids)
+
+    def score(self, company_ids, dates, values):
+        """
+        Scores observations against the stored baselines without recording them.
+        `values` maps column -> array aligned with company_ids
+        """
+        rows = self._positions(company_ids)
+        months = pd.to_datetime(pd.Series(dates)).dt.month.to_numpy() - 1
+
+        scores, masks = {}, {}
+        for col in self.columns:
+            history = self._history[col][rows, months]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices for new companies
+                median = np.nanmedian(history, axis=1)
+                mad = np.nanmedian(np.abs(history - median[:, None]), axis=1)
+            z = _robust_z(np.asarray(values[col], dtype=float), median, mad)
+            z[np.sum(~np.isnan(history), axis=1) < self.min_periods] = 0.0
+            scores[col] = z
+            masks[col] = np.abs(z) > self.threshold
+        return {"scores": scores, "masks": masks}
+
+    def update(self, company_ids, dates, values):
+        """
+        Scores new observations, then records them in the baselines
+        """
+        result = self.score(company_ids, dates, values)
+
+        rows = self.company_index.get_indexer(pd.Index(company_ids))
+        months = pd.to_datetime(pd.Series(dates)).dt.month.to_numpy() - 1
+        slots = self._cursor[rows, months] % self.depth
+        for col in self.columns:
+            self._history[col][rows, months, slots] = np.asarray(values[col], dtype=float)
+        np.add.at(self._cursor, (rows, months), 1)
+        return result
+
+    def fit(self, df, company_col="company_id", date_col="Date"):
+        """
+        Loads history month by month (oldest first) so the ring buffers hold the latest values
+        """
+        df = df.sort_values(date_col)
+        periods = pd.to_datetime(df[date_col]).dt.to_period("M")
+        for _, chunk in df.groupby(periods, sort=True):
+            self.update(chunk[company_col].to_numpy(), chunk[date_col].to_numpy(),
+                        {col: chunk[col].to_numpy() for col in self.columns})
+        return self
@@ -0,0 +1,354 @@
+"""
+Audit Log Module
+Append-only JSON-lines audit trail written off the request path
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from utlis.security_compliance import DataSecurityManager
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """
+    Buffered audit writer.
+
+    `log()` only enqueues the event; a background thread drains the queue in
+    batches, appends them to the active segment file, fsyncs periodically and
+    rotates segments by size. Every written event is also recorded in an index
+    (user_id, timestamp, segment, byte offset) so queries by user and time range
+    seek straight to matching lines instead of scanning every segment.
+
+    Events are never dropped for lack of room: when the queue stays full for
+    `put_timeout` seconds, or a batch fails to write, the events are appended
+    to a spill file that the writer folds back into the log. A failing writer
+    logs the error and keeps going, and a writer thread that has died is
+    restarted by the next `log()`.
+    """
+
+    INDEX_FILE = "audit.index.jsonl"
+    SPILL_FILE = "audit.spill.jsonl"
+
+    def __init__(self, directory="audit_logs", max_bytes=10 * 1024 * 1024,
+                 batch_size=256, flush_interval=0.5, fsync_interval=2.0, max_queue=100000,
+                 put_timeout=1.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.put_timeout = put_timeout
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._dropped = 0
+        self._spill_lock = threading.Lock()
+        self._writer_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._index = {}  # user_id -> ([timestamps], [(segment, offset)])
+
+        self._segment_number = self._latest_segment_number()
+        self._segment = None
+        self._index_file = None
+        self._last_fsync = time.monotonic()
+
+        self._load_index()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------------------------------------
+    # PRODUCER SIDE
+    # -------------------------------------------------
+    def log(self, action, user_id, data_accessed, status="success", **extra):
+        """
+        Enqueues an audit event, waiting at most `put_timeout` seconds for room
+        before writing it to the spill file instead
+        """
+        event = DataSecurityManager.create_audit_log(action, user_id, data_accessed, status)
+        event.update(extra)
+        self._ensure_writer()
+        try:
+            self._queue.put(event, timeout=self.put_timeout)
+        except queue.Full:
+            self._spill([event])
+        return event
+
+    @property
+    def dropped(self):
+        """
+        Events lost because they could neither be queued nor spilled to disk
+        """
+        return self._dropped
+
+    def _spill(self, events):
+        lines = "".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in events)
+        try:
+            with self._spill_lock:
+                with open(os.path.join(self.directory, self.SPILL_FILE), "a", encoding="utf-8") as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError:
+            self._dropped += len(events)
+            logger.exception("Could not spill %d audit events to disk", len(events))
+
+    def _ensure_writer(self):
+        if self._thread.is_alive() or self._stop.is_set():
+            return
+        with self._writer_lock:
+            if not self._thread.is_alive() and not self._stop.is_set():
+                logger.error("Audit log writer thread had stopped; restarting it")
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout=5.0):
+        """
+        Blocks until everything enqueued so far is written and fsynced
+        """
+        done = threading.Event()
+        self._queue.put(done, timeout=timeout)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+
+    # -------------------------------------------------
+    # WRITER THREAD
+    # -------------------------------------------------
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = []
+            try:
+                if self._segment is None:
+                    self._open_segment()
+                batch, markers = self._drain()
+                if batch:
+                    self._write_batch(batch)
+                spilled = self._replay_spill()
+                now = time.monotonic()
+                if markers or ((batch or spilled) and now - self._last_fsync >= self.fsync_interval):
+                    self._fsync()
+                for marker in markers:
+                    marker.set()
+            except Exception:
+                logger.exception("Audit log writer failed; spilling %d events and retrying", len(batch))
+                if batch:
+                    self._spill(batch)
+                self._close_files()
+                self._stop.wait(self.flush_interval)
+
+        try:
+            if self._segment is None:
+                self._open_segment()
+            self._replay_spill()
+        except Exception:
+            logger.exception("Could not write spilled audit events at shutdown; they stay in %s", self.SPILL_FILE)
+        self._close_files()
+
+    def _replay_spill(self):
+        """
+        Moves spilled events into the log. Returns the number written.
+        A crash mid-replay can write some of them twice, never lose them
+        """
+        path = os.path.join(self.directory, self.SPILL_FILE)
+        replay_path = f"{path}.replay"
+        if not os.path.exists(replay_path):
+            with self._spill_lock:
+                if not os.path.exists(path):
+                    return 0
+                os.replace(path, replay_path)
+
+        events = []
+        with open(replay_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue  # partially written last line after a crash
+        for start in range(0, len(events), self.batch_size):
+            self._write_batch(events[start:start + self.batch_size])
+        self._fsync()
+        os.remove(replay_path)
+        return len(events)
+
+    def _close_files(self):
+        try:
+            self._fsync()
+        except OSError:
+            logger.exception("Could not fsync the audit log")
+        for handle in (self._segment, self._index_file):
+            if handle is not None:
+                handle.close()
+        self._segment = None
+        self._index_file = None
+
+    def _drain(self):
+        batch, markers = [], []
+        try:
+            item = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, markers
+
+        while True:
+            if isinstance(item, threading.Event):
+                markers.append(item)
+            else:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return batch, markers
+
+    def _write_batch(self, batch):
+        segment_name = self._segment_name(self._segment_number)
+        offset = self._segment.tell()
+
+        lines, index_lines, entries = [], [], []
+        for event in batch:
+            line = (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            lines.append(line)
+            ts = event["timestamp"]
+            index_lines.append(json.dumps({
+                "user_id": event["user_id"], "timestamp": ts,
+                "segment": segment_name, "offset": offset
+            }) + "\n")
+            entries.append((event["user_id"], ts, segment_name, offset))
+            offset += len(line)
+
+        self._segment.write(b"".join(lines))
+        self._index_file.write("".join(index_lines))
+        self._segment.flush()
+        self._index_file.flush()
+
+        with self._index_lock:
+            for user_id, ts, segment, line_offset in entries:
+                self._add_to_index(user_id, ts, segment, line_offset)
+
+        if self._segment.tell() >= self.max_bytes:
+            self._fsync()
+            self._segment.close()
+            self._segment_number += 1
+            self._segment = open(self._segment_path(self._segment_number), "ab")
+
+    def _fsync(self):
+        if self._segment is None:
+            return
+        self._segment.flush()
+        self._index_file.flush()
+        os.fsync(self._segment.fileno())
+        os.fsync(self._index_file.fileno())
+        self._last_fsync = time.monotonic()
+
+    # -------------------------------------------------
+    # SEGMENTS & INDEX
+    # -------------------------------------------------
+    @staticmethod
+    def _segment_name(number):
+        return f"audit-{number:06d}.jsonl"
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, self._segment_name(number))
+
+    def _latest_segment_number(self):
+        numbers = [
+            int(name[6:12]) for name in os.listdir(self.directory)
+            if name.startswith("audit-") and name.endswith(".jsonl")
+        ]
+        return max(numbers) if numbers else 1
+
+    def _open_segment(self):
+        self._segment = open(self._segment_path(self._segment_number), "ab")
+        self._index_file = open(os.path.join(self.directory, self.INDEX_FILE), "a", encoding="utf-8")
+
+    def _add_to_index(self, user_id, ts, segment, offset):
+        timestamps, locations = self._index.setdefault(user_id, ([], []))
+        # Events arrive in time order, so appending keeps the lists sorted
+        if timestamps and ts < timestamps[-1]:
+            position = bisect_right(timestamps, ts)
+            timestamps.insert(position, ts)
+            locations.insert(position, (segment, offset))
+        else:
+            timestamps.append(ts)
+            locations.append((segment, offset))
+
+    def _load_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # partially written last line after a crash
+                self._add_to_index(entry["user_id"], entry["timestamp"], entry["segment"], entry["offset"])
+
+    # -------------------------------------------------
+    # QUERIES
+    # -------------------------------------------------
+    def query(self, user_id, start=None, end=None):
+        """
+        Returns audit events for a user within [start, end] (datetimes or ISO strings)
+        """
+        start = start.isoformat() if isinstance(start, datetime) else start
+        end = end.isoformat() if isinstance(end, datetime) else end
+
+        with self._index_lock:
+            timestamps, locations = self._index.get(user_id, ([], []))
+            lo = bisect_left(timestamps, start) if start else 0
+            hi = bisect_right(timestamps, end) if end else len(timestamps)
+            wanted = locations[lo:hi]
+
+        events = []
+        handles = {}
+        try:
+            for segment, offset in wanted:
+                handle = handles.get(segment)
+                if handle is None:
+                    handle = handles[segment] = open(os.path.join(self.directory, segment), "rb")
+                handle.seek(offset)
+                events.append(json.loads(handle.readline()))
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return events
+
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+
+def get_audit_logger(directory=None):
+    """
+    Returns the process-wide audit writer (directory from AUDIT_LOG_DIR, default ./audit_logs)
+    """
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = AuditLogWriter(directory or os.getenv("AUDIT_LOG_DIR", "audit_logs"))
+        return _default_writer
+
+
+def record_audit_event(action, user_id, data_accessed, status="success", **extra):
+    """
+    Records an audit event on the shared writer (blocks only while its queue is full)
+    """
+    return get_audit_logger().log(action, user_id, data_accessed, status, **extra)
@@ -0,0 +1,247 @@
+"""
+Peer Benchmarking Module
+Percentile rank of a company's metrics within its industry cohort
+"""
+
+import atexit
+import bisect
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+BENCHMARK_METRICS = ["Revenue", "Profit Margin", "Expense Ratio", "Growth %", "Avg Loan", "Working Capital"]
+
+# Metrics where a lower value is better (reported percentile is still "share of peers below")
+LOWER_IS_BETTER = {"Expense Ratio"}
+
+# Seconds between writes of the benchmark store (pending changes are also written at exit)
+SAVE_INTERVAL = 30
+
+
+class SortedCohort:
+    """
+    Sorted float array with buffered inserts.
+
+    Inserts go to a small sorted buffer (an O(buffer) list insert) and queries
+    search both the array and the buffer, so an upload never copies the whole
+    cohort. The buffer is merged into the array in one pass only once it
+    outgrows MERGE_MIN or sqrt(cohort size), which balances the O(n) merge
+    against the O(buffer) cost of each query
+    """
+
+    MERGE_MIN = 256
+
+    def __init__(self, values=None):
+        self._sorted = np.sort(np.asarray(values if values is not None else [], dtype=float))
+        self._pending = []
+
+    def add(self, value):
+        if value is not None and np.isfinite(value):
+            bisect.insort(self._pending, float(value))
+            if len(self._pending) > max(self.MERGE_MIN, math.isqrt(len(self._sorted))):
+                self._merge()
+
+    def _merge(self):
+        if self._pending:
+            new = np.asarray(self._pending, dtype=float)
+            positions = np.searchsorted(self._sorted, new)
+            self._sorted = np.insert(self._sorted, positions, new)
+            self._pending = []
+
+    def values(self):
+        self._merge()
+        return self._sorted
+
+    def __len__(self):
+        return len(self._sorted) + len(self._pending)
+
+    def _count(self, value, side):
+        return int(np.searchsorted(self._sorted, value, side=side)) + (
+            bisect.bisect_left(self._pending, value) if side == "left" else bisect.bisect_right(self._pending, value))
+
+    def _kth(self, k):
+        """
+        k-th smallest value (0-based) across the array and the buffer
+        """
+        if not self._pending:
+            return self._sorted[k]
+        pending = np.asarray(self._pending)
+        # Position of each buffered value in the merged order
+        positions = np.searchsorted(self._sorted, pending, side="right") + np.arange(len(pending))
+        hit = np.searchsorted(positions, k)
+        if hit < len(positions) and positions[hit] == k:
+            return pending[hit]
+        return self._sorted[k - hit]
+
+    def percentile(self, value):
+        """
+        Percentile rank (0-100) of value, counting ties as half below
+        """
+        n = len(self)
+        if n == 0:
+            return None
+        below = self._count(value, "left")
+        at_or_below = self._count(value, "right")
+        return float((below + at_or_below) / 2 / n * 100)
+
+    def quantile(self, q):
+        """
+        Linear-interpolated quantile read from the sorted values (no merge needed)
+        """
+        n = len(self)
+        if n == 0:
+            return None
+        position = q * (n - 1)
+        lo = int(position)
+        hi = min(lo + 1, n - 1)
+        low_value = self._kth(lo)
+        return float(low_value + (self._kth(hi) - low_value) * (position - lo))
+
+
+class PeerBenchmark:
+    """
+    Per-industry cohorts of every metric from calculate_metrics
+    """
+
+    def __init__(self, min_cohort_size=10):
+        self.min_cohort_size = min_cohort_size
+        self._cohorts = {}
+        self._members = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def _cohort(self, industry, metric):
+        key = (industry, metric)
+        cohort = self._cohorts.get(key)
+        if cohort is None:
+            cohort = self._cohorts[key] = SortedCohort()
+        return cohort
+
+    def add(self, industry, metrics, company_id=None):
+        """
+        Adds one assessed company. Returns False if company_id was already added
+        """
+        with self._lock:
+            members = self._members.setdefault(industry, set())
+            if company_id is not None:
+                if company_id in members:
+                    return False
+                members.add(company_id)
+            for metric in BENCHMARK_METRICS:
+                if metric in metrics:
+                    self._cohort(industry, metric).add(metrics[metric])
+            self._dirty = True
+        return True
+
+    def add_many(self, industry, metric_arrays):
+        """
+        Bulk loads a cohort from {metric: array of values}
+        """
+        with self._lock:
+            for metric, values in metric_arrays.items():
+                cohort = self._cohort(industry, metric)
+                merged = np.concatenate([cohort.values(), np.asarray(values, dtype=float)])
+                self._cohorts[(industry, metric)] = SortedCohort(merged[np.isfinite(merged)])
+            self._dirty = True
+
+    def cohort_size(self, industry, metric="Profit Margin"):
+        cohort = self._cohorts.get((industry, metric))
+        return len(cohort) if cohort else 0
+
+    def rank(self, industry, metrics):
+        """
+        Returns {metric: {"percentile", "median", "cohort_size", "lower_is_better"}}
+        for metrics whose cohort has at least min_cohort_size companies
+        """
+        ranking = {}
+        with self._lock:
+            for metric in BENCHMARK_METRICS:
+                cohort = self._cohorts.get((industry, metric))
+                if metric not in metrics or cohort is None or len(cohort) < self.min_cohort_size:
+                    continue
+                ranking[metric] = {
+                    "percentile": cohort.percentile(metrics[metric]),
+                    "median": cohort.quantile(0.5),
+                    "cohort_size": len(cohort),
+                    "lower_is_better": metric in LOWER_IS_BETTER,
+                }
+        return ranking
+
+    def save(self, path):
+        with self._lock:
+            arrays = {f"{industry}\x1f{metric}": cohort.values()
+                      for (industry, metric), cohort in self._cohorts.items()}
+            members = {f"members\x1f{industry}": np.asarray(sorted(ids), dtype=str)
+                       for industry, ids in self._members.items()}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays, **members)
+        os.replace(tmp_path, path)
+
+    def save_if_due(self, path, interval=SAVE_INTERVAL):
+        """
+        Saves unsaved changes at most once per `interval` seconds. Returns True if it wrote
+        """
+        if self._dirty and time.monotonic() - self._saved_at >= interval:
+            self.save(path)
+            return True
+        return False
+
+    def flush(self, path):
+        """
+        Saves any unsaved changes now (registered at exit for the process-wide benchmark)
+        """
+        if self._dirty:
+            self.save(path)
+
+    @classmethod
+    def load(cls, path, min_cohort_size=10):
+        benchmark = cls(min_cohort_size)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                for key in data.files:
+                    first, second = key.split("\x1f", 1)
+                    if first == "members":
+                        benchmark._members[second] = set(data[key].tolist())
+                    else:
+                        benchmark._cohorts[(first, second)] = SortedCohort(data[key])
+        return benchmark
+
+
+_default_benchmark = None
+_default_benchmark_lock = threading.Lock()
+
+
+def _store_path():
+    return os.getenv("BENCHMARK_STORE_PATH", "benchmarks.npz")
+
+
+def get_peer_benchmark():
+    """
+    Process-wide benchmark, loaded from BENCHMARK_STORE_PATH (default benchmarks.npz)
+    and written back at exit if it has unsaved changes
+    """
+    global _default_benchmark
+    with _default_benchmark_lock:
+        if _default_benchmark is None:
+            path = _store_path()
+            _default_benchmark = PeerBenchmark.load(path)
+            atexit.register(_default_benchmark.flush, path)
+        return _default_benchmark
+
+
+def record_and_rank(industry, metrics, company_id=None, persist=True):
+    """
+    Adds the company to its industry cohort (once per company_id) and returns its ranking.
+    Without a company_id the company is only ranked, never added. With persist the
+    store is rewritten at most every SAVE_INTERVAL seconds rather than per upload
+    """
+    benchmark = get_peer_benchmark()
+    if company_id is not None and benchmark.add(industry, metrics, company_id) and persist:
+        benchmark.save_if_due(_store_path())
+    return benchmark.rank(industry, metrics)
@@ -0,0 +1,232 @@
+"""
+Charts Module
+Downsampling for long time series and a figure cache for the dashboard charts
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utlis.holt_winters import forecast_company, monthly_series, series_key
+
+MAX_CHART_POINTS = 2000
+
+
+# =====================================================
+# DOWNSAMPLING
+# =====================================================
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: returns the indices of n_out points that
+    best preserve the visual shape of (x, y)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area)) if len(area) else start
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Keeps the min and max of each of n_out/2 equal buckets (fully vectorized)
+    """
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)   # only buckets that hold rows
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+
+    # Buckets with no real value (padding or a run of NaNs) have no min or max
+    filled = ~np.isnan(buckets).all(axis=1)
+    buckets = buckets[filled]
+    offsets = (np.arange(n_buckets) * size)[filled]
+    lo = offsets + np.nanargmin(buckets, axis=1)
+    hi = offsets + np.nanargmax(buckets, axis=1)
+    return np.unique(np.concatenate([[0, n - 1], lo, hi]))
+
+
+def downsample_frame(df, x_col, y_cols, max_points=MAX_CHART_POINTS, method="lttb"):
+    """
+    Returns a row subset of df with at most ~max_points rows per y column.
+    Indices selected for each column are merged so every series keeps its peaks
+    """
+    if len(df) <= max_points:
+        return df
+
+    if x_col in df.columns:
+        x = df[x_col]
+        x = x.astype("int64").to_numpy() if pd.api.types.is_datetime64_any_dtype(x) else np.arange(len(df))
+    else:
+        x = np.arange(len(df))
+
+    per_column = max(3, max_points // max(1, len(y_cols)))
+    keep = []
+    for col in y_cols:
+        y = df[col].to_numpy(dtype=float, na_value=np.nan)
+        if method == "minmax":
+            keep.append(minmax_indices(y, per_column))
+        else:
+            keep.append(lttb_indices(x, np.nan_to_num(y), per_column))
+
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+
+# =====================================================
+# FIGURE CACHE
+# =====================================================
+class FigureCache:
+    """
+    LRU cache of plotly figures keyed by (chart name, data fingerprint, language)
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                return fig
+
+        fig = build()
+
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+figure_cache = FigureCache()
+
+
+def data_fingerprint(df, columns=None):
+    """
+    Cheap content hash of the chart-relevant columns
+    """
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return f"{len(df)}:{hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()}"
+
+
+# =====================================================
+# DASHBOARD CHARTS
+# =====================================================
+def revenue_expense_chart(df, lang, max_points=MAX_CHART_POINTS):
+    """
+    Revenue vs Expense line chart over Date, downsampled to max_points
+    """
+    cols = ["Date", "Revenue", "Expense"]
+    key = ("revenue_expense", data_fingerprint(df, cols), lang, max_points)
+
+    def build():
+        data = downsample_frame(df[cols], "Date", ["Revenue", "Expense"], max_points)
+        return px.line(data, x="Date", y=["Revenue", "Expense"])
+
+    return figure_cache.get_or_build(key, build)
+
+
+def seasonal_forecast_chart(df, lang, company_id=None, horizon=12):
+    """
+    Monthly revenue with a Holt-Winters forecast for the next `horizon` months.
+    The fitted state is reused from the forecast cache under company_id, or
+    under the series' own key so next month's upload of the same ledger warm-starts
+    """
+    cols = ["Date", "Revenue"]
+    key = ("seasonal_forecast", data_fingerprint(df, cols), lang, company_id, horizon)
+
+    def build():
+        history = monthly_series(df, "Revenue")
+        values = history.to_numpy(dtype=float)
+        forecast = forecast_company(company_id if company_id is not None else series_key(history), values, horizon)
+
+        if isinstance(history.index, pd.DatetimeIndex):
+            future = pd.date_range(history.index[-1], periods=horizon + 1, freq="MS")[1:]
+        else:
+            future = np.arange(len(history), len(history) + horizon)
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=history.index, y=values, name="Revenue", mode="lines"))
+        # Start the forecast line at the last actual so the two traces join
+        fig.add_trace(go.Scatter(x=[history.index[-1], *future], y=[values[-1], *forecast],
+                                 name="Forecast", mode="lines", line={"dash": "dash"}))
+        return fig
+
+    return figure_cache.get_or_build(key, build)
+
+
+def health_gauge(score, title, lang):
+    """
+    Health score gauge figure
+    """
+    def build():
+        return go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=score,
+            title={'text': title},
+            gauge={
+                'axis': {'range': [0, 100]},
+                'bar': {'thickness': 0.3},
+                'steps': [
+                    {'range': [0, 40], 'color': "red"},
+                    {'range': [40, 70], 'color': "orange"},
+                    {'range': [70, 100], 'color': "green"}
+                ]
+            }
+        ))
+
+    return figure_cache.get_or_build(("gauge", score, title, lang), build)
+
+
+def profit_expense_pie(revenue, expense_ratio, names, lang):
+    """
+    Profit vs expenses pie figure
+    """
+    expenses = revenue * expense_ratio / 100
+    values = (revenue - expenses, expenses)
+
+    def build():
+        return px.pie(values=list(values), names=list(names))
+
+    return figure_cache.get_or_build(("profit_pie", values, tuple(names), lang), build)
@@ -4,11 +4,14 @@ Identifies cost reduction opportunities and suggests optimization strategies
 """
 
 import pandas as pd
+from utlis.instrumentation import instrument
+from utlis.transaction_categorizer import get_transaction_categorizer
 
 
 # =====================================================
 # MAIN ANALYSIS
 # =====================================================
+@instrument("cost_optimization.analyze_cost_structure")
 def analyze_cost_structure(df, revenue, expenses, industry):
     """
     Analyze cost structure and suggest optimization opportunities
@@ -53,13 +56,8 @@ def analyze_cost_structure(df, revenue, expenses, industry):
     # =====================================================
     # PERSONNEL COST CHECK (FIXED BUG HERE)
     # =====================================================
-    personnel_cost = 0
-
-    if "Salaries" in df.columns:
-        personnel_cost = df["Salaries"].mean()
-
-    elif "Personnel" in df.columns:
-        personnel_cost = df["Personnel"].mean()
+    # Personnel/Payroll/Wages headers are mapped to "Salaries" at ingestion
+    personnel_cost = df["Salaries"].mean() if "Salaries" in df.columns else 0
 
     if personnel_cost > revenue * 0.30:
         analysis["optimization_opportunities"].append({
@@ -76,6 +74,22 @@ def analyze_cost_structure(df, revenue, expenses, industry):
 # CATEGORIZE EXPENSES
 # =====================================================
 def categorize_expenses(df, total_expenses):
+    """
+    Splits expenses by category from the transaction descriptions when the
+    ledger has them; otherwise falls back to a typical SME split
+    """
+
+    if "Description" in df.columns and "Expense" in df.columns:
+        spent = df["Expense"].fillna(0) > 0
+        if spent.any():
+            breakdown = get_transaction_categorizer().breakdown(
+                df.loc[spent, "Description"], df.loc[spent, "Expense"]
+            )
+            return {
+                category: {"percentage": values["percentage"], "amount": values["amount"]}
+                for category, values in breakdown.items()
+                if values["amount"] > 0
+            }
 
     categories = {
         "Personnel & Salaries": {"percentage": 30, "amount": total_expenses * 0.30},
@@ -3,15 +3,35 @@ Creditworthiness Analyzer Module
 Detailed credit risk assessment and loan eligibility analysis
 """
 
-def detailed_creditworthiness_assessment(metrics, score, industry, revenue):
+import numpy as np
+
+from utlis.instrumentation import instrument
+from utlis.default_model import get_pd_model, pd_feature_matrix
+
+# Minimum health score (exclusive) for each loan product
+LOAN_ELIGIBILITY_THRESHOLDS = {
+    "working_capital_loan": 40,
+    "term_loan": 50,
+    "overdraft_facility": 50,
+    "equipment_finance": 45,
+    "invoice_discounting": 30,
+}
+
+# Lower score bound (inclusive) of each credit rating, best first
+CREDIT_RATING_BANDS = [(85, "AAA"), (75, "AA"), (65, "A"), (50, "BBB"), (0, "B")]
+
+
+@instrument("creditworthiness.detailed_creditworthiness_assessment")
+def detailed_creditworthiness_assessment(metrics, score, industry, revenue, wc_analysis=None):
     """
     Provides comprehensive creditworthiness assessment
+    Pass the analyze_working_capital result so the PD model sees the cash conversion cycle
     """
     
     assessment = {
         "overall_score": score,
         "credit_rating": assign_credit_rating(score),
-        "default_risk": calculate_default_risk(metrics, score),
+        "default_risk": calculate_default_risk(metrics, score, wc_analysis),
         "loan_eligibility": assess_loan_eligibility(score, metrics, revenue),
         "risk_factors": identify_risk_factors(metrics, industry),
         "strengths": identify_strengths(metrics),
@@ -63,11 +83,19 @@ def assign_credit_rating(score):
         }
 
 
-def calculate_default_risk(metrics, score):
+def calculate_default_risk(metrics, score, wc_analysis=None):
     """
     Calculates probability of default based on metrics
+    Uses the fitted PD model when a coefficient file is available
     """
-    default_probability = max(0, 100 - score * 1.2)  # Simplified calculation
+    model = get_pd_model()
+    if model is not None:
+        features = dict(metrics)
+        if wc_analysis is not None:
+            features["Cash Conversion Cycle"] = wc_analysis["cash_conversion_cycle"]
+        default_probability = float(model.predict_proba(pd_feature_matrix([features]))[0]) * 100
+    else:
+        default_probability = max(0, 100 - score * 1.2)  # Simplified calculation
     
     risk_level = "Low" if default_probability < 15 else "Medium" if default_probability < 35 else "High"
     
@@ -78,6 +106,18 @@ def calculate_default_risk(metrics, score):
     }
 
 
+def credit_rating_array(scores):
+    """
+    Vectorized rating labels for an array of health scores (same bands as assign_credit_rating)
+    """
+    scores = np.asarray(scores)
+    labels = np.array([label for _, label in CREDIT_RATING_BANDS])
+    bounds = np.array([bound for bound, _ in CREDIT_RATING_BANDS], dtype=float)
+    bounds[-1] = -np.inf  # lowest band catches everything below
+    index = np.argmax(scores[..., None] >= bounds, axis=-1)
+    return labels[index]
+
+
 def get_default_risk_interpretation(probability):
     """
     Provides interpretation of default risk probability
@@ -101,35 +141,35 @@ def assess_loan_eligibility(score, metrics, revenue):
     
     eligibility = {
         "working_capital_loan": {
-            "eligible": score > 40,
+            "eligible": score > LOAN_ELIGIBILITY_THRESHOLDS["working_capital_loan"],
             "loan_amount": f"₹{revenue * 0.25:.0f} - ₹{revenue * 0.50:.0f}",
             "tenor": "12-36 months",
             "required_collateral": "None" if score > 60 else "50% of loan amount",
             "approval_probability": min(95, max(40, score * 1.1)) if score > 40 else "Not Eligible"
         },
         "term_loan": {
-            "eligible": score > 50,
+            "eligible": score > LOAN_ELIGIBILITY_THRESHOLDS["term_loan"],
             "loan_amount": f"₹{revenue * 0.50:.0f} - ₹{revenue * 1.0:.0f}",
             "tenor": "36-60 months",
             "required_collateral": "100% of loan amount" if score < 65 else "50% of loan amount",
             "approval_probability": min(90, max(45, score * 1.0)) if score > 50 else "Not Eligible"
         },
         "overdraft_facility": {
-            "eligible": score > 50,
+            "eligible": score > LOAN_ELIGIBILITY_THRESHOLDS["overdraft_facility"],
             "loan_amount": f"₹{revenue * 0.10:.0f} - ₹{revenue * 0.25:.0f}",
             "tenor": "12 months (renewable)",
             "required_collateral": "None" if score > 70 else "25% of facility",
             "approval_probability": min(95, max(50, score * 1.05)) if score > 50 else "Not Eligible"
         },
         "equipment_finance": {
-            "eligible": score > 45,
+            "eligible": score > LOAN_ELIGIBILITY_THRESHOLDS["equipment_finance"],
             "loan_amount": f"₹{revenue * 0.20:.0f} - ₹{revenue * 0.60:.0f}",
             "tenor": "24-60 months",
             "required_collateral": "Equipment as mortgage",
             "approval_probability": min(85, max(40, score * 0.95)) if score > 45 else "Not Eligible"
         },
         "invoice_discounting": {
-            "eligible": score > 30,
+            "eligible": score > LOAN_ELIGIBILITY_THRESHOLDS["invoice_discounting"],
             "loan_amount": f"₹{revenue * 0.20:.0f} - ₹{revenue * 0.70:.0f}",
             "tenor": "90-180 days",
             "required_collateral": "Invoices/Bills",
@@ -3,6 +3,13 @@ Data Validation Module
 Validates input data and ensures data quality
 """
 
+import pandas as pd
+
+from utlis.instrumentation import instrument
+from utlis.date_parsing import parse_dates
+
+
+@instrument("data_validation.validate_financial_data")
 def validate_financial_data(df):
     """
     Validates uploaded financial data for completeness and accuracy
@@ -56,10 +63,9 @@ def validate_financial_data(df):
     
     # Check date format
     if "Date" in df.columns:
-        try:
-            pd.to_datetime(df["Date"])
-        except:
-            validation_report["warnings"].append("Date column format may be incorrect")
+        unparsed = (parse_dates(df["Date"]).isna() & df["Date"].notna()).sum()
+        if unparsed > 0:
+            validation_report["warnings"].append(f"Date column format may be incorrect: {unparsed} unreadable dates")
             validation_report["data_quality_score"] -= 5
     
     # Check minimum data points
@@ -144,6 +150,7 @@ def validate_gst_number(gst):
     return True
 
 
+@instrument("data_validation.sanitize_financial_data")
 def sanitize_financial_data(df):
     """
     Cleans and sanitizes financial data
@@ -168,15 +175,13 @@ def sanitize_financial_data(df):
     
     # Sort by date if available
     if "Date" in df_clean.columns:
-        try:
-            df_clean["Date"] = pd.to_datetime(df_clean["Date"])
-            df_clean = df_clean.sort_values("Date")
-        except:
-            pass
+        df_clean["Date"] = parse_dates(df_clean["Date"])
+        df_clean = df_clean.sort_values("Date")
     
     return df_clean
 
 
+@instrument("data_validation.check_outliers")
 def check_outliers(df):
     """
     Identifies outliers in financial data
@@ -0,0 +1,141 @@
+"""
+Dataset Store Module
+Content-addressed on-disk store of parsed canonical ledgers (Arrow Feather files)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from utlis.instrumentation import instrument
+from utlis.schema import CANONICAL_COLUMNS
+
+# Seconds between eviction sweeps triggered by put()
+EVICT_INTERVAL = 60
+
+
+def canonical_only(df):
+    """
+    The canonical columns of a ledger. Anything else an upload carries (PAN,
+    GSTIN, account numbers, ...) is never persisted in plaintext
+    """
+    out = df[[c for c in df.columns if c in CANONICAL_COLUMNS]]
+    out.attrs = dict(df.attrs)
+    return out
+
+
+class DatasetStore:
+    """
+    Stores each distinct upload once under the hash of its bytes.
+
+    Files are written to a temp name and atomically renamed, so several
+    Streamlit sessions or worker processes can share one directory safely:
+    whoever parses a file first publishes it, everyone else just reads it.
+
+    Only canonical columns are stored. Files unused for `max_age_days` are
+    evicted, then the least recently used until the store fits `max_bytes`
+    """
+
+    def __init__(self, root=None, max_bytes=None, max_age_days=None):
+        self.root = root or os.getenv("DATASET_STORE_DIR", "dataset_store")
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("DATASET_STORE_MAX_BYTES", str(2 * 1024 ** 3)))
+        self.max_age_days = max_age_days if max_age_days is not None else float(
+            os.getenv("DATASET_STORE_MAX_AGE_DAYS", "30"))
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, dataset_id):
+        return os.path.join(self.root, dataset_id[:2], f"{dataset_id}.feather")
+
+    def __contains__(self, dataset_id):
+        return os.path.exists(self.path_for(dataset_id))
+
+    @instrument("dataset_store.get")
+    def get(self, dataset_id):
+        """
+        Returns the stored canonical frame, or None if this dataset was never stored
+        """
+        path = self.path_for(dataset_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_feather(path)
+            os.utime(path)   # mtime doubles as last use for eviction
+        except Exception:
+            return None
+        df.attrs["canonical"] = True
+        df.attrs["dataset_id"] = dataset_id
+        return df
+
+    @instrument("dataset_store.put")
+    def put(self, dataset_id, df):
+        """
+        Persists a canonical frame. Returns False if the frame cannot be stored as Arrow
+        """
+        path = self.path_for(dataset_id)
+        if os.path.exists(path):
+            return True
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            canonical_only(df).reset_index(drop=True).to_feather(tmp_path, compression="lz4")
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        if time.time() - self._last_sweep >= EVICT_INTERVAL:
+            self.evict()
+        return True
+
+    @instrument("dataset_store.evict")
+    def evict(self):
+        """
+        Removes expired datasets, then the least recently used ones until the
+        store fits max_bytes. Returns the number of files removed
+        """
+        with self._sweep_lock:
+            self._last_sweep = time.time()
+            files = []
+            for root, _, names in os.walk(self.root):
+                for name in names:
+                    if name.endswith(".feather"):
+                        path = os.path.join(root, name)
+                        try:
+                            stat = os.stat(path)
+                        except FileNotFoundError:
+                            continue
+                        files.append((stat.st_mtime, stat.st_size, path))
+            files.sort()
+
+            cutoff = self._last_sweep - self.max_age_days * 86400
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for mtime, size, path in files:
+                if mtime >= cutoff and total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
+
+
+_default_store = None
+
+
+def get_dataset_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = DatasetStore()
+    return _default_store
@@ -0,0 +1,196 @@
+"""
+Date Parsing Module
+Fast Date column parsing: the format is inferred once from a sample and cached
+per column signature, and each distinct date string is parsed only once
+"""
+
+import datetime
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+
+# Tried in order; day-first layouts come before month-first, as Indian
+# ledgers write 03/04/2024 for 3 April. A sample only rules a format in if
+# every value parses, so 13/04/2024 still settles the ambiguity
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%m/%d/%Y",
+    "%m-%d-%Y",
+    "%Y/%m/%d",
+    "%d/%m/%y",
+    "%d-%m-%y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d-%b-%y",
+    "%d %B %Y",
+    "%b-%Y",
+    "%b %Y",
+    "%B %Y",
+    "%b-%y",
+    "%Y-%m",
+    "%m/%Y",
+    "%m-%Y",
+    "%Y%m%d",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M:%S",
+]
+
+SAMPLE_SIZE = 64
+
+_DIGITS = re.compile(r"\d")
+_LETTERS = re.compile(r"[^\W\d_]+")
+
+
+def _shape(value):
+    """
+    Layout of one date string: digits become 9 and words become 'a' ("12-Mar-2024" -> "99-a-9999")
+    """
+    return _LETTERS.sub("a", _DIGITS.sub("9", value.strip()))
+
+
+class DateFormatCache:
+    """
+    LRU of inferred formats keyed by column signature (header and the layout
+    of its values), so every upload from the same template skips inference
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._formats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, signature):
+        with self._lock:
+            if signature not in self._formats:
+                return False, None
+            self._formats.move_to_end(signature)
+            return True, self._formats[signature]
+
+    def set(self, signature, fmt):
+        with self._lock:
+            self._formats[signature] = fmt
+            self._formats.move_to_end(signature)
+            while len(self._formats) > self.max_entries:
+                self._formats.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._formats.clear()
+
+    def __len__(self):
+        return len(self._formats)
+
+
+format_cache = DateFormatCache()
+
+
+def infer_date_format(sample):
+    """
+    First candidate format that parses every value of `sample`, or None
+    """
+    sample = pd.Series(list(sample), dtype=object)
+    for fmt in CANDIDATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+        if parsed.notna().all():
+            return fmt
+    return None
+
+
+def _parse(values, fmt):
+    if fmt is None:
+        return pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    return pd.to_datetime(values, format=fmt, errors="coerce")
+
+
+def _parses_all(sample, fmt):
+    return bool(_parse(pd.Series(list(sample), dtype=object), fmt).notna().all())
+
+
+def _best_format(values):
+    """
+    (format, parsed values) of the candidate that parses the most values (earliest wins ties)
+    """
+    best, best_parsed, best_count = None, _parse(values, None), 0
+    for fmt in CANDIDATE_FORMATS:
+        parsed = _parse(values, fmt)
+        count = int(parsed.notna().sum())
+        if count > best_count:
+            best, best_parsed, best_count = fmt, parsed, count
+    return best, best_parsed
+
+
+def _sample(uniques):
+    if len(uniques) <= SAMPLE_SIZE:
+        return uniques
+    # Spread over the distinct values so a month-first file shows a day > 12
+    return uniques[np.linspace(0, len(uniques) - 1, SAMPLE_SIZE).astype(int)]
+
+
+def column_signature(name, uniques):
+    """
+    Cache key: the column header plus the layouts of its values
+    """
+    return name, tuple(sorted({_shape(value) for value in _sample(uniques)}))
+
+
+@instrument("date_parsing.parse_dates")
+def parse_dates(values, name="Date"):
+    """
+    Parses a date column to datetime64[ns] (unparseable values become NaT).
+
+    Distinct strings are parsed once and mapped back by position, with the
+    format inferred from a sample and cached per column signature. A cached
+    format is only reused if it reads this file's sample; values the chosen
+    format cannot read fall back to pandas' mixed-format parser
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return pd.to_datetime(series, errors="coerce")
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+    if not len(uniques):
+        return pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]", name=series.name)
+    strings = np.array([str(value) for value in uniques], dtype=object)
+    # Dates already parsed by the reader (e.g. Excel cells) skip inference
+    if all(isinstance(value, (datetime.date, np.datetime64)) for value in _sample(uniques)):
+        parsed = pd.to_datetime(pd.Series(uniques), errors="coerce")
+    else:
+        signature = column_signature(name, strings)
+        sample = _sample(strings)
+        found, fmt = format_cache.get(signature)
+        # dd/mm and mm/dd share a layout, so a cached format is re-checked
+        # against this file's sample before it is trusted
+        if not found or (fmt is not None and not _parses_all(sample, fmt)):
+            fmt = infer_date_format(sample)
+            format_cache.set(signature, fmt)
+
+        unique_series = pd.Series(strings)
+        parsed = _parse(unique_series, fmt)
+        missing = parsed.isna().to_numpy()
+        if missing.any():
+            # The sample may have missed the values that settle the layout
+            # (e.g. the only day > 12): pick the format that reads the most values
+            best, best_parsed = _best_format(unique_series)
+            if best_parsed.notna().sum() > (~missing).sum():
+                fmt, parsed = best, best_parsed
+                format_cache.set(signature, fmt)
+                missing = parsed.isna().to_numpy()
+        if missing.any():
+            parsed[missing] = pd.to_datetime(unique_series[missing], format="mixed", dayfirst=True, errors="coerce")
+
+    lookup = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
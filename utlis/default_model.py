@@ -0,0 +1,234 @@
+"""
+Probability of Default Model Module
+Logistic regression PD model fitted with NumPy/SciPy, stored as a JSON coefficient file,
+with batch inference as a single matrix multiply and a calibration report
+
+    python -m utlis.default_model fit history.csv --target defaulted --out models/pd_model.json
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import expit
+
+PD_FEATURES = [
+    "Profit Margin",
+    "Expense Ratio",
+    "Growth %",
+    "Working Capital",
+    "Loan to Revenue",
+    "Cash Conversion Cycle",
+]
+
+DEFAULT_MODEL_PATH = os.path.join("models", "pd_model.json")
+
+
+def pd_feature_matrix(rows):
+    """
+    Builds the (n, len(PD_FEATURES)) feature matrix from a DataFrame or a list of
+    metrics dicts (calculate_metrics output, optionally with "Cash Conversion Cycle")
+    """
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    n = len(df)
+
+    def column(name):
+        return df[name].to_numpy(dtype=float) if name in df.columns else np.full(n, np.nan)
+
+    revenue = column("Revenue")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loan_to_revenue = np.where(revenue > 0, column("Avg Loan") / revenue, np.nan)
+    if "Loan to Revenue" in df.columns:
+        loan_to_revenue = column("Loan to Revenue")
+
+    working_capital = column("Working Capital")
+    return np.column_stack([
+        column("Profit Margin"),
+        column("Expense Ratio"),
+        column("Growth %"),
+        np.sign(working_capital) * np.log1p(np.abs(working_capital)),
+        loan_to_revenue,
+        column("Cash Conversion Cycle"),
+    ])
+
+
+class LogisticPDModel:
+    """
+    L2-regularized logistic regression on standardized features.
+    Missing features are imputed with the training mean (0 after standardization)
+    """
+
+    def __init__(self, l2=1.0):
+        self.l2 = l2
+        self.mean = None
+        self.std = None
+        self.coef = None
+        self.intercept = 0.0
+
+    def _standardize(self, X):
+        Z = (X - self.mean) / self.std
+        Z[~np.isfinite(Z)] = 0.0
+        return Z
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.mean = np.nanmean(X, axis=0)
+        self.mean[~np.isfinite(self.mean)] = 0.0
+        std = np.nanstd(X, axis=0)
+        self.std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+        Z = self._standardize(X)
+        n, d = Z.shape
+
+        def loss(params):
+            w, b = params[:d], params[d]
+            logits = Z @ w + b
+            # log(1 + e^x) computed stably
+            nll = np.sum(np.logaddexp(0, logits) - y * logits) / n
+            p = expit(logits)
+            grad_w = Z.T @ (p - y) / n + self.l2 * w / n
+            grad_b = np.sum(p - y) / n
+            return nll + 0.5 * self.l2 * (w @ w) / n, np.append(grad_w, grad_b)
+
+        result = minimize(loss, np.zeros(d + 1), jac=True, method="L-BFGS-B")
+        self.coef = result.x[:d]
+        self.intercept = float(result.x[d])
+        return self
+
+    def predict_proba(self, X):
+        """
+        Default probabilities for a whole portfolio in one matrix multiply
+        """
+        return expit(self._standardize(np.asarray(X, dtype=float)) @ self.coef + self.intercept)
+
+    def to_dict(self):
+        return {
+            "model": "logistic",
+            "features": PD_FEATURES,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "coef": self.coef.tolist(),
+            "intercept": self.intercept,
+            "l2": self.l2,
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("features") != PD_FEATURES:
+            raise ValueError(f"{path} was trained on different features")
+        model = cls(data.get("l2", 1.0))
+        model.mean = np.array(data["mean"])
+        model.std = np.array(data["std"])
+        model.coef = np.array(data["coef"])
+        model.intercept = data["intercept"]
+        return model
+
+
+def calibration_report(y_true, y_prob, bins=10):
+    """
+    Reliability table by predicted-probability decile, plus Brier score and AUC
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_prob = np.asarray(y_prob, dtype=float)
+    order = np.argsort(y_prob, kind="stable")
+    buckets = np.array_split(order, bins)
+
+    table = []
+    for i, idx in enumerate(buckets):
+        if len(idx) == 0:
+            continue
+        table.append({
+            "bucket": i + 1,
+            "count": int(len(idx)),
+            "mean_predicted": float(y_prob[idx].mean()),
+            "observed_rate": float(y_true[idx].mean()),
+        })
+
+    # Rank-based AUC (Mann-Whitney U)
+    ranks = pd.Series(y_prob).rank().to_numpy()
+    positives = y_true == 1
+    n_pos, n_neg = positives.sum(), (~positives).sum()
+    auc = float((ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)) if n_pos and n_neg else None
+
+    return {
+        "brier_score": float(np.mean((y_prob - y_true) ** 2)),
+        "auc": auc,
+        "base_rate": float(y_true.mean()) if len(y_true) else None,
+        "calibration_table": table,
+    }
+
+
+_cached_model = {}
+
+
+def get_pd_model(path=None):
+    """
+    Loads the fitted model from PD_MODEL_PATH (cached per path and mtime).
+    Returns None when no coefficient file exists
+    """
+    path = path or os.getenv("PD_MODEL_PATH", DEFAULT_MODEL_PATH)
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _cached_model.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _cached_model[path] = (mtime, LogisticPDModel.load(path))
+    return cached[1]
+
+
+def score_portfolio(portfolio, model=None):
+    """
+    Adds a "pd" column (probability of default, 0-1) and a risk rank to a
+    portfolio DataFrame of metrics, sorted from riskiest to safest
+    """
+    model = model or get_pd_model()
+    if model is None:
+        raise FileNotFoundError("No PD model coefficient file found; fit one first")
+    scored = portfolio.copy()
+    scored["pd"] = model.predict_proba(pd_feature_matrix(portfolio))
+    scored["risk_rank"] = scored["pd"].rank(ascending=False, method="first").astype(int)
+    return scored.sort_values("risk_rank")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit or evaluate the probability-of-default model")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit = sub.add_parser("fit", help="Fit coefficients from a labelled history CSV")
+    fit.add_argument("csv")
+    fit.add_argument("--target", default="defaulted")
+    fit.add_argument("--out", default=DEFAULT_MODEL_PATH)
+    fit.add_argument("--l2", type=float, default=1.0)
+
+    evaluate = sub.add_parser("evaluate", help="Calibration report on a labelled CSV")
+    evaluate.add_argument("csv")
+    evaluate.add_argument("--target", default="defaulted")
+    evaluate.add_argument("--model", default=DEFAULT_MODEL_PATH)
+
+    args = parser.parse_args()
+    data = pd.read_csv(args.csv)
+    X = pd_feature_matrix(data)
+    y = data[args.target].to_numpy(dtype=float)
+
+    if args.command == "fit":
+        model = LogisticPDModel(args.l2).fit(X, y)
+        model.save(args.out)
+        print(f"Saved coefficients to {args.out}")
+    else:
+        model = LogisticPDModel.load(args.model)
+
+    print(json.dumps(calibration_report(y, model.predict_proba(X)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
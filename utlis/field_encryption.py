@@ -0,0 +1,213 @@
+"""
+Field Encryption Module
+AES-256-GCM encryption of sensitive DataFrame columns and stored ledgers
+"""
+
+import base64
+import os
+import struct
+import threading
+from io import BytesIO
+
+import pandas as pd
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+NONCE_SIZE = 12
+TOKEN_PREFIX = "enc1:"
+LEDGER_MAGIC = b"SMEENC2\n"
+FILE_ID_SIZE = 16
+
+# Columns treated as sensitive by default (PAN, GST number, account identifiers)
+SENSITIVE_COLUMNS = ["PAN", "GST Number", "GSTIN", "Account Number", "IFSC", "UPI ID"]
+
+
+# =====================================================
+# KEYS
+# =====================================================
+class TenantKeyring:
+    """
+    Derives one AES-256 key per tenant from a master key with HKDF.
+    Derived ciphers are cached so each tenant pays the derivation cost once per process
+    """
+
+    def __init__(self, master_key=None):
+        if master_key is None:
+            master_key = os.getenv("ENCRYPTION_KEY")
+            if not master_key:
+                raise ValueError("ENCRYPTION_KEY is not set")
+        self._master_key = master_key.encode() if isinstance(master_key, str) else master_key
+        self._ciphers = {}
+        self._lock = threading.Lock()
+
+    def cipher(self, tenant_id):
+        cipher = self._ciphers.get(tenant_id)
+        if cipher is None:
+            with self._lock:
+                cipher = self._ciphers.get(tenant_id)
+                if cipher is None:
+                    key = HKDF(
+                        algorithm=hashes.SHA256(),
+                        length=32,
+                        salt=b"sme-financial-health/field-encryption",
+                        info=f"tenant:{tenant_id}".encode(),
+                    ).derive(self._master_key)
+                    cipher = self._ciphers[tenant_id] = AESGCM(key)
+        return cipher
+
+
+_default_keyring = None
+
+
+def get_keyring():
+    global _default_keyring
+    if _default_keyring is None:
+        _default_keyring = TenantKeyring()
+    return _default_keyring
+
+
+# =====================================================
+# FIELD-LEVEL (COLUMN) ENCRYPTION
+# =====================================================
+def encrypt_values(values, tenant_id, keyring=None):
+    """
+    Encrypts an iterable of values into "enc1:<base64(nonce + ciphertext)>" tokens.
+    Missing values stay missing. All nonces come from a single pre-allocated random buffer
+    """
+    encrypt = (keyring or get_keyring()).cipher(tenant_id).encrypt
+    aad = tenant_id.encode()
+    b64 = base64.b64encode
+
+    values = list(values)
+    nonces = memoryview(os.urandom(NONCE_SIZE * len(values)))
+    out = [None] * len(values)
+
+    for i, value in enumerate(values):
+        if value is None or (isinstance(value, float) and value != value):
+            continue
+        nonce = nonces[i * NONCE_SIZE:(i + 1) * NONCE_SIZE]
+        ciphertext = encrypt(nonce, str(value).encode("utf-8"), aad)
+        out[i] = TOKEN_PREFIX + b64(bytes(nonce) + ciphertext).decode("ascii")
+
+    return out
+
+
+def decrypt_values(tokens, tenant_id, keyring=None):
+    """
+    Decrypts tokens produced by `encrypt_values`. Non-token values are passed through
+    """
+    decrypt = (keyring or get_keyring()).cipher(tenant_id).decrypt
+    aad = tenant_id.encode()
+    b64d = base64.b64decode
+    prefix_len = len(TOKEN_PREFIX)
+
+    out = []
+    for token in tokens:
+        if not isinstance(token, str) or not token.startswith(TOKEN_PREFIX):
+            out.append(token)
+            continue
+        raw = b64d(token[prefix_len:])
+        out.append(decrypt(raw[:NONCE_SIZE], raw[NONCE_SIZE:], aad).decode("utf-8"))
+    return out
+
+
+def encrypt_columns(df, tenant_id, columns=None, keyring=None):
+    """
+    Returns a copy of df with the sensitive columns replaced by encrypted tokens
+    """
+    columns = [c for c in (columns or SENSITIVE_COLUMNS) if c in df.columns]
+    df_enc = df.copy()
+    for col in columns:
+        df_enc[col] = pd.Series(encrypt_values(df[col].tolist(), tenant_id, keyring),
+                                index=df.index, dtype=object)
+    return df_enc
+
+
+def decrypt_columns(df, tenant_id, columns=None, keyring=None):
+    """
+    Returns a copy of df with encrypted token columns decrypted back to text
+    """
+    columns = [c for c in (columns or SENSITIVE_COLUMNS) if c in df.columns]
+    df_dec = df.copy()
+    for col in columns:
+        df_dec[col] = pd.Series(decrypt_values(df[col].tolist(), tenant_id, keyring),
+                                index=df.index, dtype=object)
+    return df_dec
+
+
+# =====================================================
+# LEDGER ENCRYPTION AT REST (CHUNKED)
+# =====================================================
+def write_encrypted_ledger(df, path, tenant_id, chunk_rows=100000, keyring=None):
+    """
+    Writes a ledger as a sequence of independently encrypted row chunks.
+
+    Each chunk is serialized once as Feather (Arrow IPC, so dtypes round-trip)
+    and sealed with a single AES-GCM call, so the cost is one bulk cipher pass
+    over the bytes rather than one call per value. Every chunk's AAD binds the
+    tenant, a random per-file ID, the chunk index and the total chunk count,
+    so chunks cannot be reordered, dropped, truncated away or spliced in from
+    another file
+    """
+    cipher = (keyring or get_keyring()).cipher(tenant_id)
+    n_chunks = max(1, -(-len(df) // chunk_rows))
+    file_id = os.urandom(FILE_ID_SIZE)
+    nonces = os.urandom(NONCE_SIZE * n_chunks)
+
+    with open(path, "wb") as f:
+        f.write(LEDGER_MAGIC)
+        f.write(file_id)
+        f.write(struct.pack(">I", n_chunks))
+        for i in range(n_chunks):
+            chunk = df.iloc[i * chunk_rows:(i + 1) * chunk_rows]
+            buffer = BytesIO()
+            chunk.reset_index(drop=True).to_feather(buffer, compression="lz4")
+            nonce = nonces[i * NONCE_SIZE:(i + 1) * NONCE_SIZE]
+            sealed = cipher.encrypt(nonce, buffer.getbuffer(), _chunk_aad(tenant_id, file_id, i, n_chunks))
+            f.write(struct.pack(">Q", len(sealed)))
+            f.write(nonce)
+            f.write(sealed)
+
+    return path
+
+
+def _read_exact(f, size, path):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError(f"{path} is truncated")
+    return data
+
+
+def iter_encrypted_ledger(path, tenant_id, keyring=None):
+    """
+    Streams a ledger written by `write_encrypted_ledger`, yielding one DataFrame per chunk.
+    Raises ValueError for a truncated or extended file and InvalidTag for tampered chunks
+    """
+    cipher = (keyring or get_keyring()).cipher(tenant_id)
+
+    with open(path, "rb") as f:
+        if f.read(len(LEDGER_MAGIC)) != LEDGER_MAGIC:
+            raise ValueError(f"{path} is not an encrypted ledger")
+        file_id = _read_exact(f, FILE_ID_SIZE, path)
+        (n_chunks,) = struct.unpack(">I", _read_exact(f, 4, path))
+        for i in range(n_chunks):
+            (size,) = struct.unpack(">Q", _read_exact(f, 8, path))
+            nonce = _read_exact(f, NONCE_SIZE, path)
+            sealed = _read_exact(f, size, path)
+            payload = cipher.decrypt(nonce, sealed, _chunk_aad(tenant_id, file_id, i, n_chunks))
+            yield pd.read_feather(BytesIO(payload))
+        if f.read(1):
+            raise ValueError(f"{path} has data after its last chunk")
+
+
+def read_encrypted_ledger(path, tenant_id, keyring=None):
+    """
+    Decrypts a whole ledger into a single DataFrame
+    """
+    chunks = list(iter_encrypted_ledger(path, tenant_id, keyring))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def _chunk_aad(tenant_id, file_id, index, n_chunks):
+    return LEDGER_MAGIC + file_id + struct.pack(">II", index, n_chunks) + tenant_id.encode()
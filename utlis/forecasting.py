@@ -5,7 +5,11 @@ Provides detailed financial projections and trend analysis
 
 import pandas as pd
 import numpy as np
+from utlis.instrumentation import instrument
+from utlis.holt_winters import HoltWintersBatch, seasonal_decompose
 
+
+@instrument("forecasting.forecast_financial_metrics")
 def forecast_financial_metrics(df, periods=12, method="linear"):
     """
     Forecasts future financial metrics
@@ -32,6 +36,8 @@ def forecast_series(values, periods=12, method="linear"):
         return linear_forecast(values, periods)
     elif method == "exponential":
         return exponential_forecast(values, periods)
+    elif method == "seasonal":
+        return seasonal_forecast(values, periods)
     else:
         return moving_average_forecast(values, periods)
 
@@ -81,6 +87,22 @@ def exponential_forecast(values, periods):
     }
 
 
+def seasonal_forecast(values, periods):
+    """
+    Damped additive Holt-Winters forecast for monthly values
+    """
+    values = np.asarray(values, dtype=float)
+    model = HoltWintersBatch.fit(values)
+    alpha, beta, gamma, phi = model.params[0].tolist()
+
+    return {
+        "forecast": model.forecast(periods)[0].tolist(),
+        "seasonal_strength": seasonal_decompose(values)["strength"],
+        "parameters": {"alpha": alpha, "beta": beta, "gamma": gamma, "phi": phi},
+        "confidence": "High" if len(values) >= 24 else "Medium"
+    }
+
+
 def moving_average_forecast(values, periods):
     """
     Moving average forecasting
@@ -98,6 +120,7 @@ def moving_average_forecast(values, periods):
     }
 
 
+@instrument("forecasting.analyze_trends")
 def analyze_trends(df):
     """
     Analyzes financial trends over time
@@ -160,6 +183,7 @@ def calculate_momentum(values):
     return "Cannot calculate"
 
 
+@instrument("forecasting.project_scenarios")
 def project_scenarios(revenue, growth_rate, expense_ratio, periods=12):
     """
     Projects best, base, and worst case scenarios
@@ -0,0 +1,407 @@
+"""
+Seasonal Forecasting Module
+Classical seasonal decomposition and damped additive Holt-Winters, fitted for
+many monthly series at once, with warm-started updates from a per-company cache
+"""
+
+import hashlib
+import itertools
+import os
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+
+SEASON_LENGTH = 12
+
+# Smoothing parameter grid searched in one pass: (alpha, beta, gamma, phi)
+PARAMETER_GRID = np.array(list(itertools.product(
+    [0.1, 0.3, 0.5, 0.8],   # level
+    [0.0, 0.05, 0.2],       # trend
+    [0.05, 0.2, 0.5],       # seasonal
+    [0.9, 0.98],            # trend damping
+)))
+
+
+# =====================================================
+# DECOMPOSITION
+# =====================================================
+def seasonal_decompose(values, period=SEASON_LENGTH):
+    """
+    Additive decomposition of one series (1-D) or many equal-length series (2-D, one per row)
+    into a centered-moving-average trend, a zero-sum seasonal pattern and the residual.
+    Returns {"trend", "seasonal", "resid", "strength"}; strength is 0 (none) to 1 (purely seasonal)
+    """
+    Y = np.array(values, dtype=float, ndmin=2)
+    n_series, length = Y.shape
+
+    # 2 x period centered moving average (handles even periods)
+    weights = np.ones(period + 1) / period
+    weights[[0, -1]] /= 2
+    half = period // 2
+    trend = np.full_like(Y, np.nan)
+    if length > period:
+        windows = np.lib.stride_tricks.sliding_window_view(Y, period + 1, axis=1)
+        trend[:, half:length - half] = windows @ weights
+
+    detrended = Y - trend
+    padded = np.full((n_series, -(-length // period) * period), np.nan)
+    padded[:, :length] = detrended
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # too short for a full trend window
+        pattern = np.nan_to_num(np.nanmean(padded.reshape(n_series, -1, period), axis=1))
+        pattern -= pattern.mean(axis=1, keepdims=True)
+        seasonal = np.tile(pattern, -(-length // period))[:, :length]
+        resid = Y - trend - seasonal
+        strength = 1 - np.nanvar(resid, axis=1) / np.nanvar(resid + seasonal, axis=1)
+    strength = np.clip(np.nan_to_num(strength), 0, 1)
+
+    if np.ndim(values) == 1:
+        return {"trend": trend[0], "seasonal": seasonal[0], "resid": resid[0], "strength": float(strength[0])}
+    return {"trend": trend, "seasonal": seasonal, "resid": resid, "strength": strength}
+
+
+# =====================================================
+# BATCH HOLT-WINTERS
+# =====================================================
+def _initial_state(Y, period):
+    """
+    Level, trend and seasonal indices from the first two seasons of each row.
+    Rows with fewer than two seasons start without seasonality (Holt's method)
+    """
+    n_series = Y.shape[0]
+    counts = np.sum(np.isfinite(Y[:, :2 * period]), axis=1)
+    seasonal_ok = counts >= 2 * period
+
+    first = Y[:, :period]
+    second = Y[:, period:2 * period]
+    level = np.zeros(n_series)
+    trend = np.zeros(n_series)
+    season = np.zeros((n_series, period))
+
+    if seasonal_ok.any():
+        f, s = first[seasonal_ok], second[seasonal_ok]
+        mean_f, mean_s = f.mean(axis=1), s.mean(axis=1)
+        level[seasonal_ok] = mean_f
+        trend[seasonal_ok] = (mean_s - mean_f) / period
+        season[seasonal_ok] = ((f - mean_f[:, None]) + (s - mean_s[:, None])) / 2
+
+    short = ~seasonal_ok
+    if short.any():
+        rows = Y[short]
+        valid = np.isfinite(rows)
+        first_index = np.argmax(valid, axis=1)
+        level[short] = np.nan_to_num(rows[np.arange(len(rows)), first_index])
+        steps = pd.DataFrame(rows).diff(axis=1).to_numpy()
+        with np.errstate(invalid="ignore"):
+            trend[short] = np.nan_to_num(np.nanmean(steps[:, :period], axis=1)) if rows.shape[1] > 1 else 0.0
+
+    return level, trend, season, seasonal_ok
+
+
+def _recurse(Y, params, level, trend, season, phase, burn_in=0):
+    """
+    Runs the damped additive Holt-Winters recursions over the columns of Y.
+
+    Y: (n, T) observations, NaN where missing (state carries over unchanged).
+    params: (n, k, 4) candidate parameters per series; level/trend: (n, k);
+    season: (n, k, period); phase: (n,) seasonal position of Y's first column.
+    Returns updated (level, trend, season) and the one-step-ahead SSE per candidate
+    """
+    n, length = Y.shape
+    period = season.shape[2]
+    alpha, beta, gamma, phi = (params[..., i] for i in range(4))
+    sse = np.zeros(level.shape)
+    rows = np.arange(n)
+    # Period-major copy so each step reads and writes one contiguous (n, k) block
+    by_slot = np.ascontiguousarray(np.moveaxis(season, 2, 0))
+    uniform_phase = np.all(phase == phase[0])
+
+    for t in range(length):
+        y = Y[:, t][:, None]
+        observed = np.isfinite(y)
+        if uniform_phase:
+            slot = (phase[0] + t) % period
+            s = by_slot[slot]
+        else:
+            slot = (phase + t) % period
+            s = by_slot[slot, rows]
+
+        prediction = level + phi * trend + s
+        error = np.where(observed, y - prediction, 0.0)
+        if t >= burn_in:
+            sse += error ** 2
+
+        y_filled = np.where(observed, y, prediction)
+        new_level = alpha * (y_filled - s) + (1 - alpha) * (level + phi * trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        new_season = np.where(observed, gamma * (y_filled - new_level) + (1 - gamma) * s, s)
+
+        level = np.where(observed, new_level, level)
+        trend = np.where(observed, new_trend, trend)
+        if uniform_phase:
+            by_slot[slot] = new_season
+        else:
+            by_slot[slot, rows] = new_season
+
+    season = np.moveaxis(by_slot, 0, 2)
+    return level, trend, season, sse
+
+
+class HoltWintersBatch:
+    """
+    Fitted state for n series: chosen parameters, level, trend, seasonal indices
+    and the number of periods consumed (which fixes each series' seasonal phase)
+    """
+
+    def __init__(self, params, level, trend, season, steps, period=SEASON_LENGTH):
+        self.params = params
+        self.level = level
+        self.trend = trend
+        self.season = season
+        self.steps = steps
+        self.period = period
+
+    def __len__(self):
+        return len(self.level)
+
+    @classmethod
+    def fit(cls, Y, period=SEASON_LENGTH, grid=PARAMETER_GRID):
+        """
+        Fits every row of Y (series left-aligned, NaN-padded on the right),
+        choosing the parameters per series by one-step-ahead SSE over the whole grid at once
+        """
+        Y = np.array(Y, dtype=float, ndmin=2)
+        n = Y.shape[0]
+        level0, trend0, season0, seasonal_ok = _initial_state(Y, period)
+
+        k = len(grid)
+        params = np.broadcast_to(grid, (n, k, 4)).copy()
+        params[~seasonal_ok, :, 2] = 0.0  # no seasonal updates without two seasons of history
+
+        level, trend, season, sse = _recurse(
+            Y, params,
+            np.repeat(level0[:, None], k, axis=1),
+            np.repeat(trend0[:, None], k, axis=1),
+            np.repeat(season0[:, None, :], k, axis=1),
+            np.zeros(n, dtype=np.int64),
+            burn_in=min(period, Y.shape[1] // 2),
+        )
+
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(n)
+        observed = np.isfinite(Y)
+        steps = np.where(observed.any(axis=1), Y.shape[1] - np.argmax(observed[:, ::-1], axis=1), 0)
+        return cls(params[rows, best], level[rows, best], trend[rows, best], season[rows, best], steps, period)
+
+    def update(self, Y_new):
+        """
+        Warm start: continues the recursions over new columns with the already
+        chosen parameters, without refitting. Returns self
+        """
+        Y_new = np.array(Y_new, dtype=float, ndmin=2)
+        if Y_new.shape[1] == 0:
+            return self
+        level, trend, season, _ = _recurse(
+            Y_new, self.params[:, None, :], self.level[:, None], self.trend[:, None],
+            self.season[:, None, :].copy(), self.steps,
+        )
+        self.level, self.trend, self.season = level[:, 0], trend[:, 0], season[:, 0]
+        observed = np.isfinite(Y_new)
+        consumed = np.where(observed.any(axis=1), Y_new.shape[1] - np.argmax(observed[:, ::-1], axis=1), 0)
+        self.steps = self.steps + consumed
+        return self
+
+    def forecast(self, horizon=12, floor=None):
+        """
+        (n, horizon) point forecasts
+        """
+        h = np.arange(1, horizon + 1)
+        phi = self.params[:, 3][:, None]
+        damped = np.cumsum(phi ** h, axis=1)
+        slots = (self.steps[:, None] + h - 1) % self.period
+        seasonal = np.take_along_axis(self.season, slots, axis=1)
+        forecast = self.level[:, None] + damped * self.trend[:, None] + seasonal
+        return np.maximum(forecast, floor) if floor is not None else forecast
+
+
+# =====================================================
+# PER-COMPANY CACHE
+# =====================================================
+class ForecastCache:
+    """
+    Fitted Holt-Winters state per company, so each new month of data is a
+    cheap warm-started update instead of a refit. Parameters are re-chosen
+    every `refit_every` periods or when a company's history changes
+    """
+
+    def __init__(self, period=SEASON_LENGTH, refit_every=12):
+        self.period = period
+        self.refit_every = refit_every
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, company_id):
+        return company_id in self._entries
+
+    def _can_warm_start(self, entry, values):
+        steps = entry["steps"]
+        return (
+            0 < steps <= len(values)
+            and np.isclose(values[steps - 1], entry["last_value"], equal_nan=True)
+            and steps - entry["fitted_steps"] < self.refit_every
+        )
+
+    @instrument("holt_winters.forecast_many")
+    def forecast_many(self, series, horizon=12, floor=0.0):
+        """
+        Forecasts {company_id: 1-D monthly values (oldest first)}.
+        Returns {company_id: forecast array}; companies are refitted or warm-started in two batches
+        """
+        with self._lock:
+            refit, warm = [], []
+            for company_id, values in series.items():
+                entry = self._entries.get(company_id)
+                if entry is not None and self._can_warm_start(entry, values):
+                    warm.append(company_id)
+                else:
+                    refit.append(company_id)
+
+            results = {}
+            if refit:
+                batch = HoltWintersBatch.fit(_pad([series[c] for c in refit]), self.period)
+                self._store(refit, batch, series, fitted=True)
+                results.update(zip(refit, batch.forecast(horizon, floor)))
+
+            if warm:
+                batch = self._batch(warm)
+                batch.update(_pad([series[c][self._entries[c]["steps"]:] for c in warm]))
+                self._store(warm, batch, series, fitted=False)
+                results.update(zip(warm, batch.forecast(horizon, floor)))
+
+            return {company_id: results[company_id] for company_id in series}
+
+    def _batch(self, company_ids):
+        entries = [self._entries[c] for c in company_ids]
+        return HoltWintersBatch(
+            np.array([e["params"] for e in entries]),
+            np.array([e["level"] for e in entries]),
+            np.array([e["trend"] for e in entries]),
+            np.array([e["season"] for e in entries]),
+            np.array([e["steps"] for e in entries], dtype=np.int64),
+            self.period,
+        )
+
+    def _store(self, company_ids, batch, series, fitted):
+        for i, company_id in enumerate(company_ids):
+            values = series[company_id]
+            steps = int(batch.steps[i])
+            previous = self._entries.get(company_id)
+            self._entries[company_id] = {
+                "params": batch.params[i].copy(),
+                "level": float(batch.level[i]),
+                "trend": float(batch.trend[i]),
+                "season": batch.season[i].copy(),
+                "steps": steps,
+                "last_value": float(values[steps - 1]) if steps else np.nan,
+                "fitted_steps": steps if fitted or previous is None else previous["fitted_steps"],
+            }
+
+    def save(self, path):
+        with self._lock:
+            ids = list(self._entries)
+            entries = [self._entries[c] for c in ids]
+            arrays = {
+                "ids": np.asarray(ids, dtype=str),
+                "params": np.array([e["params"] for e in entries]).reshape(-1, 4),
+                "season": np.array([e["season"] for e in entries]).reshape(-1, self.period),
+            }
+            for field in ("level", "trend", "steps", "last_value", "fitted_steps"):
+                arrays[field] = np.array([e[field] for e in entries], dtype=float)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, period=SEASON_LENGTH, refit_every=12):
+        cache = cls(period, refit_every)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                for i, company_id in enumerate(data["ids"].tolist()):
+                    cache._entries[company_id] = {
+                        "params": data["params"][i],
+                        "level": float(data["level"][i]),
+                        "trend": float(data["trend"][i]),
+                        "season": data["season"][i],
+                        "steps": int(data["steps"][i]),
+                        "last_value": float(data["last_value"][i]),
+                        "fitted_steps": int(data["fitted_steps"][i]),
+                    }
+        return cache
+
+
+def _pad(rows):
+    """
+    Left-aligns 1-D arrays of different lengths into a NaN-padded matrix
+    """
+    width = max((len(r) for r in rows), default=0)
+    matrix = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = row
+    return matrix
+
+
+def monthly_series(df, value_col="Revenue", date_col="Date"):
+    """
+    Sums a ledger column per calendar month (months without rows become NaN),
+    as a Series indexed by month start. Without a date column rows are taken as consecutive months
+    """
+    if date_col not in df.columns:
+        return df[value_col].astype(float).reset_index(drop=True)
+    return df.set_index(pd.to_datetime(df[date_col]))[value_col].resample("MS").sum(min_count=1)
+
+
+def series_key(history, prefix_len=SEASON_LENGTH):
+    """
+    Cache key for a company's monthly series that stays the same as later
+    months are appended: its first month and first `prefix_len` values. Lets
+    uploads of a growing ledger warm-start from the previous upload's fit
+    """
+    head = np.nan_to_num(np.asarray(history, dtype=float)[:prefix_len], nan=-1.0)
+    start = str(history.index[0]) if isinstance(history.index, pd.DatetimeIndex) and len(history) else ""
+    digest = hashlib.blake2b(start.encode() + head.tobytes(), digest_size=16).hexdigest()
+    return f"series:{digest}"
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_forecast_cache():
+    """
+    Process-wide cache, loaded from FORECAST_CACHE_PATH (default forecast_cache.npz)
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ForecastCache.load(os.getenv("FORECAST_CACHE_PATH", "forecast_cache.npz"))
+        return _default_cache
+
+
+def forecast_company(company_id, values, horizon=12, persist=True):
+    """
+    Seasonal forecast for one company through the shared cache. `company_id`
+    must identify the company across uploads (not the upload itself), or the
+    fitted state is never reused
+    """
+    cache = get_forecast_cache()
+    forecast = cache.forecast_many({company_id: np.asarray(values, dtype=float)}, horizon)[company_id]
+    if persist:
+        cache.save(os.getenv("FORECAST_CACHE_PATH", "forecast_cache.npz"))
+    return forecast
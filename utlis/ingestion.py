@@ -0,0 +1,161 @@
+"""
+Ingestion Module
+Parses uploaded ledgers into canonical frames, with a streaming Excel reader
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utlis.dataset_store import canonical_only, get_dataset_store
+from utlis.schema import has_required_columns, resolve_columns, normalize_ledger
+from utlis.instrumentation import instrument
+
+
+def content_hash(data):
+    """
+    Stable hash of uploaded file bytes
+    """
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class ParsedLedgerCache:
+    """
+    Small in-process LRU of parsed canonical frames keyed by content hash
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            df = self._frames.get(key)
+            if df is not None:
+                self._frames.move_to_end(key)
+            return df
+
+    def set(self, key, df):
+        with self._lock:
+            self._frames[key] = df
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_entries:
+                self._frames.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+
+parsed_cache = ParsedLedgerCache()
+
+
+# =====================================================
+# EXCEL
+# =====================================================
+def _pick_sheet(workbook, sheet_name=None):
+    """
+    Returns (worksheet, header row, {column index: canonical name}) for the first
+    sheet whose header row contains the required ledger columns
+    """
+    names = [sheet_name] if sheet_name else workbook.sheetnames
+    fallback = None
+    for name in names:
+        ws = workbook[name]
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), None)
+        header = tuple("" if h is None else str(h).strip() for h in header or ())
+        if not any(header):
+            continue  # empty sheet, or a header row of blank cells
+        mapping = resolve_columns(header)
+        wanted = {i: mapping[h] for i, h in enumerate(header) if h in mapping}
+        if has_required_columns(wanted.values()):
+            return ws, header, wanted
+        if fallback is None:
+            fallback = (ws, header, {i: h for i, h in enumerate(header) if h})
+    if fallback is None:
+        raise ValueError("Workbook has no sheet with a header row")
+    return fallback
+
+
+@instrument("ingestion.read_excel_fast")
+def read_excel_fast(data, sheet_name=None):
+    """
+    Reads an .xlsx ledger, touching only the first sheet with ledger headers and
+    only the columns that map to canonical names.
+
+    Uses the Rust calamine reader when python-calamine is installed, otherwise
+    streams rows through openpyxl in read-only mode
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        ws, header, wanted = _pick_sheet(workbook, sheet_name)
+        indexes = sorted(wanted)
+
+        if _has_calamine():
+            df = pd.read_excel(io.BytesIO(data), sheet_name=ws.title, engine="calamine", usecols=indexes)
+            df.columns = [header[i] for i in indexes]
+            return normalize_ledger(df.dropna(how="all"))
+
+        columns = {i: [] for i in indexes}
+        for row in ws.iter_rows(min_row=2, max_col=indexes[-1] + 1, values_only=True):
+            if row is None or all(v is None for v in row):
+                continue
+            width = len(row)
+            for i in indexes:
+                columns[i].append(row[i] if i < width else None)
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame({header[i]: columns[i] for i in indexes})
+    return normalize_ledger(df)
+
+
+def _has_calamine():
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# =====================================================
+# UPLOADS
+# =====================================================
+@instrument("ingestion.read_ledger_bytes")
+def read_ledger_bytes(data, filename, store=None):
+    """
+    Parses uploaded bytes into a canonical frame exactly once per distinct file.
+    Lookup order: in-process cache, shared dataset store on disk, then parse
+    """
+    key = content_hash(data)
+    df = parsed_cache.get(key)
+    if df is not None:
+        return df
+
+    store = store or get_dataset_store()
+    df = store.get(key)
+    if df is None:
+        # Same columns whether the frame comes from the store or a fresh parse
+        df = canonical_only(parse_ledger_bytes(data, filename))
+        store.put(key, df)
+        df.attrs["dataset_id"] = key
+
+    parsed_cache.set(key, df)
+    return df
+
+
+def parse_ledger_bytes(data, filename):
+    """
+    Parses uploaded bytes into a canonical frame (no caching)
+    """
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        return read_excel_fast(data)
+    if filename.lower().endswith(".xls"):
+        return normalize_ledger(pd.read_excel(io.BytesIO(data)))
+    return normalize_ledger(pd.read_csv(io.BytesIO(data)))
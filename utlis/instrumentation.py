@@ -0,0 +1,206 @@
+"""
+Instrumentation Module
+Lightweight per-stage timing (wall, CPU, rows, peak memory) with Prometheus export
+"""
+
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_enabled = os.getenv("SME_INSTRUMENTATION", "0").lower() in ("1", "true", "yes")
+_track_memory = os.getenv("SME_INSTRUMENTATION_MEMORY", "0").lower() in ("1", "true", "yes")
+_local = threading.local()
+
+if _enabled and _track_memory:
+    tracemalloc.start()
+
+
+def enable(track_memory=False):
+    global _enabled, _track_memory
+    _enabled = True
+    _track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+# =====================================================
+# REGISTRY
+# =====================================================
+class StageStats:
+    """
+    Aggregated measurements for one stage name
+    """
+
+    __slots__ = ("count", "wall_seconds", "cpu_seconds", "rows", "max_wall_seconds", "peak_bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows = 0
+        self.max_wall_seconds = 0.0
+        self.peak_bytes = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MetricsRegistry:
+    """
+    In-process registry of stage statistics
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, wall, cpu, rows=None, peak_bytes=None):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = StageStats()
+            stats.count += 1
+            stats.wall_seconds += wall
+            stats.cpu_seconds += cpu
+            stats.max_wall_seconds = max(stats.max_wall_seconds, wall)
+            if rows:
+                stats.rows += rows
+            if peak_bytes:
+                stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+
+    def merge(self, snapshot):
+        """
+        Adds another registry's snapshot (e.g. from a worker process) into this one
+        """
+        with self._lock:
+            for name, other in snapshot.items():
+                stats = self._stats.get(name)
+                if stats is None:
+                    stats = self._stats[name] = StageStats()
+                stats.count += other["count"]
+                stats.wall_seconds += other["wall_seconds"]
+                stats.cpu_seconds += other["cpu_seconds"]
+                stats.rows += other["rows"]
+                stats.max_wall_seconds = max(stats.max_wall_seconds, other["max_wall_seconds"])
+                stats.peak_bytes = max(stats.peak_bytes, other["peak_bytes"])
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_prometheus(self, prefix="sme"):
+        """
+        Renders the registry in Prometheus text exposition format
+        """
+        series = [
+            ("stage_calls_total", "counter", "Number of stage executions", "count"),
+            ("stage_wall_seconds_total", "counter", "Wall-clock seconds spent in stage", "wall_seconds"),
+            ("stage_cpu_seconds_total", "counter", "CPU seconds spent in stage", "cpu_seconds"),
+            ("stage_rows_total", "counter", "Rows processed by stage", "rows"),
+            ("stage_wall_seconds_max", "gauge", "Slowest single stage execution", "max_wall_seconds"),
+            ("stage_peak_bytes", "gauge", "Peak traced allocation during stage", "peak_bytes"),
+        ]
+        snapshot = self.snapshot()
+        lines = []
+        for metric, kind, help_text, field in series:
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage_name, stats in sorted(snapshot.items()):
+                label = stage_name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{stage="{label}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# =====================================================
+# SESSION TRACE
+# =====================================================
+def begin_session_trace():
+    """
+    Starts collecting per-stage records for the current thread (one Streamlit run)
+    """
+    _local.trace = []
+    return _local.trace
+
+
+def session_trace():
+    return getattr(_local, "trace", None) or []
+
+
+# =====================================================
+# STAGES
+# =====================================================
+@contextmanager
+def stage(name, rows=None):
+    """
+    Times a block of code. A no-op when instrumentation is disabled
+    """
+    if not _enabled:
+        yield
+        return
+
+    depth = getattr(_local, "depth", 0)
+    measure_memory = _track_memory and depth == 0 and tracemalloc.is_tracing()
+    if measure_memory:
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    _local.depth = depth + 1
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        _local.depth = depth
+        peak = tracemalloc.get_traced_memory()[1] - start_bytes if measure_memory else None
+
+        registry.record(name, wall, cpu, rows, peak)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.append({
+                "stage": name,
+                "depth": depth,
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "rows": rows,
+                "peak_kb": round(peak / 1024, 1) if peak else None,
+            })
+
+
+def instrument(name):
+    """
+    Decorator form of `stage`. Row count is taken from a DataFrame first argument
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            rows = None
+            if args and hasattr(args[0], "columns"):
+                rows = len(args[0])
+            with stage(name, rows):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
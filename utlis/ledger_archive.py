@@ -0,0 +1,304 @@
+"""
+Ledger Archive Module
+Memory-mapped on-disk archive of canonical multi-company ledgers for fast lookback
+
+    python -m utlis.ledger_archive build history.feather --out ledger_archive
+    python -m utlis.ledger_archive merge this_month.csv --out ledger_archive
+
+Rows are sorted by company and date; every canonical numeric column is one
+fixed-width .npy file and a per-company offset index maps each company to its
+contiguous row range. Reads memory-map the files, so a company's full history
+or a date range within it is an array view, not a parse.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+from utlis.schema import CANONICAL_COLUMNS, normalize_ledger
+
+CURRENT_FILE = "CURRENT"
+
+# Date is stored as int64 nanoseconds, every other archived column as float64
+ARCHIVE_COLUMNS = [col for col, dtype in CANONICAL_COLUMNS.items() if dtype == "float64"]
+
+_NS_PER_DAY = 86_400 * 10 ** 9
+
+
+def _to_ns(value):
+    return pd.Timestamp(value).as_unit("ns").value
+
+
+def _ranges(starts, counts):
+    """
+    Concatenated row positions of [start, start + count) ranges, without a Python loop
+    """
+    return np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + np.arange(counts.sum())
+
+
+class LedgerArchive:
+    """
+    Read-only view of one archive generation. Writers build a new generation
+    directory and atomically repoint CURRENT at it, so open readers keep a
+    consistent snapshot until they call refresh()
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("LEDGER_ARCHIVE_DIR", "ledger_archive")
+        self.generation = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-opens the archive if a writer published a newer generation. Returns True if it changed
+        """
+        generation = self._current_generation()
+        if generation == self.generation:
+            return False
+        with self._lock:
+            self._open(generation)
+        return True
+
+    def _current_generation(self):
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _open(self, generation):
+        self.generation = generation
+        self.columns = {}
+        self.companies = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self._key = np.zeros(0, dtype=np.int64)
+        self._positions = {}
+        if generation is None:
+            return
+
+        directory = os.path.join(self.root, generation)
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        self.companies = index["companies"]
+        self._positions = {company: i for i, company in enumerate(self.companies)}
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"))
+        # (company position, day) sort key for vectorized per-company date bounds
+        self._key = np.load(os.path.join(directory, "key.npy"), mmap_mode="r")
+        for name in index["columns"]:
+            self.columns[name] = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+    # ---------- reads ----------
+
+    def __len__(self):
+        return len(self.companies)
+
+    def __contains__(self, company_id):
+        return company_id in self._positions
+
+    @property
+    def rows(self):
+        return int(self.offsets[-1])
+
+    def _bounds(self, position, start=None, end=None):
+        lo, hi = int(self.offsets[position]), int(self.offsets[position + 1])
+        if start is None and end is None:
+            return lo, hi
+        base = position << 32
+        if start is not None:
+            lo = int(np.searchsorted(self._key, base + _to_ns(start) // _NS_PER_DAY, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(self._key, base + _to_ns(end) // _NS_PER_DAY, side="right"))
+        return lo, max(lo, hi)
+
+    def arrays(self, company_id, start=None, end=None, columns=None):
+        """
+        {column: array view} of one company's rows, optionally limited to
+        start <= Date <= end. Date comes back as datetime64[ns]
+        """
+        lo, hi = self._bounds(self._positions[company_id], start, end)
+        out = {}
+        for name in columns or self.columns:
+            view = self.columns[name][lo:hi]
+            out[name] = view.view("datetime64[ns]") if name == "Date" else view
+        return out
+
+    @instrument("ledger_archive.history")
+    def history(self, company_id, start=None, end=None, columns=None):
+        """
+        One company's canonical ledger (optionally a date range) as a DataFrame
+        over the memory-mapped columns, ready for calculate_metrics and the forecasting modules
+        """
+        df = pd.DataFrame(self.arrays(company_id, start, end, columns), copy=False)
+        df.attrs["canonical"] = True
+        df.attrs["company_id"] = company_id
+        return df
+
+    def date_bounds(self, start=None, end=None):
+        """
+        (lo, hi) row bounds of start <= Date <= end for every company, in one vectorized search
+        """
+        positions = np.arange(len(self.companies), dtype=np.int64) << 32
+        lo = self.offsets[:-1] if start is None else np.searchsorted(
+            self._key, positions + _to_ns(start) // _NS_PER_DAY, side="left")
+        hi = self.offsets[1:] if end is None else np.searchsorted(
+            self._key, positions + _to_ns(end) // _NS_PER_DAY, side="right")
+        return np.asarray(lo, dtype=np.int64), np.maximum(lo, hi).astype(np.int64)
+
+    @instrument("ledger_archive.date_slice")
+    def date_slice(self, start=None, end=None, columns=None, company_col="company_id"):
+        """
+        Rows of every company with start <= Date <= end as one long frame
+        (the rows are gathered; per-company views come from history())
+        """
+        lo, hi = self.date_bounds(start, end)
+        counts = hi - lo
+        rows = _ranges(lo, counts)
+        data = {company_col: pd.Categorical.from_codes(np.repeat(np.arange(len(counts)), counts),
+                                                       categories=self.companies)}
+        for name in columns or self.columns:
+            values = self.columns[name][rows]
+            data[name] = values.view("datetime64[ns]") if name == "Date" else values
+        df = pd.DataFrame(data, copy=False)
+        df.attrs["canonical"] = True
+        return df
+
+    @instrument("ledger_archive.monthly_panel")
+    def monthly_panel(self, column="Revenue", start=None, end=None, companies=None):
+        """
+        (companies x months) matrix of monthly sums (NaN where a month has no
+        rows), in `companies` order (default: all), plus the month index.
+        Feeds HoltWintersBatch.fit and other batch models directly
+        """
+        positions = (np.arange(len(self.companies)) if companies is None
+                     else np.array([self._positions[c] for c in companies], dtype=np.int64))
+        lo, hi = self.date_bounds(start, end)
+        lo, hi = lo[positions], hi[positions]
+        counts = hi - lo
+        rows = _ranges(lo, counts)
+        if not len(rows):
+            return np.empty((len(positions), 0)), pd.DatetimeIndex([])
+
+        dates = self.columns["Date"][rows].view("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        first, last = dates.min(), dates.max()
+        owner = np.repeat(np.arange(len(positions)), counts)
+        cells = owner * (last - first + 1) + (dates - first)
+        shape = (len(positions), int(last - first + 1))
+        values = np.nan_to_num(np.asarray(self.columns[column][rows], dtype=float))
+        panel = np.bincount(cells, weights=values, minlength=shape[0] * shape[1]).reshape(shape)
+        seen = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape) > 0
+        months = pd.date_range(pd.Timestamp(np.datetime64(int(first), "M")), periods=shape[1], freq="MS")
+        return np.where(seen, panel, np.nan), months
+
+    # ---------- writes ----------
+
+    @classmethod
+    @instrument("ledger_archive.write")
+    def write(cls, df, root=None, company_col="company_id"):
+        """
+        Builds a new generation from a multi-company ledger and makes it current
+        """
+        root = root or os.getenv("LEDGER_ARCHIVE_DIR", "ledger_archive")
+        df = normalize_ledger(df)
+        if company_col not in df.columns or "Date" not in df.columns:
+            raise ValueError(f"Archive ledgers need '{company_col}' and 'Date' columns")
+
+        df = df.dropna(subset=[company_col, "Date"])
+        df = df.assign(**{company_col: df[company_col].astype(str)})
+        # Stable sort: same-day transactions are all kept, in their original order
+        df = df.sort_values([company_col, "Date"], kind="stable")
+
+        codes, companies = pd.factorize(df[company_col], sort=False)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(companies)))]).astype(np.int64)
+        dates = df["Date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        columns = ["Date"] + [col for col in ARCHIVE_COLUMNS if col in df.columns]
+
+        os.makedirs(root, exist_ok=True)
+        directory = tempfile.mkdtemp(dir=root, prefix="gen-")
+        try:
+            np.save(os.path.join(directory, "offsets.npy"), offsets)
+            np.save(os.path.join(directory, "key.npy"), (codes.astype(np.int64) << 32) + dates // _NS_PER_DAY)
+            np.save(os.path.join(directory, "Date.npy"), dates)
+            for col in columns[1:]:
+                np.save(os.path.join(directory, f"{col}.npy"), df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+            with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+                json.dump({"companies": companies.tolist(), "columns": columns, "rows": len(df)}, f, ensure_ascii=False)
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        previous = cls(root).generation
+        tmp_current = os.path.join(root, f"{CURRENT_FILE}.tmp")
+        with open(tmp_current, "w") as f:
+            f.write(os.path.basename(directory))
+        os.replace(tmp_current, os.path.join(root, CURRENT_FILE))
+        # Readers that still map the old files keep them alive until they refresh
+        if previous:
+            shutil.rmtree(os.path.join(root, previous), ignore_errors=True)
+        return cls(root)
+
+    def merge(self, df, company_col="company_id"):
+        """
+        New generation holding the archived rows plus `df`. The rows `df` has
+        for a company and date replace every archived row for that company and
+        date, so re-merging a period does not double it
+        """
+        df = normalize_ledger(df)
+        if company_col not in df.columns or "Date" not in df.columns:
+            raise ValueError(f"Archive ledgers need '{company_col}' and 'Date' columns")
+        df = df.assign(**{company_col: df[company_col].astype(str)})
+
+        existing = self.date_slice(company_col=company_col)
+        existing[company_col] = existing[company_col].astype(str)
+        replaced = pd.MultiIndex.from_arrays([existing[company_col], existing["Date"]]).isin(
+            pd.MultiIndex.from_arrays([df[company_col], df["Date"]]))
+        combined = pd.concat([existing[~replaced], df], ignore_index=True)
+        return type(self).write(combined, self.root, company_col)
+
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def get_ledger_archive():
+    """
+    Process-wide archive from LEDGER_ARCHIVE_DIR (default ledger_archive),
+    re-opened whenever a newer generation has been published
+    """
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is None:
+            _default_archive = LedgerArchive()
+        else:
+            _default_archive.refresh()
+        return _default_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend the memory-mapped ledger archive")
+    parser.add_argument("command", choices=["build", "merge"])
+    parser.add_argument("ledger", help="csv, parquet or feather ledger with company_id and Date columns")
+    parser.add_argument("--out", default=None, help="archive directory (default LEDGER_ARCHIVE_DIR)")
+    parser.add_argument("--company-col", default="company_id")
+    args = parser.parse_args()
+
+    from utlis.pipeline import read_ledger
+
+    df = read_ledger(args.ledger)
+    if args.command == "build":
+        archive = LedgerArchive.write(df, args.out, args.company_col)
+    else:
+        archive = LedgerArchive(args.out).merge(df, args.company_col)
+    print(f"{archive.root}: {len(archive)} companies, {archive.rows} rows ({archive.generation})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Liquidity Stress Testing Module
+Monte Carlo cash runway and covenant-breach probabilities under revenue,
+collection and interest-rate shocks, vectorized over shocks x companies
+"""
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+from utlis.holt_winters import monthly_series
+from utlis.working_capital import COGS_SHARE
+
+# Annual interest rate assumed on Avg Loan before any rate shock
+BASE_INTEREST_RATE = 0.12
+DAYS_PER_MONTH = 30
+
+# Each shock: fractional revenue drop, extra days to collect receivables,
+# interest rate hike in basis points, and a multiplier on a positive growth
+# trend (project_scenarios uses 0.5x growth for its pessimistic case; a
+# declining trend is left as it is)
+DEFAULT_SHOCKS = [
+    {"name": "Baseline"},
+    {"name": "Revenue -20%", "revenue_drop": 0.20},
+    {"name": "Collections +30 days", "collection_delay_days": 30},
+    {"name": "Rate +300 bps", "rate_hike_bps": 300},
+    {"name": "Slow growth", "growth_multiplier": 0.5},
+    {"name": "Combined", "revenue_drop": 0.20, "collection_delay_days": 30, "rate_hike_bps": 300,
+     "growth_multiplier": 0.5},
+]
+
+DEFAULT_COVENANTS = {
+    "min_cash": 0.0,               # cash balance floor
+    "min_interest_coverage": 1.5,  # trailing 3-month operating cash flow / interest
+}
+
+PROFILE_FIELDS = ["monthly_revenue", "monthly_expense", "monthly_growth", "revenue_volatility",
+                  "opening_cash", "receivables_days", "payables_days", "avg_loan"]
+
+# Upper bound on simulated cells per chunk, to keep memory flat for large portfolios
+_CHUNK_CELLS = 4_000_000
+
+
+def company_profile(df, metrics, wc_analysis):
+    """
+    Liquidity inputs for one company from its canonical ledger, calculate_metrics
+    output and analyze_working_capital result. Opening cash is the Working Capital metric
+    """
+    monthly = monthly_series(df, "Revenue").dropna()
+    months = max(len(monthly), 1)
+    revenue = float(metrics.get("Revenue", 0))
+    expense = revenue * float(metrics.get("Expense Ratio", 0)) / 100
+
+    growth = float(metrics.get("Growth %", 0)) / 100
+    monthly_growth = (1 + growth) ** (1 / (months - 1)) - 1 if months > 1 and growth > -1 else 0.0
+    changes = monthly.pct_change().replace([np.inf, -np.inf], np.nan).dropna()
+    volatility = float(changes.std()) if len(changes) > 1 else 0.15
+
+    return {
+        "monthly_revenue": revenue / months,
+        "monthly_expense": expense / months,
+        "monthly_growth": float(np.clip(monthly_growth, -0.2, 0.2)),
+        "revenue_volatility": float(np.clip(np.nan_to_num(volatility, nan=0.15), 0.0, 1.0)),
+        "opening_cash": float(metrics.get("Working Capital", 0)),
+        "receivables_days": float(wc_analysis.get("receivables_days", 30)),
+        "payables_days": float(wc_analysis.get("payables_days", 45)),
+        "avg_loan": float(np.nan_to_num(metrics.get("Avg Loan", 0))),
+    }
+
+
+def _shock_arrays(shocks):
+    return {
+        "revenue_drop": np.array([s.get("revenue_drop", 0.0) for s in shocks]),
+        "collection_delay_days": np.array([s.get("collection_delay_days", 0.0) for s in shocks]),
+        "rate_hike_bps": np.array([s.get("rate_hike_bps", 0.0) for s in shocks]),
+        "growth_multiplier": np.array([s.get("growth_multiplier", 1.0) for s in shocks]),
+    }
+
+
+def _lag_matrix(lag_months, pre, horizon):
+    """
+    (S, C, pre + horizon, horizon) weights mapping the month a flow is booked
+    (columns before `pre` are history) to the month its cash moves, for a
+    fractional lag in months per (shock, company)
+    """
+    S, C = lag_months.shape
+    whole = np.floor(lag_months).astype(np.int64)
+    fraction = lag_months - whole
+    matrix = np.zeros((S, C, pre + horizon, horizon))
+    s, c, t = np.ix_(np.arange(S), np.arange(C), np.arange(horizon))
+    booked = pre + t - whole[:, :, None]
+    matrix[s, c, booked, t] = 1 - fraction[:, :, None]
+    matrix[s, c, booked - 1, t] += fraction[:, :, None]
+    return matrix
+
+
+def _simulate(p, shock, covenants, horizon, n_paths, base_rate, rng):
+    """
+    Simulates one chunk of companies. p: dict of (C,) profile arrays.
+
+    Cash is linear in the revenue path, so every lag, the variable share of
+    expenses and the running balance fold into one (month booked x month)
+    weight matrix per shock and company; all shocks are then evaluated with a
+    single batched matmul against the shared revenue noise paths.
+    Returns (S, C) arrays: out-of-cash probability, breach probability, median runway
+    """
+    S = len(shock["revenue_drop"])
+    C = len(p["monthly_revenue"])
+    H = horizon
+    t = np.arange(1, H + 1)
+
+    collection_lag = np.clip((p["receivables_days"][None, :] + shock["collection_delay_days"][:, None])
+                             / DAYS_PER_MONTH, 0, None)
+    usual_collection_lag = np.clip(np.broadcast_to(p["receivables_days"][None, :] / DAYS_PER_MONTH, (S, C)), 0, None)
+    payment_lag = np.clip(np.broadcast_to(p["payables_days"][None, :] / DAYS_PER_MONTH, (S, C)), 0, None)
+    pre = int(max(collection_lag.max(), payment_lag.max())) + 1
+
+    # Expected revenue per booked month: unshocked history, then the shocked growth path
+    trend = p["monthly_growth"][None, :, None]
+    growth = (1 + np.where(trend > 0, trend * shock["growth_multiplier"][:, None, None], trend)) ** t
+    level = np.empty((S, C, pre + H))
+    level[:, :, :pre] = p["monthly_revenue"][None, :, None]
+    level[:, :, pre:] = p["monthly_revenue"][None, :, None] * (1 - shock["revenue_drop"])[:, None, None] * growth
+    planned = np.empty((C, pre + H))
+    planned[:, :pre] = p["monthly_revenue"][:, None]
+    planned[:, pre:] = p["monthly_revenue"][:, None] * (1 + p["monthly_growth"][:, None]) ** t
+
+    # Variable cost per unit of revenue, capped at 1: spend beyond revenue does not
+    # shrink with it, so it stays fixed (otherwise a revenue drop would save cash)
+    base_revenue = np.where(p["monthly_revenue"] > 0, p["monthly_revenue"], 1.0)
+    variable_share = np.minimum(COGS_SHARE * p["monthly_expense"] / base_revenue, 1.0)
+    fixed_cost = p["monthly_expense"] - variable_share * np.maximum(p["monthly_revenue"], 0.0)
+    interest = p["avg_loan"][None, :] * (base_rate + shock["rate_hike_bps"][:, None] / 10_000) / 12
+
+    # Revenue booked before the horizon is collected on the usual terms (it was
+    # invoiced before the shock); only new revenue waits the extra days
+    collection = _lag_matrix(collection_lag, pre, H)
+    collection[:, :, :pre] = _lag_matrix(usual_collection_lag, pre, H)[:, :, :pre]
+
+    # Operating cash flow per month = revenue collected - variable costs paid (- fixed costs).
+    # Variable costs are paid on the unshocked plan, and cut to the shocked revenue
+    # only as the shortfall shows up in collections, so a shock never frees cash early
+    share = variable_share[None, :, None]
+    flow_weights = (collection * ((1 - share) * level + share * planned)[..., None]
+                    - share[..., None] * _lag_matrix(payment_lag, pre, H) * planned[None, :, :, None])
+    window = min(3, H)
+    cash_weights = np.cumsum(flow_weights, axis=-1)
+    trailing_weights = cash_weights.copy()
+    trailing_weights[..., window:] -= cash_weights[..., :-window]
+
+    # Deterministic terms ride on the first history row, whose noise is always 1,
+    # so the matmul output is directly compared against zero
+    cash_weights[:, :, 0, :] += (p["opening_cash"][None, :, None] - covenants.get("min_cash", 0.0)
+                                 - (fixed_cost[None, :] + interest)[:, :, None] * t)
+    months_in_window = np.minimum(t, window)
+    min_coverage = covenants.get("min_interest_coverage")
+    if min_coverage is not None:
+        trailing_weights[:, :, 0, :] -= (fixed_cost[None, :, None] + min_coverage * interest[:, :, None]) * months_in_window
+
+    # Lognormal revenue noise, shared by all shocks (common random numbers); history is known
+    vol = p["revenue_volatility"][:, None, None]
+    noise = np.ones((C, n_paths, pre + H))
+    noise[:, :, pre:] = np.exp(vol * rng.standard_normal((C, n_paths, H)) - vol ** 2 / 2)
+
+    def paths(weights):
+        # (S, C, pre+H, H) -> (C, N, S, H); one matmul per company covers every shock
+        stacked = weights.transpose(1, 2, 0, 3).reshape(C, pre + H, S * H)
+        return np.matmul(noise, stacked).reshape(C, n_paths, S, H)
+
+    below = paths(cash_weights) < 0
+    out_of_cash = below.any(axis=-1)
+    first_breach = np.where(out_of_cash, below.argmax(axis=-1) + 1, np.inf)   # months until cash runs out
+
+    breached = out_of_cash
+    if min_coverage is not None:
+        # Trailing operating cash flow short of min_coverage x interest, once a full window exists
+        short = paths(trailing_weights)[..., window - 1:] < 0
+        breached = breached | (short.any(axis=-1) & (interest.T[:, None, :] > 0))
+
+    return (out_of_cash.mean(axis=1).T, breached.mean(axis=1).T, np.median(first_breach, axis=1).T)
+
+
+@instrument("liquidity.stress_test")
+def stress_test(profiles, shocks=None, covenants=None, horizon=24, n_paths=500, base_rate=BASE_INTEREST_RATE,
+                seed=0):
+    """
+    Stress tests a portfolio. `profiles` is a DataFrame (one row per company,
+    PROFILE_FIELDS columns) or a list of company_profile dicts.
+
+    Returns {"shocks": names, "companies": index, "runway_months": (S, C)
+    median months until cash falls below the floor (inf = survives the horizon),
+    "out_of_cash_probability": (S, C), "breach_probability": (S, C)}
+    """
+    shocks = shocks or DEFAULT_SHOCKS
+    covenants = {**DEFAULT_COVENANTS, **(covenants or {})}
+    frame = profiles if isinstance(profiles, pd.DataFrame) else pd.DataFrame(list(profiles))
+    arrays = {field: np.nan_to_num(frame[field].to_numpy(dtype=float)) for field in PROFILE_FIELDS}
+    shock = _shock_arrays(shocks)
+    rng = np.random.default_rng(seed)
+
+    n_companies = len(frame)
+    S = len(shocks)
+    out_of_cash = np.empty((S, n_companies))
+    breach = np.empty((S, n_companies))
+    runway = np.empty((S, n_companies))
+
+    max_lag = (max(arrays["receivables_days"].max(initial=0), arrays["payables_days"].max(initial=0))
+               + shock["collection_delay_days"].max()) / DAYS_PER_MONTH
+    cells_per_company = S * n_paths * (horizon + int(max_lag) + 1)
+    chunk = max(1, _CHUNK_CELLS // max(cells_per_company, 1))
+
+    for start in range(0, n_companies, chunk):
+        stop = min(start + chunk, n_companies)
+        part = {field: values[start:stop] for field, values in arrays.items()}
+        oc, br, rw = _simulate(part, shock, covenants, horizon, n_paths, base_rate, rng)
+        out_of_cash[:, start:stop] = oc
+        breach[:, start:stop] = br
+        runway[:, start:stop] = rw
+
+    return {
+        "shocks": [s["name"] for s in shocks],
+        "companies": frame.index,
+        "runway_months": runway,
+        "out_of_cash_probability": out_of_cash,
+        "breach_probability": breach,
+    }
+
+
+def liquidity_summary(profile, shocks=None, covenants=None, horizon=24, n_paths=500):
+    """
+    Stress test of a single company as one row per shock
+    """
+    result = stress_test([profile], shocks, covenants, horizon, n_paths)
+    rows = []
+    for i, name in enumerate(result["shocks"]):
+        runway = result["runway_months"][i, 0]
+        rows.append({
+            "scenario": name,
+            "runway_months": None if np.isinf(runway) else float(runway),
+            "out_of_cash_probability": round(float(result["out_of_cash_probability"][i, 0]) * 100, 1),
+            "breach_probability": round(float(result["breach_probability"][i, 0]) * 100, 1),
+        })
+    return rows
@@ -0,0 +1,285 @@
+"""
+Localization Module
+Compiled per-language message bundles shared by the UI, PDF reports and the API
+
+    python -m utlis.localization compile
+
+Catalogs live in utlis/locales/<code>.json as {section: {key: text}}. Every
+"section.key" has a stable integer message ID (utlis/locales/messages.json,
+append-only), and compiling a catalog turns it into one list of strings
+indexed by message ID, with the English text filling any untranslated key.
+Bundles are loaded lazily, one language at a time, once per process.
+
+A key added to en.json before the compile command has run still resolves:
+the table is extended in memory with provisional IDs (with a warning), and
+`compile` makes them permanent.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import warnings
+from types import MappingProxyType
+
+from utlis.instrumentation import instrument
+
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+MESSAGE_TABLE = os.path.join(LOCALE_DIR, "messages.json")
+
+# UI language name -> catalog code. Adding a language is a new catalog plus one entry here
+LANGUAGES = {"English": "en", "Hindi": "hi", "Tamil": "ta"}
+LANGUAGE_LABELS = {"English": "English", "Hindi": "हिन्दी (Hindi)", "Tamil": "தமிழ் (Tamil)"}
+DEFAULT_LANGUAGE = "English"
+
+# Industry keys, in display order; localized names are the "industry.<key>" messages
+INDUSTRIES = ["Retail", "Manufacturing", "Services", "Agriculture", "E-commerce"]
+
+
+def _bundle_dir():
+    return os.getenv("LOCALE_BUNDLE_DIR", "locale_bundles")
+
+
+def _catalog_path(code):
+    return os.path.join(LOCALE_DIR, f"{code}.json")
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _flatten(catalog):
+    return {f"{section}.{key}": text for section, entries in catalog.items() for key, text in entries.items()}
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def language_code(lang):
+    """
+    Catalog code for a UI language name or code (unknown languages fall back to English)
+    """
+    if lang in LANGUAGES:
+        return LANGUAGES[lang]
+    return lang if lang in LANGUAGES.values() else LANGUAGES[DEFAULT_LANGUAGE]
+
+
+# =====================================================
+# MESSAGE IDS
+# =====================================================
+class MessageTable:
+    """
+    "section.key" -> integer message ID, plus the (key, ID) pairs of each section
+    """
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self.ids = {key: i for i, key in enumerate(self.keys)}
+        sections = {}
+        for i, key in enumerate(self.keys):
+            section, _, name = key.partition(".")
+            sections.setdefault(section, []).append((name, i))
+        self.sections = {section: tuple(pairs) for section, pairs in sections.items()}
+
+    def __len__(self):
+        return len(self.keys)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def _load_message_table():
+    keys = _read_json(MESSAGE_TABLE)
+    known = set(keys)
+    added = [key for key in _flatten(_read_json(_catalog_path(LANGUAGES[DEFAULT_LANGUAGE]))) if key not in known]
+    if added:
+        warnings.warn(f"{len(added)} message keys in en.json have no ID yet ({', '.join(added[:5])}); "
+                      f"run `python -m utlis.localization compile` before release")
+    return MessageTable(keys + added)
+
+
+def get_message_table():
+    """
+    Message IDs from messages.json, extended in memory by any key only in en.json
+    """
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = _load_message_table()
+        return _table
+
+
+def message_id(key):
+    """
+    Integer ID of a "section.key" message (stable across releases)
+    """
+    return get_message_table().ids[key]
+
+
+# =====================================================
+# BUNDLES
+# =====================================================
+class MessageBundle:
+    """
+    One language's messages, indexed by message ID or "section.key".
+    `section(name)` returns a read-only {key: text} view built once per bundle
+    """
+
+    def __init__(self, language, messages, table):
+        self.language = language
+        self.messages = tuple(messages)
+        self._table = table
+        self._sections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self.messages[key]
+        return self.messages[self._table.ids[key]]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (KeyError, IndexError):
+            return default
+
+    def section(self, name):
+        with self._lock:
+            view = self._sections.get(name)
+            if view is None:
+                pairs = self._table.sections.get(name, ())
+                view = MappingProxyType({key: self.messages[i] for key, i in pairs})
+                self._sections[name] = view
+            return view
+
+    def __len__(self):
+        return len(self.messages)
+
+
+def compile_messages(code, table=None):
+    """
+    Message list of one catalog in ID order (English text where a key is untranslated)
+    """
+    table = table or get_message_table()
+    english = _flatten(_read_json(_catalog_path(LANGUAGES[DEFAULT_LANGUAGE])))
+    catalog = english if code == LANGUAGES[DEFAULT_LANGUAGE] else _flatten(_read_json(_catalog_path(code)))
+    return [catalog.get(key, english.get(key, key)) for key in table.keys]
+
+
+def _sources_stamp(code):
+    paths = [MESSAGE_TABLE, _catalog_path(LANGUAGES[DEFAULT_LANGUAGE]), _catalog_path(code)]
+    return [_stamp(path) for path in dict.fromkeys(paths)]
+
+
+def write_bundle(code, table=None, directory=None):
+    """
+    Compiles one catalog to <LOCALE_BUNDLE_DIR>/<code>.bundle.json; returns its messages
+    """
+    table = table or get_message_table()
+    directory = directory or _bundle_dir()
+    messages = compile_messages(code, table)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{code}.bundle.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"language": code, "sources": _sources_stamp(code), "messages": messages},
+                  f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+    return messages
+
+
+@instrument("localization.load_bundle")
+def _load_bundle(code, table):
+    """
+    The compiled bundle if it is current, else compiles the catalog (and caches it on disk)
+    """
+    path = os.path.join(_bundle_dir(), f"{code}.bundle.json")
+    try:
+        compiled = _read_json(path)
+        if compiled["sources"] == _sources_stamp(code) and len(compiled["messages"]) == len(table):
+            return compiled["messages"]
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        return write_bundle(code, table)
+    except OSError:
+        # Read-only deployment: compile in memory only
+        return compile_messages(code, table)
+
+
+_bundles = {}
+_bundles_lock = threading.Lock()
+
+
+def get_bundle(lang=DEFAULT_LANGUAGE):
+    """
+    Process-wide MessageBundle for a UI language name ("Hindi") or code ("hi"),
+    loaded on first use
+    """
+    code = language_code(lang)
+    bundle = _bundles.get(code)
+    if bundle is not None:
+        return bundle
+    with _bundles_lock:
+        if code not in _bundles:
+            table = get_message_table()
+            _bundles[code] = MessageBundle(code, _load_bundle(code, table), table)
+        return _bundles[code]
+
+
+def translate(key, lang=DEFAULT_LANGUAGE):
+    return get_bundle(lang)[key]
+
+
+def industry_name(industry, lang=DEFAULT_LANGUAGE):
+    """
+    Localized display name of an industry key (the key itself if it has none)
+    """
+    return get_bundle(lang).get(f"industry.{industry}", industry)
+
+
+# =====================================================
+# COMPILATION
+# =====================================================
+def update_message_table():
+    """
+    Appends IDs for keys new in the English catalog; existing IDs never change.
+    Returns the number of keys added
+    """
+    global _table
+    keys = _read_json(MESSAGE_TABLE) if os.path.exists(MESSAGE_TABLE) else []
+    known = set(keys)
+    added = [key for key in _flatten(_read_json(_catalog_path(LANGUAGES[DEFAULT_LANGUAGE]))) if key not in known]
+    if added:
+        tmp = f"{MESSAGE_TABLE}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(keys + added, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp, MESSAGE_TABLE)
+    with _table_lock:
+        _table = MessageTable(keys + added)
+    return len(added)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile translation catalogs into message bundles")
+    parser.add_argument("command", choices=["compile"])
+    parser.add_argument("--out", default=None, help="bundle directory (default LOCALE_BUNDLE_DIR)")
+    args = parser.parse_args()
+
+    added = update_message_table()
+    table = get_message_table()
+    for lang, code in LANGUAGES.items():
+        messages = write_bundle(code, table, args.out)
+        untranslated = sum(1 for key in table.keys if key not in _flatten(_read_json(_catalog_path(code))))
+        print(f"{lang} ({code}): {len(messages)} messages, {untranslated} untranslated", file=sys.stderr)
+    print(f"{len(table)} message IDs ({added} new)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+from utlis.instrumentation import instrument
+
+
+@instrument("metrics.calculate_metrics")
 def calculate_metrics(df):
 
     revenue = df["Revenue"].sum()
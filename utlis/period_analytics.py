@@ -0,0 +1,201 @@
+"""
+Period Analytics Module
+Month / quarter / year tables with MoM, QoQ and YoY growth, margins and
+expense ratios, for one company or many, from a single pass over the ledger
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+
+# Period name -> (months per period, comparison label, periods per year)
+PERIODS = {
+    "month": (1, "MoM", 12),
+    "quarter": (3, "QoQ", 4),
+    "year": (12, "YoY", 1),
+}
+
+FLOW_COLUMNS = ["Revenue", "Expense", "Salaries"]
+BALANCE_COLUMNS = ["Receivable", "Payable", "Inventory", "Loan"]
+GROWTH_COLUMNS = ["Revenue", "Expense", "Profit"]
+
+
+def _period_labels(keys, months):
+    """
+    Display label per integer period key (months since 1970-01 divided by `months`)
+    """
+    start = (keys * months).astype("datetime64[M]")
+    if months == 1:
+        return pd.Index(start.astype(str))
+    years = start.astype("datetime64[Y]").astype(int) + 1970
+    if months == 3:
+        quarters = (keys % 4) + 1
+        return pd.Index([f"{y}-Q{q}" for y, q in zip(years, quarters)])
+    return pd.Index(years.astype(str))
+
+
+def _monthly(df, company_col):
+    """
+    The only pass over the ledger rows: flows summed and balances taken at
+    month end per (company, month), keyed by months since 1970-01
+    """
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    valid = dates.notna().to_numpy()
+    month = dates.to_numpy()[valid].astype("datetime64[M]").astype(np.int64)
+    company = df[company_col].to_numpy()[valid] if company_col else np.zeros(valid.sum(), dtype=np.int64)
+
+    flows = [c for c in FLOW_COLUMNS if c in df.columns]
+    balances = [c for c in BALANCE_COLUMNS if c in df.columns]
+    data = df.loc[valid, flows + balances].assign(_company=company, _month=month)
+    grouped = data.groupby(["_company", "_month"], sort=True)
+    monthly = grouped[flows].sum(min_count=1)
+    if balances:
+        # Balances are the reading on the month's latest date (the last such row
+        # wins), found without sorting the ledger
+        day = dates.to_numpy()[valid]
+        latest = data.assign(_day=day).groupby(["_company", "_month"], sort=False)["_day"].transform("max")
+        closing = data[day == latest.to_numpy()]
+        monthly = monthly.join(closing.groupby(["_company", "_month"], sort=True)[balances].last())
+    monthly["months"] = 1
+    return monthly
+
+
+def _roll_up(monthly, months):
+    if months == 1:
+        return monthly
+    keys = monthly.index.get_level_values("_month") // months
+    flows = [c for c in FLOW_COLUMNS if c in monthly.columns]
+    balances = [c for c in BALANCE_COLUMNS if c in monthly.columns]
+    grouped = monthly.groupby([monthly.index.get_level_values("_company"), keys], sort=True)
+    out = grouped[flows].sum(min_count=1)
+    if balances:
+        out = out.join(grouped[balances].last())
+    out["months"] = grouped["months"].sum()
+    out.index.names = ["_company", "_month"]
+    return out
+
+
+def _growth(table, column, lag):
+    """
+    % change against the same company's period `lag` periods earlier
+    (missing when that period has no data or a zero base)
+    """
+    companies = table.index.get_level_values("_company")
+    keys = table.index.get_level_values("_month")
+    previous = table[column].reindex(pd.MultiIndex.from_arrays([companies, keys - lag])).to_numpy()
+    current = table[column].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (current - previous) / np.abs(previous) * 100
+    return np.where(np.isfinite(change), np.round(change, 2), np.nan)
+
+
+def _finish(table, period):
+    months, label, per_year = PERIODS[period]
+    out = table.copy()
+    revenue = out["Revenue"] if "Revenue" in out else pd.Series(np.nan, index=out.index)
+    expense = out["Expense"] if "Expense" in out else pd.Series(np.nan, index=out.index)
+    out["Profit"] = revenue - expense
+    positive = revenue.where(revenue > 0)
+    out["Profit Margin"] = (out["Profit"] / positive * 100).round(2)
+    out["Expense Ratio"] = (expense / positive * 100).round(2)
+
+    for column in GROWTH_COLUMNS:
+        if column not in out:
+            continue
+        if period != "year":
+            out[f"{column} {label} %"] = _growth(out, column, 1)
+        out[f"{column} YoY %"] = _growth(out, column, per_year)
+
+    keys = out.index.get_level_values("_month").to_numpy()
+    out.insert(0, "Period", (keys * months).astype("datetime64[M]").astype("datetime64[ns]"))
+    out.insert(1, "Label", _period_labels(keys, months))
+    out.insert(2, "complete", out.pop("months") == months)
+    return out
+
+
+@instrument("period_analytics.compute")
+def compute_period_tables(df, company_col=None):
+    """
+    {"month", "quarter", "year"} -> period table. Rows are aggregated to
+    months once; quarters and years roll up from the monthly table.
+
+    Each table has Period (start date), Label, complete (every month of the
+    period has data), the flows, end-of-period balances, Profit, Profit Margin,
+    Expense Ratio and MoM / QoQ / YoY growth %. With `company_col` the tables
+    cover every company, with that column first
+    """
+    if "Date" not in df.columns:
+        raise ValueError("Period analytics need a Date column")
+    monthly = _monthly(df, company_col)
+
+    tables = {}
+    for period, (months, _, _) in PERIODS.items():
+        table = _finish(_roll_up(monthly, months), period)
+        companies = table.index.get_level_values("_company")
+        table = table.reset_index(drop=True)
+        if company_col:
+            table.insert(0, company_col, companies)
+        tables[period] = table
+    return tables
+
+
+class PeriodAnalyticsCache:
+    """
+    LRU of computed period tables keyed by dataset, so every tab, chart and
+    report asking for a period table reuses one computation
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            tables = self._tables.get(key)
+            if tables is not None:
+                self._tables.move_to_end(key)
+                return tables
+
+        tables = compute()
+
+        with self._lock:
+            self._tables[key] = tables
+            while len(self._tables) > self.max_entries:
+                self._tables.popitem(last=False)
+        return tables
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+
+period_cache = PeriodAnalyticsCache()
+
+
+def _dataset_key(df, company_col=None):
+    dataset_id = df.attrs.get("dataset_id")
+    if dataset_id is not None:
+        return dataset_id
+    columns = [c for c in [company_col, "Date", *FLOW_COLUMNS, *BALANCE_COLUMNS] if c and c in df.columns]
+    hashed = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return f"{len(df)}:{hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()}"
+
+
+def period_analytics(df, company_col=None):
+    """
+    Cached compute_period_tables for a dataset (keyed by its dataset_id, or a content hash)
+    """
+    key = (_dataset_key(df, company_col), company_col)
+    return period_cache.get_or_compute(key, lambda: compute_period_tables(df, company_col))
+
+
+def period_table(df, period="quarter", company_col=None):
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}'; choose from {list(PERIODS)}")
+    return period_analytics(df, company_col)[period]
@@ -0,0 +1,142 @@
+"""
+Assessment Pipeline Module
+Runs the full utlis assessment for one ledger and returns a JSON-ready result
+"""
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from utlis.metrics import calculate_metrics
+from utlis.scoring import health_score
+from utlis.creditworthiness import detailed_creditworthiness_assessment
+from utlis.tax_compliance import check_tax_compliance
+from utlis.working_capital import analyze_working_capital, working_capital_timeseries
+from utlis.period_analytics import compute_period_tables
+from utlis.products_recommender import recommend_financial_products
+from utlis.ai_advisor import rule_based_advice
+from utlis.schema import normalize_ledger
+from utlis.localization import get_bundle
+from utlis.instrumentation import instrument
+
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/json": "json",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+}
+
+
+def parse_ledger(payload, fmt="csv"):
+    """
+    Parses raw ledger bytes (csv, json records or Arrow IPC) into a DataFrame
+    """
+    if fmt == "csv":
+        return pd.read_csv(io.BytesIO(payload))
+    if fmt == "json":
+        data = json.loads(payload)
+        if isinstance(data, dict) and "ledger" in data:
+            data = data["ledger"]
+        return pd.DataFrame(data)
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        try:
+            table = pa.ipc.open_stream(payload).read_all()
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_file(pa.BufferReader(payload)).read_all()
+        return table.to_pandas()
+    raise ValueError(f"Unsupported ledger format: {fmt}")
+
+
+def read_ledger(path):
+    """
+    Reads a ledger file (csv, parquet, or feather/arrow) by extension
+    """
+    if path.endswith((".feather", ".arrow")):
+        return pd.read_feather(path)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+@instrument("pipeline.run_assessment")
+def run_assessment(df, industry="Services", precomputed=None):
+    """
+    Computes metrics, health score, credit, tax, working capital and product
+    recommendations for one company, plus the working capital trend and
+    period tables when the ledger is dated. Batch callers that compute those
+    time-series sections for many companies at once pass them in `precomputed`
+    """
+    df = normalize_ledger(df)
+    metrics = calculate_metrics(df)
+    score = health_score(metrics)
+    revenue = metrics.get("Revenue", 0)
+    expenses = metrics.get("Expense Ratio", 0) * revenue / 100
+    working_capital = analyze_working_capital(df, revenue, expenses)
+
+    result = {
+        "metrics": metrics,
+        "health_score": score,
+        "credit_assessment": detailed_creditworthiness_assessment(metrics, score, industry, revenue, working_capital),
+        "tax_compliance": check_tax_compliance(metrics, revenue, expenses, industry),
+        "working_capital": working_capital,
+        "recommendations": recommend_financial_products(
+            score, revenue, industry, metrics, metrics.get("Working Capital", 0)
+        ),
+        "advice": rule_based_advice(metrics),
+    }
+    if "Date" in df.columns and "Revenue" in df.columns:
+        precomputed = precomputed or {}
+        if "working_capital_trend" in precomputed:
+            result["working_capital_trend"] = precomputed["working_capital_trend"]
+        else:
+            result["working_capital_trend"] = working_capital_timeseries(df).to_dict("records")
+        if "period_analytics" in precomputed:
+            result["period_analytics"] = precomputed["period_analytics"]
+        else:
+            result["period_analytics"] = period_summary(compute_period_tables(df))
+    return to_jsonable(result)
+
+
+def period_summary(tables):
+    """
+    Quarterly and yearly period tables as records (the monthly table stays out of API payloads)
+    """
+    return {period: tables[period].to_dict("records") for period in ("quarter", "year")}
+
+
+def assess_payload(payload, fmt="csv", industry="Services", lang=None):
+    """
+    Parses and assesses a raw ledger payload (used by worker processes).
+    With `lang`, adds the tax and security guidance from that language's message bundle
+    """
+    result = run_assessment(parse_ledger(payload, fmt), industry)
+    if lang:
+        bundle = get_bundle(lang)
+        result["guidance"] = {
+            "language": bundle.language,
+            "tax": dict(bundle.section("tax_recommendations")),
+            "security": dict(bundle.section("security_recommendations")),
+        }
+    return result
+
+
+def to_jsonable(value):
+    """
+    Converts numpy/pandas scalars inside nested dicts/lists to plain Python types
+    """
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
@@ -0,0 +1,246 @@
+"""
+Portfolio Runner Module
+Sharded, resumable batch assessment of a multi-company ledger across worker processes
+
+    python -m utlis.portfolio_runner portfolio.feather --out runs/nightly --workers 8
+
+The ledger is published once as a SharedFrame; workers attach to it and
+slice each company's rows as views, without any DataFrame pickling.
+Every shard's results are written atomically to its own JSON-lines file, so
+re-running the same command after a crash only processes unfinished shards.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from utlis.instrumentation import instrument
+from utlis.pipeline import read_ledger
+from utlis.schema import normalize_ledger
+from utlis.shared_frame import SharedFrame, SharedFramePool, worker_frame
+
+MANIFEST_NAME = "manifest.json"
+
+
+# =====================================================
+# WORKERS
+# =====================================================
+def _split_records(table, company_col, n_companies):
+    """
+    Splits a multi-company table whose rows are grouped by company position
+    into one list of JSON-ready records per company
+    """
+    from utlis.pipeline import to_jsonable
+
+    bounds = np.searchsorted(table[company_col].to_numpy(), np.arange(n_companies + 1))
+    records = to_jsonable(table.drop(columns=company_col).to_dict("records"))
+    return [records[bounds[i]:bounds[i + 1]] for i in range(n_companies)]
+
+
+def _shard_sections(shared, offsets):
+    """
+    Working capital trend and period tables for every company of a shard,
+    each from one multi-company call, as precomputed dicts aligned with the companies
+    """
+    from utlis.period_analytics import compute_period_tables
+    from utlis.working_capital import working_capital_timeseries
+
+    n_companies = len(offsets) - 1
+    df = shared.frame(offsets[0], offsets[-1])
+    if "Date" not in df.columns or "Revenue" not in df.columns:
+        return [{} for _ in range(n_companies)]
+    df = df.assign(_company=np.repeat(np.arange(n_companies), np.diff(offsets)))
+
+    # Both come back grouped by company, so each company is one contiguous block
+    trends = _split_records(working_capital_timeseries(df, company_col="_company"), "_company", n_companies)
+    tables = compute_period_tables(df, company_col="_company")
+    quarters = _split_records(tables["quarter"], "_company", n_companies)
+    years = _split_records(tables["year"], "_company", n_companies)
+    return [
+        {"working_capital_trend": trends[i], "period_analytics": {"quarter": quarters[i], "year": years[i]}}
+        for i in range(n_companies)
+    ]
+
+
+def run_shard(shard_id, first_company, company_ids, industries, out_path):
+    """
+    Assesses one shard of companies and atomically writes its JSON-lines results.
+    Returns (shard_id, companies, errors)
+    """
+    from utlis.pipeline import run_assessment
+
+    shared = worker_frame()
+    offsets = shared.offsets[first_company:first_company + len(company_ids) + 1]
+    try:
+        sections = _shard_sections(shared, offsets)
+    except Exception:
+        sections = None   # fall back to per-company sections, so one bad ledger only fails itself
+
+    errors = 0
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for i, (company_id, industry) in enumerate(zip(company_ids, industries)):
+            df = shared.frame(offsets[i], offsets[i + 1])
+            record = {"company_id": company_id, "industry": industry}
+            try:
+                record["result"] = run_assessment(df, industry, sections[i] if sections else None)
+            except Exception as e:
+                errors += 1
+                record["error"] = f"{type(e).__name__}: {e}"
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    return shard_id, len(company_ids), errors
+
+
+# =====================================================
+# RUNNER
+# =====================================================
+def _fingerprint(company_ids, offsets):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(map(str, company_ids)).encode())
+    digest.update(np.asarray(offsets, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class PortfolioRunner:
+    """
+    Splits a multi-company ledger into shards of `shard_size` companies and
+    assesses them on `workers` processes, checkpointing each finished shard
+    """
+
+    def __init__(self, out_dir, workers=None, shard_size=2000, company_col="company_id",
+                 industry_col="industry", default_industry="Services", log=print):
+        self.out_dir = out_dir
+        self.workers = workers or os.cpu_count() or 2
+        self.shard_size = shard_size
+        self.company_col = company_col
+        self.industry_col = industry_col
+        self.default_industry = default_industry
+        self.log = log
+        os.makedirs(out_dir, exist_ok=True)
+
+    def shard_path(self, shard_id):
+        return os.path.join(self.out_dir, f"shard-{shard_id:06d}.jsonl")
+
+    def _prepare(self, df):
+        df = normalize_ledger(df)
+        if self.company_col not in df.columns:
+            raise ValueError(f"Portfolio ledger needs a '{self.company_col}' column")
+        columns = [c for c in df.columns if c != self.industry_col]
+        shared = SharedFrame.publish(df, group_col=self.company_col, columns=columns)
+
+        if self.industry_col in df.columns:
+            industries = (df.groupby(self.company_col)[self.industry_col].first().reindex(shared.groups)
+                          .fillna(self.default_industry).astype(str).tolist())
+        else:
+            industries = [self.default_industry] * len(shared.groups)
+        return shared, industries
+
+    def _check_manifest(self, fingerprint, n_companies):
+        path = os.path.join(self.out_dir, MANIFEST_NAME)
+        manifest = {"fingerprint": fingerprint, "companies": n_companies, "shard_size": self.shard_size}
+        if os.path.exists(path):
+            with open(path) as f:
+                existing = json.load(f)
+            if existing != manifest:
+                raise ValueError(f"{self.out_dir} holds a run over a different portfolio or shard size; "
+                                 "use a new output directory")
+        else:
+            with open(path, "w") as f:
+                json.dump(manifest, f)
+
+    @instrument("portfolio_runner.run")
+    def run(self, df):
+        """
+        Assesses every company, skipping shards already checkpointed by a previous run.
+        Returns {"companies", "shards", "skipped_shards", "errors", "elapsed_s"}
+        """
+        started = time.perf_counter()
+        shared, industries = self._prepare(df)
+        try:
+            return self._run(shared, industries, started)
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def _run(self, shared, industries, started):
+        company_ids = [str(c) for c in shared.groups]
+        n_companies = len(company_ids)
+        self._check_manifest(_fingerprint(company_ids, shared.offsets), n_companies)
+
+        # Partial files left by workers that died mid-shard
+        for name in os.listdir(self.out_dir):
+            if name.endswith(".jsonl.tmp"):
+                os.remove(os.path.join(self.out_dir, name))
+
+        shards = [(i, start, min(start + self.shard_size, n_companies))
+                  for i, start in enumerate(range(0, n_companies, self.shard_size))]
+        pending = [s for s in shards if not os.path.exists(self.shard_path(s[0]))]
+        skipped = len(shards) - len(pending)
+        if skipped:
+            self.log(f"Resuming: {skipped}/{len(shards)} shards already done")
+
+        done_companies = errors = 0
+        todo_companies = sum(stop - start for _, start, stop in pending)
+        with SharedFramePool(shared, self.workers) as pool:
+            futures = [
+                pool.submit_raw(run_shard, shard_id, start, company_ids[start:stop],
+                                industries[start:stop], self.shard_path(shard_id))
+                for shard_id, start, stop in pending
+            ]
+            for finished, future in enumerate(as_completed(futures), 1):
+                _, count, shard_errors = future.result()
+                done_companies += count
+                errors += shard_errors
+                elapsed = time.perf_counter() - started
+                rate = done_companies / elapsed if elapsed > 0 else 0.0
+                eta = (todo_companies - done_companies) / rate if rate else 0.0
+                self.log(f"[{finished + skipped}/{len(shards)} shards] {done_companies}/{todo_companies} "
+                         f"companies, {rate:.0f}/s, ETA {eta:.0f}s, {errors} errors")
+
+        return {
+            "companies": n_companies,
+            "shards": len(shards),
+            "skipped_shards": skipped,
+            "errors": errors,
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        }
+
+
+def iter_results(out_dir):
+    """
+    Yields every checkpointed company record, in shard order
+    """
+    for name in sorted(os.listdir(out_dir)):
+        if name.startswith("shard-") and name.endswith(".jsonl"):
+            with open(os.path.join(out_dir, name), encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assess a multi-company ledger in resumable shards")
+    parser.add_argument("ledger", help="csv, parquet or feather ledger with a company_id column")
+    parser.add_argument("--out", required=True, help="checkpoint directory (reuse it to resume)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=2000)
+    parser.add_argument("--company-col", default="company_id")
+    parser.add_argument("--industry-col", default="industry")
+    args = parser.parse_args()
+
+    runner = PortfolioRunner(args.out, args.workers, args.shard_size, args.company_col, args.industry_col,
+                             log=lambda message: print(message, file=sys.stderr, flush=True))
+    summary = runner.run(read_ledger(args.ledger))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
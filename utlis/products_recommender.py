@@ -3,6 +3,10 @@ Financial Products Recommender Module
 Suggests suitable financial products based on business profile
 """
 
+from utlis.instrumentation import instrument
+
+
+@instrument("products_recommender.recommend_financial_products")
 def recommend_financial_products(score, revenue, industry, metrics, working_capital):
     """
     Recommends suitable financial products from banks and NBFCs
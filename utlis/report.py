@@ -1,26 +1,521 @@
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
-from reportlab.lib.styles import getSampleStyleSheet
+"""
+Report Module
+Multilingual PDF assessment reports with embedded, subsetted Indic fonts
 
+    python -m utlis.report runs/nightly --out reports --lang Hindi
 
-def generate_pdf(metrics, score, filename="financial_report.pdf"):
+Text is set in Helvetica; runs of Devanagari or Tamil switch to a TrueType
+font found in REPORT_FONT_DIR or the system font directories (Noto Sans
+Devanagari / Tamil, Lohit, Mangal, Latha). Rendering Indic text without
+such a font raises RuntimeError rather than producing a PDF of empty boxes.
+Each font is registered once per process and only the glyphs a report uses
+are embedded. Paragraph styles,
+table styles and page geometry are built once per language and shared by
+every report; the static header and footer are drawn once per document as a
+form and referenced from each page.
+"""
 
-    styles = getSampleStyleSheet()
-    elements = []
+import argparse
+import io
+import os
+import re
+import sys
+import threading
+import time
+from datetime import date
+from xml.sax.saxutils import escape
 
-    doc = SimpleDocTemplate(filename)
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.shapes import Drawing, Line, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import BaseDocTemplate, Frame, KeepTogether, PageTemplate, Paragraph, Spacer, Table, TableStyle
 
-    elements.append(Paragraph("Financial Health Report", styles["Heading1"]))
-    elements.append(Spacer(1, 20))
+from utlis.instrumentation import instrument
+from utlis.localization import get_bundle, industry_name, language_code
 
-    elements.append(Paragraph(f"Health Score: {score}/100", styles["Heading2"]))
-    elements.append(Spacer(1, 20))
+BASE_FONT, BASE_BOLD = "Helvetica", "Helvetica-Bold"
 
-    items = []
-    for k, v in metrics.items():
-        items.append(ListItem(Paragraph(f"{k}: {v}", styles["BodyText"])))
+# Script -> (Unicode block, candidate (regular, bold) font files in preference order)
+SCRIPT_FONTS = {
+    "Devanagari": ((0x0900, 0x097F), [
+        ("NotoSansDevanagari-Regular.ttf", "NotoSansDevanagari-Bold.ttf"),
+        ("Lohit-Devanagari.ttf", None),
+        ("Mangal.ttf", "Mangalb.ttf"),
+    ]),
+    "Tamil": ((0x0B80, 0x0BFF), [
+        ("NotoSansTamil-Regular.ttf", "NotoSansTamil-Bold.ttf"),
+        ("Lohit-Tamil.ttf", None),
+        ("Latha.ttf", "Lathab.ttf"),
+    ]),
+}
 
-    elements.append(ListFlowable(items))
+FONT_DIRS = ["/usr/share/fonts", "/usr/local/share/fonts", "~/.fonts", "~/.local/share/fonts",
+             "/Library/Fonts", "C:/Windows/Fonts"]
 
-    doc.build(elements)
+SERIES_COLORS = [colors.HexColor("#1f77b4"), colors.HexColor("#ff7f0e")]
+MAX_PERIOD_ROWS = 8
 
+# One capturing group per script, matching runs of it (with the joiners Indic text uses inside words)
+_SCRIPTS = list(SCRIPT_FONTS)
+_SCRIPT_RUN = re.compile("|".join(f"([{chr(lo)}-{chr(hi)}\u200c\u200d]+)"
+                                  for (lo, hi), _ in SCRIPT_FONTS.values()))
+# Emoji and other characters outside the Basic Multilingual Plane have no glyph in any report font
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+# =====================================================
+# FONTS
+# =====================================================
+_font_files = None
+_fonts = {}
+_fonts_lock = threading.RLock()
+
+
+def _find_font_files():
+    """
+    {lowercase file name: path} of every TrueType font under the font directories
+    """
+    found = {}
+    for directory in [os.getenv("REPORT_FONT_DIR", "fonts"), *FONT_DIRS]:
+        for root, _, files in os.walk(os.path.expanduser(directory)):
+            for name in files:
+                if name.lower().endswith((".ttf", ".otf")):
+                    found.setdefault(name.lower(), os.path.join(root, name))
+    return found
+
+
+def script_font(script, bold=False):
+    """
+    Registered font name for a script, registering it on first use.
+    Raises RuntimeError when no font for the script is installed
+    """
+    key = (script, bold)
+    if key in _fonts:
+        return _fonts[key]
+    global _font_files
+    with _fonts_lock:
+        if key not in _fonts:
+            if _font_files is None:
+                _font_files = _find_font_files()
+            name = None
+            for regular, heavy in SCRIPT_FONTS[script][1]:
+                path = _font_files.get(((heavy if bold else None) or regular).lower())
+                if path:
+                    name = f"Report{script}{'-Bold' if bold and heavy else ''}"
+                    if name not in pdfmetrics.getRegisteredFontNames():
+                        # TrueType fonts are embedded as subsets of the glyphs actually used
+                        pdfmetrics.registerFont(TTFont(name, path))
+                    break
+            if name is None:
+                if not bold:
+                    _font_files = None   # rescan on the next report, once fonts are provisioned
+                    candidates = ", ".join(regular for regular, _ in SCRIPT_FONTS[script][1])
+                    raise RuntimeError(
+                        f"No {script} font found for the PDF report. Put one of {candidates} in "
+                        f"REPORT_FONT_DIR ({os.getenv('REPORT_FONT_DIR', 'fonts')}) or a system font directory; "
+                        f"see fonts/README.md")
+                name = script_font(script)
+            _fonts[key] = name
+        return _fonts[key]
+
+
+def markup(text, bold=False):
+    """
+    Escaped paragraph markup for `text`, with every Devanagari or Tamil run
+    switched to its script font
+    """
+    text = _ASTRAL.sub("", str(text)).replace("₹", "Rs.").strip()
+    parts, position = [], 0
+    for match in _SCRIPT_RUN.finditer(text):
+        parts.append(escape(text[position:match.start()]))
+        run = match.group(0)
+        font = script_font(_SCRIPTS[match.lastindex - 1], bold)
+        parts.append(f'<font name="{font}">{escape(run)}</font>')
+        position = match.end()
+    parts.append(escape(text[position:]))
+    return "".join(parts)
+
+
+# =====================================================
+# TEMPLATES
+# =====================================================
+class ReportTemplate:
+    """
+    Styles, table styles, page geometry and pre-marked-up labels for one
+    language. Built once and only read while documents are laid out, so
+    concurrent reports share it
+    """
+
+    def __init__(self, lang="English", pagesize=A4):
+        self.bundle = get_bundle(lang)
+        self.lang = lang
+        self.pagesize = pagesize
+        width, height = pagesize
+        self.margin = 18 * mm
+        self.frame = (self.margin, self.margin + 6 * mm, width - 2 * self.margin, height - 2 * self.margin - 18 * mm)
+
+        def style(name, size, bold=False, **kw):
+            return ParagraphStyle(name, fontName=BASE_BOLD if bold else BASE_FONT, fontSize=size,
+                                  leading=size * 1.35, shaping=1, **kw)
+
+        self.styles = {
+            "title": style("title", 18, bold=True, spaceAfter=2),
+            "subtitle": style("subtitle", 9, textColor=colors.grey, spaceAfter=10),
+            "heading": style("heading", 13, bold=True, spaceBefore=10, spaceAfter=5),
+            "score": style("score", 24, bold=True),
+            "body": style("body", 9.5),
+            "bullet": style("bullet", 9.5, leftIndent=10, bulletIndent=2),
+            "cell": style("cell", 8.5),
+            "cell_head": style("cell_head", 8.5, bold=True, textColor=colors.white),
+            "small": style("small", 7.5, textColor=colors.grey),
+        }
+        self.table_style = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2f4f6f")),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f2f5f8")]),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#c8d0d8")),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("TOPPADDING", (0, 0), (-1, -1), 3),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+        ])
+        # Every label is marked up once (registering the script fonts it needs) instead of per report
+        self.labels = {key: markup(text) for key, text in self.bundle.section("report").items()}
+        self.ui = {key: markup(text) for key, text in self.bundle.section("ui").items()}
+        self.guidance = [markup(text) for text in self.bundle.section("tax_recommendations").values()]
+        self.industries = {}
+
+    def industry(self, key):
+        if key not in self.industries:
+            self.industries[key] = markup(industry_name(key, self.lang))
+        return self.industries[key]
+
+    def page_templates(self, heading):
+        """
+        Fresh PageTemplate over the cached geometry (frames hold layout state, so are per document)
+        """
+        def decorate(canvas, doc):
+            self._draw_page(canvas, doc, heading)
+
+        return [PageTemplate(id="report", frames=[Frame(*self.frame, id="body", leftPadding=0, rightPadding=0)],
+                             onPage=decorate, pagesize=self.pagesize)]
+
+    def _draw_page(self, canvas, doc, heading):
+        width, height = self.pagesize
+        if not getattr(doc, "_static_form", False):
+            # Header and footer text are identical on every page: draw them once per document
+            canvas.beginForm("static")
+            header = Paragraph(heading, self.styles["small"])
+            header.wrapOn(canvas, width - 2 * self.margin, 20)
+            header.drawOn(canvas, self.margin, height - self.margin - 4 * mm)
+            canvas.setStrokeColor(colors.HexColor("#c8d0d8"))
+            canvas.setLineWidth(0.5)
+            canvas.line(self.margin, height - self.margin - 6 * mm, width - self.margin, height - self.margin - 6 * mm)
+            footer = Paragraph(self.ui.get("secure", ""), self.styles["small"])
+            footer.wrapOn(canvas, width - 2 * self.margin - 30 * mm, 20)
+            footer.drawOn(canvas, self.margin, self.margin - 4 * mm)
+            canvas.endForm()
+            doc._static_form = True
+        canvas.doForm("static")
+        page = Paragraph(f'{self.labels["page"]} {doc.page}', self.styles["small"])
+        page.wrapOn(canvas, 30 * mm, 20)
+        page.drawOn(canvas, width - self.margin - page.minWidth(), self.margin - 4 * mm)
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_report_template(lang="English", pagesize=A4):
+    """
+    Process-wide ReportTemplate per language and page size
+    """
+    key = (language_code(lang), tuple(pagesize))
+    template = _templates.get(key)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(key)
+            if template is None:
+                template = _templates[key] = ReportTemplate(lang, pagesize)
+    return template
+
+
+# =====================================================
+# SECTIONS
+# =====================================================
+def _fmt(value, decimals=2):
+    if value is None:
+        return "–"
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (int, float)):
+        if value != value:   # NaN
+            return "–"
+        return f"{value:,.0f}" if abs(value) >= 1000 or float(value).is_integer() else f"{value:,.{decimals}f}"
+    return str(value)
+
+
+def _table(template, header, rows, widths):
+    cell, head = template.styles["cell"], template.styles["cell_head"]
+    data = [[Paragraph(h, head) for h in header]]
+    data += [[Paragraph(c, cell) for c in row] for row in rows]
+    total = template.frame[2]
+    table = Table(data, colWidths=[total * w for w in widths], repeatRows=1, hAlign="LEFT")
+    table.setStyle(template.table_style)
+    return table
+
+
+def _bullets(template, items):
+    return [Paragraph(markup(item), template.styles["bullet"], bulletText="•") for item in items]
+
+
+def _score_band(score, width):
+    """
+    0-100 band (red / orange / green as on the dashboard gauge) with a marker at the score
+    """
+    drawing = Drawing(width, 22)
+    for lo, hi, color in [(0, 40, "#d62728"), (40, 70, "#ff7f0e"), (70, 100, "#2ca02c")]:
+        drawing.add(Rect(width * lo / 100, 6, width * (hi - lo) / 100, 8, fillColor=colors.HexColor(color),
+                         strokeColor=None))
+    x = width * max(0, min(100, score)) / 100
+    drawing.add(Line(x, 2, x, 18, strokeColor=colors.black, strokeWidth=2))
+    for tick in (0, 40, 70, 100):
+        drawing.add(String(width * tick / 100, -4, str(tick), fontName=BASE_FONT, fontSize=6,
+                           textAnchor="middle" if 0 < tick < 100 else ("start" if tick == 0 else "end")))
+    return drawing
+
+
+def _axis_labels(labels, max_labels=12):
+    step = max(1, -(-len(labels) // max_labels))
+    return [label if i % step == 0 else "" for i, label in enumerate(labels)]
+
+
+def _trend_chart(rows, width):
+    """
+    Revenue and expense lines per period
+    """
+    drawing = Drawing(width, 150)
+    chart = HorizontalLineChart()
+    chart.x, chart.y, chart.width, chart.height = 40, 25, width - 50, 115
+    chart.data = [[r.get("Revenue") or 0 for r in rows], [r.get("Expense") or 0 for r in rows]]
+    chart.categoryAxis.categoryNames = _axis_labels([str(r.get("Label", "")) for r in rows])
+    chart.categoryAxis.labels.fontName = BASE_FONT
+    chart.categoryAxis.labels.fontSize = 6
+    chart.categoryAxis.labels.angle = 30
+    chart.categoryAxis.labels.boxAnchor = "ne"
+    chart.valueAxis.labels.fontName = BASE_FONT
+    chart.valueAxis.labels.fontSize = 6
+    chart.valueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    for i, color in enumerate(SERIES_COLORS):
+        chart.lines[i].strokeColor = color
+        chart.lines[i].strokeWidth = 1.5
+    drawing.add(chart)
+    return drawing
+
+
+def _profit_chart(rows, width):
+    """
+    Profit bars per period (losses in red)
+    """
+    drawing = Drawing(width, 130)
+    chart = VerticalBarChart()
+    chart.x, chart.y, chart.width, chart.height = 40, 20, width - 50, 100
+    profits = [r.get("Profit") or 0 for r in rows]
+    chart.data = [profits]
+    chart.categoryAxis.categoryNames = _axis_labels([str(r.get("Label", "")) for r in rows])
+    chart.categoryAxis.labels.fontName = BASE_FONT
+    chart.categoryAxis.labels.fontSize = 6
+    chart.valueAxis.labels.fontName = BASE_FONT
+    chart.valueAxis.labels.fontSize = 6
+    chart.valueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    chart.bars[0].fillColor = colors.HexColor("#2ca02c")
+    chart.bars[0].strokeColor = None
+    for i, profit in enumerate(profits):
+        if profit < 0:
+            chart.bars[(0, i)].fillColor = colors.HexColor("#d62728")
+    drawing.add(chart)
+    return drawing
+
+
+def _legend(template):
+    ui = template.ui
+    return Paragraph(f'<font color="{SERIES_COLORS[0].hexval()}">{ui["revenue"]}</font> &nbsp; '
+                     f'<font color="{SERIES_COLORS[1].hexval()}">{ui["expenses"]}</font>', template.styles["small"])
+
+
+def _story(template, assessment, company=None, industry=None):
+    labels, ui, styles = template.labels, template.ui, template.styles
+    width = template.frame[2]
+    story = [Paragraph(labels["title"], styles["title"])]
+    subtitle = [f'{labels["generated"]}: {date.today().isoformat()}']
+    if company is not None:
+        subtitle.append(f'{labels["company"]}: {markup(company)}')
+    if industry:
+        subtitle.append(f'{labels["industry"]}: {template.industry(industry)}')
+    story.append(Paragraph(" &nbsp;|&nbsp; ".join(subtitle), styles["subtitle"]))
+
+    # Health score
+    score = assessment.get("health_score", 0)
+    status = ui["healthy"] if score > 70 else ui["moderate_risk"] if score > 40 else ui["high_risk"]
+    story += [Paragraph(ui["financial_health"], styles["heading"]),
+              Paragraph(f"{score}/100", styles["score"]), Spacer(1, 4),
+              _score_band(score, width), Spacer(1, 6), Paragraph(status, styles["body"])]
+
+    # Key metrics
+    names = {"Revenue": ui["revenue"], "Profit Margin": ui["profit_margin"], "Expense Ratio": ui["expense_ratio"]}
+    rows = [[names.get(k, escape(k)), _fmt(v)] for k, v in assessment.get("metrics", {}).items()]
+    story += [Paragraph(ui["key_metrics"], styles["heading"]),
+              _table(template, [labels["metric"], labels["value"]], rows, [0.6, 0.4])]
+
+    # Charts and period table
+    periods = assessment.get("period_analytics") or {}
+    trend = (periods.get("month") or periods.get("quarter") or [])[-36:]
+    quarters = (periods.get("quarter") or [])[-MAX_PERIOD_ROWS:]
+    if trend:
+        story.append(KeepTogether([Paragraph(ui["revenue_vs_expense"], styles["heading"]), _legend(template),
+                                   _trend_chart(trend, width)]))
+    if quarters:
+        story.append(KeepTogether([Paragraph(labels["quarterly_profit"], styles["heading"]),
+                                   _profit_chart(quarters, width)]))
+        header = [labels["period"], ui["revenue"], ui["expenses"], ui["profit"], ui["profit_margin"],
+                  labels["revenue_qoq"], labels["revenue_yoy"]]
+        rows = [[escape(str(q.get("Label", ""))), _fmt(q.get("Revenue")), _fmt(q.get("Expense")),
+                 _fmt(q.get("Profit")), _fmt(q.get("Profit Margin")), _fmt(q.get("Revenue QoQ %")),
+                 _fmt(q.get("Revenue YoY %"))] for q in quarters]
+        story += [Paragraph(labels["period_performance"], styles["heading"]),
+                  _table(template, header, rows, [0.13, 0.15, 0.15, 0.15, 0.14, 0.14, 0.14])]
+
+    # Creditworthiness
+    credit = assessment.get("credit_assessment")
+    if credit:
+        rating = credit.get("credit_rating", {})
+        risk = credit.get("default_risk", {})
+        story += [Paragraph(ui["creditworthiness"], styles["heading"]),
+                  Paragraph(f'<b>{labels["credit_rating"]}:</b> {escape(str(rating.get("rating", "")))} '
+                            f'({escape(str(rating.get("description", "")))})', styles["body"]),
+                  Paragraph(f'<b>{labels["default_risk"]}:</b> {escape(str(risk.get("default_probability", "")))} '
+                            f'- {escape(str(risk.get("interpretation", "")))}', styles["body"]),
+                  Spacer(1, 6)]
+        loans = credit.get("loan_eligibility", {})
+        if loans:
+            rows = [[escape(name.replace("_", " ").title()), labels["yes"] if loan.get("eligible") else labels["no"],
+                     markup(loan.get("loan_amount", "–")), escape(str(loan.get("tenor", "–")))]
+                    for name, loan in loans.items()]
+            story += [Paragraph(labels["loan_eligibility"], styles["heading"]),
+                      _table(template, [labels["product"], labels["eligible"], labels["amount"], labels["tenor"]],
+                             rows, [0.34, 0.14, 0.28, 0.24])]
+        factors = [f'{f.get("factor", "")} ({f.get("severity", "")}): {f.get("mitigation", "")}'
+                   for f in credit.get("risk_factors", [])]
+        if factors:
+            story += [Paragraph(labels["risk_factors"], styles["heading"]), *_bullets(template, factors)]
+        if credit.get("strengths"):
+            story += [Paragraph(labels["strengths"], styles["heading"]), *_bullets(template, credit["strengths"])]
+
+    # Tax
+    tax = assessment.get("tax_compliance")
+    if tax:
+        rows = [[labels["gst_eligible"], labels["yes"] if tax.get("gst_eligible") else labels["no"]],
+                [labels["income_tax_slab"], escape(str(tax.get("income_tax_slab", "–")))],
+                [labels["compliance_score"], _fmt(tax.get("compliance_score"))]]
+        story += [Paragraph(labels["tax_compliance"], styles["heading"]),
+                  _table(template, [labels["metric"], labels["value"]], rows, [0.6, 0.4])]
+        if tax.get("issues"):
+            story += [Paragraph(labels["issues"], styles["heading"]), *_bullets(template, tax["issues"])]
+        if tax.get("recommendations"):
+            story += [Paragraph(labels["recommendations"], styles["heading"]),
+                      *_bullets(template, tax["recommendations"])]
+        story += [Paragraph(labels["compliance_guidance"], styles["heading"]),
+                  *[Paragraph(text, styles["bullet"], bulletText="•") for text in template.guidance]]
+    return story
+
+
+# =====================================================
+# RENDERING
+# =====================================================
+@instrument("report.render")
+def render_report(assessment, lang="English", company=None, industry=None, pagesize=A4):
+    """
+    PDF bytes for one assessment (the run_assessment / portfolio runner
+    result shape: metrics, health_score, credit_assessment, tax_compliance and
+    optional period_analytics records)
+    """
+    template = get_report_template(lang, pagesize)
+    buffer = io.BytesIO()
+    doc = BaseDocTemplate(buffer, pagesize=pagesize, pageCompression=1, invariant=1,
+                          title=template.bundle["report.title"], author="SME Financial Health Tool")
+    heading = template.labels["title"] + (f" - {markup(company)}" if company is not None else "")
+    doc.addPageTemplates(template.page_templates(heading))
+    doc.build(_story(template, assessment, company, industry))
+    return buffer.getvalue()
+
+
+def report_assessment(metrics, score, df=None, industry="Services"):
+    """
+    Assessment dict for render_report from dashboard results, adding the
+    credit, tax and (for dated ledgers) period sections
+    """
+    from utlis.creditworthiness import detailed_creditworthiness_assessment
+    from utlis.tax_compliance import check_tax_compliance
+    from utlis.working_capital import analyze_working_capital
+
+    revenue = metrics.get("Revenue", 0)
+    expenses = metrics.get("Expense Ratio", 0) * revenue / 100
+    wc_analysis = analyze_working_capital(df, revenue, expenses) if df is not None else None
+    assessment = {
+        "metrics": metrics,
+        "health_score": score,
+        "credit_assessment": detailed_creditworthiness_assessment(metrics, score, industry, revenue, wc_analysis),
+        "tax_compliance": check_tax_compliance(metrics, revenue, expenses, industry),
+    }
+    if df is not None and "Date" in df.columns and "Revenue" in df.columns:
+        from utlis.pipeline import to_jsonable
+        from utlis.period_analytics import period_analytics
+
+        tables = period_analytics(df)
+        assessment["period_analytics"] = to_jsonable(
+            {period: tables[period].to_dict("records") for period in ("month", "quarter")})
+    return assessment
+
+
+@instrument("report.generate_pdf")
+def generate_pdf(metrics, score, filename="financial_report.pdf", lang="English", df=None, industry="Services",
+                 company=None):
+    """
+    Writes the assessment report for one company to `filename`
+    """
+    pdf = render_report(report_assessment(metrics, score, df, industry), lang, company, industry)
+    with open(filename, "wb") as f:
+        f.write(pdf)
     return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDF reports for a portfolio run")
+    parser.add_argument("results", help="portfolio runner output directory")
+    parser.add_argument("--out", required=True, help="directory for <company_id>.pdf files")
+    parser.add_argument("--lang", default="English")
+    args = parser.parse_args()
+
+    from utlis.portfolio_runner import iter_results
+
+    os.makedirs(args.out, exist_ok=True)
+    started, written, size = time.perf_counter(), 0, 0
+    for record in iter_results(args.results):
+        if "result" not in record:
+            continue
+        pdf = render_report(record["result"], args.lang, record["company_id"], record.get("industry"))
+        with open(os.path.join(args.out, f"{record['company_id']}.pdf"), "wb") as f:
+            f.write(pdf)
+        written += 1
+        size += len(pdf)
+    elapsed = time.perf_counter() - started
+    print(f"{written} reports in {elapsed:.1f}s ({elapsed / max(written, 1) * 1000:.0f} ms, "
+          f"{size / max(written, 1) / 1024:.0f} KiB each)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Ledger Schema Module
+Maps uploaded column headers to canonical column names and dtypes once at ingestion
+"""
+
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+from utlis.instrumentation import instrument
+from utlis.date_parsing import parse_dates
+from utlis.transaction_categorizer import derive_flows
+
+# Canonical ledger columns and their dtypes. Downstream modules only use these names
+CANONICAL_COLUMNS = {
+    "Date": "datetime64[ns]",
+    "Revenue": "float64",
+    "Expense": "float64",
+    "Loan": "float64",
+    "Receivable": "float64",
+    "Payable": "float64",
+    "Inventory": "float64",
+    "Salaries": "float64",
+    "Credit": "float64",
+    "Debit": "float64",
+    "Description": "string",
+}
+
+REQUIRED_COLUMNS = ["Date", "Revenue", "Expense"]
+
+# Bank-statement columns Revenue / Expense are derived from when a ledger lacks them.
+# Not every credit is revenue (loan disbursals, own transfers), so they stay separate
+FLOW_COLUMNS = {"Revenue": "Credit", "Expense": "Debit"}
+
+# Header synonyms (English, Hindi, Tamil) per canonical column
+COLUMN_ALIASES = {
+    "Date": ["date", "month", "period", "txn date", "transaction date", "posting date",
+             "दिनांक", "तारीख", "महीना", "தேதி", "மாதம்"],
+    "Revenue": ["revenue", "revenues", "sales", "turnover", "income", "total sales", "gross sales",
+                "राजस्व", "बिक्री", "आय", "வருவாய்", "விற்பனை"],
+    "Expense": ["expense", "expenses", "expenditure", "costs", "total expenses", "total cost",
+                "व्यय", "खर्च", "செலவு", "செலவுகள்"],
+    "Loan": ["loan", "loans", "debt", "borrowings", "loan balance", "outstanding loan",
+             "ऋण", "कर्ज", "கடன்"],
+    "Receivable": ["receivable", "receivables", "accounts receivable", "trade receivables",
+                   "debtors", "sundry debtors", "ar", "प्राप्य", "देनदार", "வரவு", "பெறத்தக்கவை"],
+    "Payable": ["payable", "payables", "accounts payable", "trade payables", "creditors",
+                "sundry creditors", "ap", "देय", "लेनदार", "செலுத்தத்தக்கவை"],
+    "Inventory": ["inventory", "stock", "closing stock", "stock in trade",
+                  "इन्वेंटरी", "स्टॉक", "माल", "சரக்கு", "இருப்பு"],
+    "Salaries": ["salaries", "salary", "personnel", "payroll", "wages", "staff cost", "employee cost",
+                 "वेतन", "तनख्वाह", "சம்பளம்", "ஊதியம்"],
+    # Bank statement amount columns
+    "Credit": ["credit", "credits", "deposit", "deposits", "deposit amt", "credit amount", "cr", "cr amount",
+               "जमा", "வரவு தொகை"],
+    "Debit": ["debit", "debits", "withdrawal", "withdrawals", "withdrawal amt", "debit amount", "dr", "dr amount",
+              "नामे", "பற்று"],
+    # Bank statement / ledger narration, used for transaction categorization
+    "Description": ["description", "narration", "particulars", "memo", "details", "remarks",
+                    "transaction details", "transaction remarks", "merchant", "payee",
+                    "विवरण", "ब्यौरा", "விவரம்", "விளக்கம்"],
+}
+
+_SEPARATORS = re.compile(r"[\s_\-./()&:#%₹]+")
+
+
+def _header_key(header):
+    return _SEPARATORS.sub("", str(header).casefold())
+
+
+# Compiled once: normalized header -> canonical column
+_ALIAS_LOOKUP = {
+    _header_key(alias): canonical
+    for canonical, aliases in COLUMN_ALIASES.items()
+    for alias in [canonical] + aliases
+}
+
+
+@lru_cache(maxsize=256)
+def resolve_columns(headers):
+    """
+    Returns {source header: canonical name} for a tuple of headers.
+    Cached per header tuple, so every upload from the same template reuses the mapping.
+    When two headers resolve to the same canonical column the exact name, then the first alias, wins
+    """
+    mapping = {}
+    taken = set()
+
+    # Exact canonical headers first, so an alias never shadows a real column
+    for header in headers:
+        if header in CANONICAL_COLUMNS:
+            mapping[header] = header
+            taken.add(header)
+
+    for header in headers:
+        if header in mapping:
+            continue
+        canonical = _ALIAS_LOOKUP.get(_header_key(header))
+        if canonical and canonical not in taken:
+            mapping[header] = canonical
+            taken.add(canonical)
+    return mapping
+
+
+@instrument("schema.normalize_ledger")
+def normalize_ledger(df):
+    """
+    Returns the canonical frame: recognised columns renamed and cast to their
+    canonical dtypes, unrecognised columns kept as-is. A bank statement with
+    Credit / Debit but no Revenue / Expense gets them from the transaction
+    categorizer, which leaves out non-operating flows.
+    Idempotent; an already-normalized frame is returned unchanged
+    """
+    if df.attrs.get("canonical"):
+        return df
+
+    mapping = resolve_columns(tuple(df.columns))
+    out = df.rename(columns=mapping)
+
+    for col, dtype in CANONICAL_COLUMNS.items():
+        if col not in out.columns:
+            continue
+        if dtype.startswith("datetime"):
+            if not pd.api.types.is_datetime64_any_dtype(out[col]):
+                out[col] = parse_dates(out[col], col)
+        elif dtype == "string":
+            if out[col].dtype != dtype:
+                out[col] = out[col].astype(dtype)
+        elif out[col].dtype != dtype:
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype(dtype)
+
+    out = derive_flows(out, FLOW_COLUMNS)
+    out.attrs["canonical"] = True
+    out.attrs["schema_mapping"] = dict(mapping)
+    return out
+
+
+def has_required_columns(columns):
+    """
+    True if canonical column names include, or can derive, every required column
+    """
+    columns = set(columns)
+    return all(col in columns or FLOW_COLUMNS.get(col) in columns for col in REQUIRED_COLUMNS)
+
+
+def missing_required_columns(df):
+    """
+    Canonical required columns absent from a normalized frame
+    """
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
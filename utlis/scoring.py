@@ -1,3 +1,9 @@
+import numpy as np
+
+from utlis.instrumentation import instrument
+
+
+@instrument("scoring.health_score")
 def health_score(m):
 
     score = 0
@@ -9,3 +15,22 @@ def health_score(m):
 
     return int(min(score, 100))
 
+
+def health_score_components(profit_margin, expense_ratio, growth, working_capital):
+    """
+    Vectorized health_score components; inputs are arrays that broadcast together
+    """
+    return (
+        np.clip(profit_margin, 0, 30),
+        np.maximum(0, 30 - np.asarray(expense_ratio, dtype=float)),
+        np.clip(growth, 0, 20),
+        np.where(np.asarray(working_capital) > 0, 20, 5),
+    )
+
+
+def health_score_array(profit_margin, expense_ratio, growth, working_capital):
+    """
+    Vectorized health_score over arrays of metrics (same rules as health_score)
+    """
+    total = sum(health_score_components(profit_margin, expense_ratio, growth, working_capital))
+    return np.minimum(total, 100).astype(int)
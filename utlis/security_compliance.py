@@ -7,20 +7,28 @@ import hashlib
 import json
 from datetime import datetime
 
+from utlis.localization import get_bundle
+
 class DataSecurityManager:
     """
     Manages encryption and secure data handling
     """
     
     @staticmethod
-    def encrypt_sensitive_data(data, key="financial_health_platform"):
+    def encrypt_sensitive_data(data, tenant_id="default"):
+        """
+        Encrypts a sensitive value with the tenant's AES-256-GCM key
+        """
+        from utlis.field_encryption import encrypt_values
+        return encrypt_values([data], tenant_id)[0]
+    
+    @staticmethod
+    def decrypt_sensitive_data(token, tenant_id="default"):
         """
-        Simple encryption for sensitive data
-        In production, use proper encryption libraries like cryptography
+        Decrypts a value produced by encrypt_sensitive_data
         """
-        # Placeholder for actual encryption implementation
-        # In production use AES-256 or similar
-        return hashlib.sha256((str(data) + key).encode()).hexdigest()
+        from utlis.field_encryption import decrypt_values
+        return decrypt_values([token], tenant_id)[0]
     
     @staticmethod
     def hash_user_data(email, phone):
@@ -141,39 +149,9 @@ class ComplianceChecker:
 
 def get_security_recommendations(lang="English"):
     """
-    Provides security best practices by language
+    Provides security best practices by language (read-only view of the cached message bundle)
     """
-    recommendations = {
-        "English": {
-            "password": "Use strong passwords (minimum 12 characters with special characters)",
-            "two_factor": "Enable two-factor authentication for all accounts",
-            "data_backup": "Regular backups of financial data (daily/weekly)",
-            "access_control": "Restrict access to sensitive financial data",
-            "updates": "Keep software and security patches updated",
-            "antivirus": "Maintain active antivirus and malware protection",
-            "audit_trail": "Enable and review audit logs regularly"
-        },
-        "Hindi": {
-            "password": "मजबूत पासवर्ड का उपयोग करें (कम से कम 12 वर्ण विशेष वर्णों के साथ)",
-            "two_factor": "सभी खातों के लिए दो-कारक प्रमाणीकरण सक्षम करें",
-            "data_backup": "वित्तीय डेटा का नियमित बैकअप (दैनिक/साप्ताहिक)",
-            "access_control": "संवेदनशील वित्तीय डेटा तक पहुंच प्रतिबंधित करें",
-            "updates": "सॉफ्टवेयर और सुरक्षा पैच को अपडेट रखें",
-            "antivirus": "सक्रिय एंटीवायरस और मैलवेयर सुरक्षा बनाए रखें",
-            "audit_trail": "ऑडिट लॉग नियमित रूप से सक्षम और समीक्षा करें"
-        },
-        "Tamil": {
-            "password": "வலுவான கடவுச்சொற்களைப் பயன்படுத்தவும் (குறைந்தபட்சம் 12 எழுத்துக்கள் சிறப்பு எழுத்துக்களுடன்)",
-            "two_factor": "அனைத்து கணக்குகளுக்கும் இரண்டு-காரணி அங்கீகாரத்தை இயக்கவும்",
-            "data_backup": "நிதிய தரவுவின் வழக்கமான காப்பு (தினசரி/வாராந்திரம்)",
-            "access_control": "உணர்திறன்மிக்க நிதிய தரவுக்கான அணுகலை கட்டுப்படுத்தவும்",
-            "updates": "மென்பொருள் மற்றும் பாதுகாப்பு திருத்தங்களை புதுப்பிக்கவும்",
-            "antivirus": "செயல்பட்ட ஆண்டிவைரஸ் மற்றும் தீங்கு விளைவிக்கும் மென்பொருள் பாதுகாப்பு பராமரிக்கவும்",
-            "audit_trail": "ऑडिट लॉगை வழக்கமாக இயக்கி மதிப்பாய்வு செய்யவும்"
-        }
-    }
-    
-    return recommendations.get(lang, recommendations["English"])
+    return get_bundle(lang).section("security_recommendations")
 
 
 def generate_compliance_certificate(business_name, assessment_date, compliance_status):
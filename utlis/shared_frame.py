@@ -0,0 +1,304 @@
+"""
+Shared Frame Module
+Zero-copy handoff of canonical ledgers to worker processes through shared memory
+
+    with SharedFramePool(df, workers=4, group_col="company_id") as pool:
+        metrics = pool.map_groups(calculate_metrics)
+
+The ledger is published once as one shared-memory block per column; workers
+attach in their initializer and every task only carries a function reference
+and a row range, so fan-out cost does not grow with the ledger size.
+"""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+
+
+def _attach_block(name):
+    """
+    Attaches to an existing block without taking ownership of it (the
+    publishing process unlinks it)
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: pool workers share the parent's tracker, where the
+        # block is already registered, so re-registering is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
+def _readonly(block, shape, dtype):
+    view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    view.flags.writeable = False   # shared by every worker; never modified in place
+    return view
+
+
+class SharedFrame:
+    """
+    A DataFrame whose columns live in shared memory.
+
+    Numeric and bool columns are stored as-is, datetimes as int64
+    nanoseconds, and string/object columns as integer codes whose categories
+    are pickled once into their own block. `frame()` rebuilds a pandas view
+    (string columns come back as Categoricals over the shared codes).
+
+    With `group_col`, rows are stably sorted by group and `group(i)` returns
+    the rows of the i-th group; the original index labels are kept
+    """
+
+    def __init__(self, blocks, layout, owner):
+        self._blocks = blocks
+        self.layout = layout
+        self._owner = owner
+        self.columns = {}
+        self.categories = {}
+        for name, (kind, shape, dtype) in layout["columns"].items():
+            self.columns[name] = _readonly(blocks[name], shape, dtype)
+            if kind == "category":
+                self.categories[name] = pickle.loads(bytes(blocks[f"{name}.categories"].buf[:layout["sizes"][name]]))
+        self.index = _readonly(blocks["__index__"], *layout["index"]) if "__index__" in blocks else None
+        self.offsets = _readonly(blocks["__offsets__"], *layout["offsets"]) if "__offsets__" in blocks else None
+        self.groups = layout.get("groups")
+
+    # ---------- publishing ----------
+
+    @classmethod
+    @instrument("shared_frame.publish")
+    def publish(cls, df, group_col=None, columns=None):
+        """
+        Copies `df` (or the given columns) into new shared-memory blocks owned
+        by the caller, who must close() and unlink() them (or use `with`)
+        """
+        if group_col is not None:
+            df = df.sort_values(group_col, kind="stable")
+        names = [c for c in (columns or df.columns) if c != group_col]
+
+        arrays, layout = {}, {"columns": {}, "sizes": {}}
+        for name in names:
+            series = df[name]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                if getattr(series.dtype, "tz", None) is not None:
+                    series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+                values = series.to_numpy(dtype="datetime64[ns]").view(np.int64)
+                layout["columns"][name] = ("datetime", values.shape, values.dtype.str)
+            elif pd.api.types.is_bool_dtype(series) and not series.hasnans:
+                values = series.to_numpy(dtype=bool)
+                layout["columns"][name] = ("array", values.shape, values.dtype.str)
+            elif pd.api.types.is_numeric_dtype(series):
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan) if series.hasnans else series.to_numpy()
+                layout["columns"][name] = ("array", values.shape, values.dtype.str)
+            else:
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                # Smallest code width, matching what pandas uses, so Categoricals wrap the block without a copy
+                width = next(t for t in (np.int8, np.int16, np.int32, np.int64) if len(uniques) < np.iinfo(t).max)
+                values = codes.astype(width)
+                payload = pickle.dumps(np.asarray(uniques, dtype=object), protocol=pickle.HIGHEST_PROTOCOL)
+                arrays[f"{name}.categories"] = np.frombuffer(payload, dtype=np.uint8)
+                layout["sizes"][name] = len(payload)
+                layout["columns"][name] = ("category", values.shape, values.dtype.str)
+            arrays[name] = values
+
+        if not isinstance(df.index, pd.RangeIndex) or df.index.step != 1 or group_col is not None:
+            index = np.asarray(df.index)
+            if index.dtype.kind in "iu":
+                arrays["__index__"] = index.astype(np.int64)
+                layout["index"] = (index.shape, "<i8")
+        layout["start"] = int(df.index[0]) if isinstance(df.index, pd.RangeIndex) and len(df) else 0
+
+        if group_col is not None:
+            codes, groups = pd.factorize(df[group_col], sort=False)
+            # Rows with a missing group sort last and fall outside every group
+            counts = np.bincount(codes[codes >= 0], minlength=len(groups))
+            offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+            arrays["__offsets__"] = offsets
+            layout["offsets"] = (offsets.shape, "<i8")
+            layout["groups"] = groups.tolist()
+            layout["group_col"] = group_col
+
+        blocks = {}
+        try:
+            for name, values in arrays.items():
+                values = np.ascontiguousarray(values)
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                blocks[name] = block
+        except BaseException:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+            raise
+        layout["blocks"] = {name: block.name for name, block in blocks.items()}
+        layout["rows"] = len(df)
+        return cls(blocks, layout, owner=True)
+
+    @property
+    def spec(self):
+        """
+        Small picklable description that lets another process attach
+        """
+        return self.layout
+
+    @classmethod
+    def attach(cls, spec):
+        blocks = {name: _attach_block(block_name) for name, block_name in spec["blocks"].items()}
+        return cls(blocks, spec, owner=False)
+
+    # ---------- views ----------
+
+    def __len__(self):
+        return self.layout["rows"]
+
+    def frame(self, start=0, stop=None, columns=None):
+        """
+        Canonical DataFrame over rows [start, stop) backed directly by shared memory
+        """
+        stop = len(self) if stop is None else stop
+        data = {}
+        for name in columns or self.columns:
+            kind = self.layout["columns"][name][0]
+            values = self.columns[name][start:stop]
+            if kind == "datetime":
+                data[name] = values.view("datetime64[ns]")
+            elif kind == "category":
+                data[name] = pd.Categorical.from_codes(values, categories=self.categories[name], validate=False)
+            else:
+                data[name] = values
+        if self.index is not None:
+            index = pd.Index(self.index[start:stop], copy=False)
+        else:
+            base = self.layout["start"]
+            index = pd.RangeIndex(base + start, base + stop)
+        df = pd.DataFrame(data, index=index, copy=False)
+        df.attrs["canonical"] = True
+        return df
+
+    def group_bounds(self, i):
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def group(self, i, columns=None):
+        """
+        Rows of the i-th group (in `groups` order)
+        """
+        return self.frame(*self.group_bounds(i), columns=columns)
+
+    # ---------- lifetime ----------
+
+    def close(self):
+        self.columns = {}
+        self.index = self.offsets = None
+        for block in self._blocks.values():
+            block.close()
+
+    def unlink(self):
+        if self._owner:
+            for block in self._blocks.values():
+                block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.unlink()
+
+
+# =====================================================
+# WORKER POOL
+# =====================================================
+_worker_frame = None
+
+
+def _init_worker(spec, warm_modules=()):
+    global _worker_frame
+    _worker_frame = SharedFrame.attach(spec)
+    for module in warm_modules:
+        __import__(module)
+
+
+def worker_frame():
+    """
+    The SharedFrame attached in this worker process
+    """
+    return _worker_frame
+
+
+def _run_on_rows(func, start, stop, columns, args, kwargs):
+    return func(_worker_frame.frame(start, stop, columns), *args, **kwargs)
+
+
+def _run_on_groups(func, first, last, columns, args, kwargs):
+    return [func(_worker_frame.group(i, columns), *args, **kwargs) for i in range(first, last)]
+
+
+class SharedFramePool:
+    """
+    Process pool whose workers all see one published SharedFrame.
+
+    `submit(func, ...)` runs `func(view, *args, **kwargs)` in a worker, where
+    view covers the requested rows; func must be importable (module level)
+    """
+
+    def __init__(self, df, workers=None, group_col=None, columns=None, warm_modules=("utlis.pipeline",)):
+        self.shared = df if isinstance(df, SharedFrame) else SharedFrame.publish(df, group_col, columns)
+        self._owns_frame = not isinstance(df, SharedFrame)
+        self.workers = workers or os.cpu_count() or 2
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                         initargs=(self.shared.spec, tuple(warm_modules)))
+
+    def submit(self, func, *args, rows=None, columns=None, **kwargs):
+        start, stop = rows if rows is not None else (0, len(self.shared))
+        return self._pool.submit(_run_on_rows, func, start, stop, columns, args, kwargs)
+
+    def submit_raw(self, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) in a worker; func reads the data via worker_frame()
+        """
+        return self._pool.submit(func, *args, **kwargs)
+
+    def map_groups(self, func, *args, columns=None, chunksize=None, **kwargs):
+        """
+        func over every group's rows; returns {group: result} in group order.
+        Groups are sent in chunks so per-task overhead is paid once per chunk
+        """
+        n_groups = len(self.shared.groups)
+        chunksize = chunksize or max(1, -(-n_groups // (self.workers * 4)))
+        futures = [self._pool.submit(_run_on_groups, func, first, min(first + chunksize, n_groups),
+                                     columns, args, kwargs)
+                   for first in range(0, n_groups, chunksize)]
+        results = [result for future in futures for result in future.result()]
+        return dict(zip(self.shared.groups, results))
+
+    def close(self):
+        self._pool.shutdown()
+        if self._owns_frame:
+            self.shared.close()
+            self.shared.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def analyze_ledger(df):
+    """
+    Metrics, trend and data-quality checks for one canonical ledger view
+    (the per-company unit of work for SharedFramePool.map_groups)
+    """
+    from utlis.data_validation import check_outliers
+    from utlis.forecasting import analyze_trends
+    from utlis.metrics import calculate_metrics
+
+    return {
+        "metrics": calculate_metrics(df),
+        "trends": analyze_trends(df),
+        "outliers": check_outliers(df),
+    }
@@ -0,0 +1,269 @@
+"""
+Similar Company Lookup Module
+k-nearest-neighbour search over normalized metric vectors using a KD-tree
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import warnings
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+SIMILARITY_FEATURES = ["Profit Margin", "Expense Ratio", "Growth %", "Working Capital", "Cash Conversion Cycle"]
+
+# Heavy-tailed features are log-compressed before scaling
+_LOG_FEATURES = {"Working Capital"}
+
+# Seconds between writes of the index (pending changes are also written at exit)
+SAVE_INTERVAL = 30
+
+
+def feature_vector(metrics, wc_analysis=None):
+    """
+    Builds the raw feature vector from calculate_metrics output and an
+    analyze_working_capital result
+    """
+    values = dict(metrics)
+    if wc_analysis is not None:
+        values["Cash Conversion Cycle"] = wc_analysis.get("cash_conversion_cycle", np.nan)
+    return np.array([float(values.get(f, np.nan)) for f in SIMILARITY_FEATURES])
+
+
+def _transform(matrix):
+    matrix = np.array(matrix, dtype=float, ndmin=2)
+    for i, feature in enumerate(SIMILARITY_FEATURES):
+        if feature in _LOG_FEATURES:
+            matrix[:, i] = np.sign(matrix[:, i]) * np.log1p(np.abs(matrix[:, i]))
+    return matrix
+
+
+class SimilarityIndex:
+    """
+    KD-tree over robust-scaled feature vectors.
+
+    Companies are appended to a pending buffer and folded into the tree in
+    batches (`rebuild_every`); queries search the tree plus a brute-force scan
+    of the small pending buffer, so new companies are visible immediately
+    without rebuilding the tree on every insert. Vectors live in a
+    capacity-doubling array, so an insert does not copy the ones before it.
+    Missing features are imputed at the median, where they count as neutral.
+    """
+
+    def __init__(self, rebuild_every=1000):
+        self.rebuild_every = rebuild_every
+        self.ids = []
+        self.labels = []
+        self._buffer = np.empty((0, len(SIMILARITY_FEATURES)))
+        self._center = np.zeros(len(SIMILARITY_FEATURES))
+        self._scale = np.ones(len(SIMILARITY_FEATURES))
+        self._tree = None
+        self._built = 0
+        self._id_set = set()
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, company_id):
+        return company_id in self._id_set
+
+    @property
+    def _raw(self):
+        return self._buffer[:len(self.ids)]
+
+    def _append_rows(self, rows):
+        n = len(self.ids)
+        if n + len(rows) > len(self._buffer):
+            grown = np.empty((max(n + len(rows), 2 * len(self._buffer), 64), self._buffer.shape[1]))
+            grown[:n] = self._buffer[:n]
+            self._buffer = grown
+        self._buffer[n:n + len(rows)] = rows
+
+    def add(self, company_ids, matrix, labels=None):
+        """
+        Adds companies (one row per id). Existing ids are skipped. Returns number added
+        """
+        matrix = _transform(matrix)
+        labels = labels or [{} for _ in company_ids]
+        with self._lock:
+            keep = [i for i, cid in enumerate(company_ids) if cid not in self._id_set]
+            if not keep:
+                return 0
+            self._append_rows(matrix[keep])
+            for i in keep:
+                self.ids.append(company_ids[i])
+                self.labels.append(labels[i])
+                self._id_set.add(company_ids[i])
+            self._dirty = True
+            if self._tree is None or len(self.ids) - self._built >= self.rebuild_every:
+                self.build()
+        return len(keep)
+
+    def build(self):
+        """
+        Refits the scaling on all companies and rebuilds the tree in one batch
+        """
+        with self._lock:
+            raw = self._raw
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)   # a feature nobody reported
+                self._center = np.nan_to_num(np.nanmedian(raw, axis=0), nan=0.0)
+                q75, q25 = np.nanpercentile(raw, [75, 25], axis=0)
+            scale = q75 - q25
+            self._scale = np.where(scale > 0, scale, 1.0)
+            self._tree = cKDTree(self._scaled(raw), balanced_tree=False, compact_nodes=False)
+            self._built = len(self.ids)
+
+    def _scaled(self, raw):
+        # A missing feature lands on the center (0 after scaling)
+        return np.nan_to_num((raw - self._center) / self._scale, nan=0.0)
+
+    def query(self, metrics_vector, k=5, exclude_id=None):
+        """
+        Returns the k most similar companies as [{"company_id", "distance", **labels}]
+        """
+        with self._lock:
+            if not self.ids:
+                return []
+            point = self._scaled(_transform(metrics_vector))[0]
+            want = k + (1 if exclude_id is not None else 0)
+
+            candidates = []
+            if self._tree is not None and self._built:
+                distances, indexes = self._tree.query(point, k=min(want, self._built))
+                candidates.extend(zip(np.atleast_1d(distances), np.atleast_1d(indexes)))
+
+            if len(self.ids) > self._built:
+                pending = self._scaled(self._raw[self._built:])
+                pending_distances = np.sqrt(((pending - point) ** 2).sum(axis=1))
+                candidates.extend(zip(pending_distances, range(self._built, len(self.ids))))
+
+            candidates.sort(key=lambda c: c[0])
+            results = []
+            for distance, index in candidates:
+                company_id = self.ids[int(index)]
+                if company_id == exclude_id:
+                    continue
+                results.append({"company_id": company_id, "distance": float(distance), **self.labels[int(index)]})
+                if len(results) == k:
+                    break
+            return results
+
+    @staticmethod
+    def _labels_path(path):
+        return f"{os.path.splitext(path)[0]}.labels.json"
+
+    def save(self, path):
+        """
+        Writes the vectors and scaling to `path` (.npz) and the ids and labels
+        to a JSON sidecar; the tree is rebuilt from the vectors on load
+        """
+        with self._lock:
+            meta = {"ids": self.ids, "labels": self.labels}
+            arrays = {
+                "raw": self._raw, "center": self._center, "scale": self._scale,
+                "built": np.int64(self._built), "rebuild_every": np.int64(self.rebuild_every),
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+
+            # Sidecar first: rows are append-only, so a crash between the two
+            # writes leaves a prefix that load() can line up again
+            labels_path = self._labels_path(path)
+            with open(f"{labels_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, default=_json_value)
+            os.replace(f"{labels_path}.tmp", labels_path)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+
+    def save_if_due(self, path, interval=SAVE_INTERVAL):
+        """
+        Saves unsaved changes at most once per `interval` seconds. Returns True if it wrote
+        """
+        if self._dirty and time.monotonic() - self._saved_at >= interval:
+            self.save(path)
+            return True
+        return False
+
+    def flush(self, path):
+        """
+        Saves any unsaved changes now (registered at exit for the process-wide index)
+        """
+        if self._dirty:
+            self.save(path)
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        labels_path = cls._labels_path(path)
+        if not (os.path.exists(path) and os.path.exists(labels_path)):
+            return index
+        with np.load(path, allow_pickle=False) as data:
+            raw = data["raw"]
+            center, scale = data["center"], data["scale"]
+            built, rebuild_every = int(data["built"]), int(data["rebuild_every"])
+        with open(labels_path, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        n = min(len(raw), len(meta["ids"]))
+        index.rebuild_every = rebuild_every
+        index.ids = meta["ids"][:n]
+        index.labels = meta["labels"][:n]
+        index._buffer = raw[:n]
+        index._id_set = set(index.ids)
+        index._center = center
+        index._scale = scale
+        index._built = min(built, n)
+        if index._built:
+            index._tree = cKDTree(index._scaled(index._raw[:index._built]), balanced_tree=False, compact_nodes=False)
+        return index
+
+
+def _json_value(value):
+    # numpy scalars in labels (e.g. a health score) are written as plain numbers
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store {type(value).__name__} in a similarity label")
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def _index_path():
+    return os.getenv("SIMILARITY_INDEX_PATH", "similarity_index.npz")
+
+
+def get_similarity_index():
+    """
+    Process-wide index, loaded from SIMILARITY_INDEX_PATH (default similarity_index.npz,
+    labels in similarity_index.labels.json) and written back at exit if it has unsaved changes
+    """
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            path = _index_path()
+            _default_index = SimilarityIndex.load(path)
+            atexit.register(_default_index.flush, path)
+        return _default_index
+
+
+def find_similar_companies(metrics, wc_analysis, k=5, company_id=None, label=None):
+    """
+    Returns the k most similar previously assessed companies. When company_id
+    is given the company is also added to the index (once); the index is
+    persisted at most every SAVE_INTERVAL seconds
+    """
+    index = get_similarity_index()
+    vector = feature_vector(metrics, wc_analysis)
+    if company_id is not None and company_id not in index:
+        index.add([company_id], vector, [label or {}])
+        index.save_if_due(_index_path())
+    return index.query(vector, k=k, exclude_id=company_id)
@@ -3,6 +3,11 @@ Tax Compliance Checker Module
 Validates financial data against tax regulations and compliance requirements
 """
 
+from utlis.instrumentation import instrument
+from utlis.localization import get_bundle
+
+
+@instrument("tax_compliance.check_tax_compliance")
 def check_tax_compliance(metrics, revenue, expenses, industry):
     """
     Checks tax compliance based on financial metrics
@@ -67,6 +72,7 @@ def check_tax_compliance(metrics, revenue, expenses, industry):
     return compliance_report
 
 
+@instrument("tax_compliance.get_tax_deductions")
 def get_tax_deductions(industry, revenue, expenses):
     """
     Identifies available tax deductions based on industry and business structure
@@ -107,33 +113,6 @@ def get_tax_deductions(industry, revenue, expenses):
 
 def compliance_recommendations_by_language(lang="English"):
     """
-    Returns compliance recommendations in specified language
+    Returns compliance recommendations in specified language (read-only view of the cached message bundle)
     """
-    recommendations = {
-        "English": {
-            "maintain_records": "Maintain proper financial records and GST invoices for 6 years",
-            "file_returns": "File income tax returns and GST returns on time",
-            "audit": "Conduct statutory audit if required by law",
-            "bank_reconciliation": "Perform monthly bank reconciliation",
-            "invoice_audit": "Keep duplicate copies of all invoices issued",
-            "payroll": "Maintain accurate payroll records and file employee tax returns"
-        },
-        "Hindi": {
-            "maintain_records": "6 साल के लिए उचित वित्तीय रिकॉर्ड और GST इनवॉइस रखें",
-            "file_returns": "समय पर आयकर रिटर्न और GST रिटर्न दाखिल करें",
-            "audit": "कानून द्वारा आवश्यक होने पर वैधानिक लेखा परीक्षा करें",
-            "bank_reconciliation": "मासिक बैंक समन्वय करें",
-            "invoice_audit": "जारी किए गए सभी इनवॉइस की डुप्लिकेट प्रतियां रखें",
-            "payroll": "सटीक पेरोल रिकॉर्ड रखें और कर्मचारी कर रिटर्न दाखिल करें"
-        },
-        "Tamil": {
-            "maintain_records": "6 ஆண்டுகளுக்கு சரியான நிதிய பதிவுகள் மற்றும் GST இன்வॉய்சுகளை வைத்திருங்கள்",
-            "file_returns": "சரியான நேரத்தில் வருமான வரி வருமானம் மற்றும் GST வருமானம் தாக்கல் செய்யவும்",
-            "audit": "சட்டத்தால் தேவைப்பட்டால் சட்டசபை தணிக்கை நடத்தவும்",
-            "bank_reconciliation": "மாதாந்திர வங்கி சமநிலை செய்யவும்",
-            "invoice_audit": "வெளியிடப்பட்ட அனைத்து ஏலாய்டுகளின் நகல் நகלைக் வைத்திருங்கள்",
-            "payroll": "துல்லிய ஊதிய பதிவுகளைப் பராமரிக்கவும் மற்றும் ஊழியர் வரி வருமானம் தாக்கல் செய்யவும்"
-        }
-    }
-    
-    return recommendations.get(lang, recommendations["English"])
+    return get_bundle(lang).section("tax_recommendations")
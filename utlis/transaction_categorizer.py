@@ -0,0 +1,303 @@
+"""
+Transaction Categorizer Module
+Classifies ledger / bank transaction descriptions into expense categories with a
+compiled Aho-Corasick keyword automaton and a per-merchant memo cache
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+
+DEFAULT_CATEGORY = "Miscellaneous"
+
+# Keywords per expense category (English, Hindi, Tamil). Matched on whole words
+# of the normalized description; longer matches outweigh shorter ones
+CATEGORY_KEYWORDS = {
+    "Personnel & Salaries": [
+        "salary", "salaries", "sal", "payroll", "wages", "wage", "bonus", "incentive", "stipend",
+        "pf", "epf", "esic", "esi", "gratuity", "staff", "employee", "contractor payment", "labour", "labor",
+        "वेतन", "मजदूरी", "சம்பளம்", "ஊதியம்",
+    ],
+    "Raw Materials/Inventory": [
+        "raw material", "raw materials", "materials", "inventory", "stock purchase", "purchase",
+        "purchases", "supplier", "wholesale", "traders", "trading co", "enterprises", "packaging",
+        "steel", "cement", "fabric", "yarn", "seeds", "fertilizer", "fertiliser", "chemicals",
+        "कच्चा माल", "खरीद", "மூலப்பொருள்", "கொள்முதல்",
+    ],
+    "Rent & Utilities": [
+        "rent", "lease", "electricity", "power bill", "bescom", "tneb", "msedcl", "tata power",
+        "adani electricity", "water bill", "water charges", "gas bill", "internet", "broadband",
+        "airtel", "jio", "vodafone", "bsnl", "telephone", "mobile bill", "maintenance charges",
+        "किराया", "बिजली", "வாடகை", "மின்சாரம்",
+    ],
+    "Logistics & Transportation": [
+        "freight", "courier", "shipping", "shipment", "transport", "transporter", "logistics",
+        "delhivery", "blue dart", "bluedart", "dtdc", "ecom express", "shiprocket", "fuel", "petrol",
+        "diesel", "hpcl", "bpcl", "iocl", "indian oil", "fastag", "toll", "cartage", "porter",
+        "भाड़ा", "परिवहन", "போக்குவரத்து", "சரக்கு கட்டணம்",
+    ],
+    "Marketing & Advertising": [
+        "marketing", "advertising", "advertisement", "ads", "google ads", "facebook", "facebk",
+        "meta", "instagram", "promotion", "promo", "branding", "printing", "flex", "banner",
+        "pamphlet", "sponsorship", "influencer", "justdial", "indiamart",
+        "विज्ञापन", "प्रचार", "விளம்பரம்",
+    ],
+    "Maintenance & Repairs": [
+        "repair", "repairs", "maintenance", "service charge", "servicing", "spare parts", "spares",
+        "amc", "plumber", "electrician", "hardware", "tools", "overhaul",
+        "मरम्मत", "பழுது", "பராமரிப்பு",
+    ],
+}
+
+# Bank-statement flows that are not operating revenue (credits) or operating
+# expense (debits): borrowing and repayment, own-account transfers, refunds,
+# investments. Matched like CATEGORY_KEYWORDS
+NON_OPERATING_KEYWORDS = {
+    "credit": [
+        "loan", "loan disbursal", "disbursal", "disbursement", "overdraft", "od limit", "cc limit",
+        "capital introduced", "capital infusion", "own account", "self", "self transfer", "transfer from",
+        "refund", "reversal", "reversed", "cashback", "interest", "fd", "fixed deposit", "maturity",
+        "redemption", "dividend", "tax refund", "gst refund", "it refund",
+        "ऋण", "कर्ज", "वापसी", "கடன்", "திருப்பி",
+    ],
+    "debit": [
+        "emi", "loan repayment", "loan emi", "principal", "own account", "self", "self transfer",
+        "transfer to", "fd", "fixed deposit", "investment", "mutual fund", "sip", "drawings",
+        "ऋण", "किस्त", "கடன்", "தவணை",
+    ],
+}
+
+# Anything that is not a letter or a combining mark (Indic vowel signs), so
+# reference numbers and punctuation drop out. RE2 syntax (evaluated by Arrow)
+_NON_LETTER = r"[^\pL\pM]+"
+
+
+def normalize_descriptions(descriptions):
+    """
+    Reduces descriptions to merchant keys: lowercased, reference numbers and
+    punctuation stripped, whitespace collapsed.
+    Returns (codes, keys): the unique keys, and each row's position in keys (-1 for missing)
+    """
+    codes, uniques = pd.factorize(pd.Series(descriptions, dtype="string[pyarrow]"), use_na_sentinel=True)
+    # Arrow-backed string kernels keep the normalization out of the Python loop
+    normalized = (
+        pd.Series(uniques, dtype="string[pyarrow]")
+        .str.lower()
+        .str.replace(_NON_LETTER, " ", regex=True)
+        .str.strip()
+        .str.replace(r"\s+", " ", regex=True)
+    )
+    # Many raw descriptions (differing only in reference numbers) share one merchant key
+    key_codes, keys = pd.factorize(normalized, use_na_sentinel=True)
+    key_codes = np.append(key_codes, -1)
+    return key_codes[codes], np.asarray(keys, dtype=object)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over whole-word keywords.
+
+    Built once from {label: [keywords]}; one pass over a description finds every
+    keyword occurrence regardless of how many keywords there are
+    """
+
+    def __init__(self, keywords):
+        self.labels = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for label_index, label in enumerate(self.labels):
+            for keyword in keywords[label]:
+                self._add(" " + keyword.casefold() + " ", label_index)
+        self._link()
+
+    def _add(self, word, label_index):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        # Weight by keyword length (minus the two boundary spaces)
+        self._output[state].append((label_index, len(word) - 2))
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scores(self, text):
+        """
+        Summed keyword weight per label for one normalized description
+        """
+        totals = [0] * len(self.labels)
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for char in " " + text + " ":
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for label_index, weight in output[state]:
+                totals[label_index] += weight
+        return totals
+
+    def classify(self, text, default=None):
+        totals = self.scores(text)
+        best = max(range(len(totals)), key=totals.__getitem__) if totals else None
+        return self.labels[best] if best is not None and totals[best] > 0 else default
+
+
+class TransactionCategorizer:
+    """
+    Vectorized categorizer: descriptions are reduced to unique merchant keys,
+    keys already seen are answered from the memo, and only new keys run
+    through the automaton
+    """
+
+    def __init__(self, keywords=None, default=DEFAULT_CATEGORY, max_memo=500_000):
+        self.matcher = KeywordMatcher(keywords or CATEGORY_KEYWORDS)
+        self.default = default
+        self.categories = self.matcher.labels + [default]
+        self.max_memo = max_memo
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, keys):
+        with self._lock:
+            missing = [key for key in keys if key not in self._memo]
+            if len(self._memo) + len(missing) > self.max_memo:
+                self._memo.clear()
+                missing = list(keys)
+            for key in missing:
+                self._memo[key] = self.matcher.classify(key, self.default)
+            return [self._memo[key] for key in keys]
+
+    @instrument("transaction_categorizer.classify")
+    def classify(self, descriptions):
+        """
+        Category for every description, as a pandas Categorical aligned with the input
+        """
+        codes, keys = normalize_descriptions(descriptions)
+        category_codes = pd.Index(self.categories).get_indexer(self._lookup(keys))
+        # Missing descriptions have code -1, which picks the trailing default
+        category_codes = np.append(category_codes, self.categories.index(self.default))
+        return pd.Categorical.from_codes(category_codes[codes], categories=self.categories)
+
+    @instrument("transaction_categorizer.breakdown")
+    def breakdown(self, descriptions, amounts):
+        """
+        Returns {category: {"percentage", "amount", "transactions"}} in category order
+        """
+        categories = self.classify(descriptions)
+        amounts = np.abs(np.nan_to_num(np.asarray(amounts, dtype=float)))
+        sums = np.bincount(categories.codes, weights=amounts, minlength=len(self.categories))
+        counts = np.bincount(categories.codes, minlength=len(self.categories))
+        total = sums.sum()
+        return {
+            category: {
+                "percentage": round(float(sums[i] / total * 100), 1) if total > 0 else 0.0,
+                "amount": float(sums[i]),
+                "transactions": int(counts[i]),
+            }
+            for i, category in enumerate(self.categories)
+        }
+
+    def memo_size(self):
+        return len(self._memo)
+
+
+class FlowClassifier:
+    """
+    Flags bank-statement credits / debits that are not operating revenue or
+    expense, with one keyword automaton per direction and a per-merchant memo
+    """
+
+    def __init__(self, keywords=None, max_memo=500_000):
+        keywords = keywords or NON_OPERATING_KEYWORDS
+        self.matchers = {direction: KeywordMatcher({"non_operating": words})
+                         for direction, words in keywords.items()}
+        self.max_memo = max_memo
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    @instrument("transaction_categorizer.non_operating")
+    def non_operating(self, descriptions, direction):
+        """
+        Boolean array: True where a description marks a non-operating flow
+        """
+        codes, keys = normalize_descriptions(descriptions)
+        matcher = self.matchers[direction]
+        with self._lock:
+            if len(self._memo) + len(keys) > self.max_memo:
+                self._memo.clear()
+            flags = []
+            for key in keys:
+                flag = self._memo.get((direction, key))
+                if flag is None:
+                    flag = self._memo[(direction, key)] = matcher.classify(key) is not None
+                flags.append(flag)
+        # Rows without a description (code -1) count as operating
+        return np.append(np.asarray(flags, dtype=bool), False)[codes]
+
+
+def derive_flows(df, flow_columns):
+    """
+    Adds each missing target column of `flow_columns` ({"Revenue": "Credit", ...})
+    from its bank-statement source, leaving out non-operating flows when the
+    ledger has descriptions. Returns df unchanged when there is nothing to derive
+    """
+    derived = {}
+    for target, source in flow_columns.items():
+        if target in df.columns or source not in df.columns:
+            continue
+        amounts = df[source].fillna(0.0)
+        if "Description" in df.columns:
+            excluded = get_flow_classifier().non_operating(df["Description"], source.lower())
+            amounts = amounts.where(~excluded, 0.0)
+        derived[target] = amounts
+    return df.assign(**derived) if derived else df
+
+
+_default_categorizer = None
+_default_categorizer_lock = threading.Lock()
+
+
+def get_transaction_categorizer():
+    """
+    Process-wide categorizer, so the merchant memo is shared across uploads and bank syncs
+    """
+    global _default_categorizer
+    with _default_categorizer_lock:
+        if _default_categorizer is None:
+            _default_categorizer = TransactionCategorizer()
+        return _default_categorizer
+
+
+_default_flow_classifier = None
+
+
+def get_flow_classifier():
+    """
+    Process-wide FlowClassifier, sharing its memo across uploads
+    """
+    global _default_flow_classifier
+    with _default_categorizer_lock:
+        if _default_flow_classifier is None:
+            _default_flow_classifier = FlowClassifier()
+        return _default_flow_classifier
@@ -0,0 +1,174 @@
+"""
+What-If Analysis Module
+Vectorized sensitivity of the health score, credit rating and loan eligibility
+to changes in the scoring metrics
+"""
+
+import numpy as np
+
+from utlis.instrumentation import instrument
+from utlis.scoring import health_score_components
+from utlis.creditworthiness import LOAN_ELIGIBILITY_THRESHOLDS, credit_rating_array
+
+# Metrics that feed health_score, in health_score_components order
+WHAT_IF_METRICS = ["Profit Margin", "Expense Ratio", "Growth %", "Working Capital"]
+
+# Default slider range (percent) per continuous metric
+SLIDER_RANGES = {"Profit Margin": (-50.0, 60.0), "Expense Ratio": (0.0, 150.0), "Growth %": (-50.0, 100.0)}
+
+
+def slider_bounds(metric, value, step=0.5):
+    """
+    (min, max, default) for a metric's slider. The default range is widened
+    to take in the company's own value, which Streamlit requires to be in bounds
+    """
+    lo, hi = SLIDER_RANGES[metric]
+    value = float(value)
+    default = round(value, 1) if np.isfinite(value) else min(max(0.0, lo), hi)
+    lo = min(lo, float(np.floor(default / step) * step))
+    hi = max(hi, float(np.ceil(default / step) * step))
+    return lo, hi, default
+
+
+def _outputs(score):
+    return {
+        "score": score,
+        "rating": credit_rating_array(score),
+        "eligible": {product: score > threshold for product, threshold in LOAN_ELIGIBILITY_THRESHOLDS.items()},
+    }
+
+
+@instrument("what_if.evaluate_grid")
+def evaluate_grid(base_metrics, perturbations):
+    """
+    Evaluates every combination of metric perturbations in one broadcast.
+
+    `perturbations` maps metric -> 1-D array of additive deltas; each metric
+    becomes one grid axis, in the given order. Metrics not perturbed stay at
+    their base value. Returns {"axes", "deltas", "score", "rating", "eligible"}
+    where score/rating and every eligible[product] have one dimension per axis
+    """
+    unknown = set(perturbations) - set(WHAT_IF_METRICS)
+    if unknown:
+        raise ValueError(f"Cannot perturb {sorted(unknown)}; choose from {WHAT_IF_METRICS}")
+
+    axes = list(perturbations)
+    ndim = len(axes)
+    values = []
+    for metric in WHAT_IF_METRICS:
+        base = float(base_metrics.get(metric, 0))
+        if metric in perturbations:
+            shape = [1] * ndim
+            shape[axes.index(metric)] = -1
+            values.append(base + np.asarray(perturbations[metric], dtype=float).reshape(shape))
+        else:
+            values.append(np.full([1] * ndim, base))
+
+    total = sum(health_score_components(*values))
+    grid_shape = tuple(len(perturbations[metric]) for metric in axes)
+    score = np.broadcast_to(np.minimum(total, 100).astype(int), grid_shape)
+
+    return {"axes": axes, "deltas": {m: np.asarray(perturbations[m]) for m in axes}, **_outputs(score)}
+
+
+def tornado(base_metrics, ranges):
+    """
+    One-at-a-time sensitivity: score at the low and high delta of each metric.
+    `ranges` maps metric -> (low_delta, high_delta). Returns rows sorted by swing, widest first
+    """
+    base_score = int(evaluate_grid(base_metrics, {})["score"])
+    rows = []
+    for metric, (low, high) in ranges.items():
+        low_score, high_score = evaluate_grid(base_metrics, {metric: [low, high]})["score"].tolist()
+        rows.append({
+            "metric": metric,
+            "low_delta": low,
+            "high_delta": high,
+            "low_score": low_score,
+            "high_score": high_score,
+            "swing": abs(high_score - low_score),
+        })
+    rows.sort(key=lambda row: row["swing"], reverse=True)
+    return {"base_score": base_score, "rows": rows}
+
+
+def heatmap(base_metrics, metric_x, deltas_x, metric_y, deltas_y):
+    """
+    Score surface over two metrics, as {"x", "y", "z"} ready for a plotly heatmap
+    (z has shape (len(deltas_y), len(deltas_x)))
+    """
+    grid = evaluate_grid(base_metrics, {metric_y: deltas_y, metric_x: deltas_x})
+    base_x = float(base_metrics.get(metric_x, 0))
+    base_y = float(base_metrics.get(metric_y, 0))
+    return {
+        "x": (base_x + np.asarray(deltas_x, dtype=float)).tolist(),
+        "y": (base_y + np.asarray(deltas_y, dtype=float)).tolist(),
+        "z": grid["score"].tolist(),
+        "rating": grid["rating"].tolist(),
+        "x_title": metric_x,
+        "y_title": metric_y,
+    }
+
+
+class WhatIfSession:
+    """
+    Incremental what-if state for interactive sliders.
+
+    Each metric feeds exactly one health score component, so moving a slider
+    recomputes only that component; rating and eligibility are recomputed only
+    when the resulting score actually changes
+    """
+
+    def __init__(self, base_metrics):
+        self.base = {metric: float(base_metrics.get(metric, 0)) for metric in WHAT_IF_METRICS}
+        self.values = dict(self.base)
+        self._components = [float(c) for c in health_score_components(*(self.base[m] for m in WHAT_IF_METRICS))]
+        self.base_score = int(min(sum(self._components), 100))
+        self.score = None
+        self.rating = None
+        self.eligible = None
+        self._refresh()
+
+    def _refresh(self):
+        score = int(min(sum(self._components), 100))
+        if score != self.score:
+            self.score = score
+            self.rating = str(credit_rating_array(score))
+            self.eligible = {product: score > threshold for product, threshold in LOAN_ELIGIBILITY_THRESHOLDS.items()}
+            return True
+        return False
+
+    def set(self, metric, value):
+        """
+        Moves one metric to an absolute value. Returns True if the score changed
+        """
+        value = float(value)
+        if self.values[metric] == value:
+            return False
+        self.values[metric] = value
+        position = WHAT_IF_METRICS.index(metric)
+        args = [np.nan] * len(WHAT_IF_METRICS)
+        args[position] = value
+        self._components[position] = float(health_score_components(*args)[position])
+        return self._refresh()
+
+    def update(self, values):
+        """
+        Applies several slider values at once. Returns True if the score changed
+        """
+        changed = False
+        for metric, value in values.items():
+            changed = self.set(metric, value) or changed
+        return changed
+
+    def reset(self):
+        return self.update(self.base)
+
+    def result(self):
+        return {
+            "values": dict(self.values),
+            "score": self.score,
+            "score_change": self.score - self.base_score,
+            "rating": self.rating,
+            "eligible": dict(self.eligible),
+        }
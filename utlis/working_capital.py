@@ -3,29 +3,46 @@ Working Capital Optimizer Module
 Analyzes and optimizes working capital management
 """
 
+import numpy as np
+import pandas as pd
+
+from utlis.instrumentation import instrument
+
+# Share of expenses treated as cost of goods sold for inventory days
+COGS_SHARE = 0.6
+
+# Trailing window per frequency: 90 days of daily data, or 3 months
+DEFAULT_WINDOWS = {"D": 90, "MS": 3}
+
+# Days assumed when a ledger has no balance column, or no flow to turn it over
+DEFAULT_DAYS = {"Receivable": 30, "Payable": 45, "Inventory": 60}
+
+
+@instrument("working_capital.analyze_working_capital")
 def analyze_working_capital(df, revenue, expenses):
     """
     Analyzes working capital efficiency and provides optimization strategies
+    Expects a canonical frame (see utlis.schema.normalize_ledger)
     """
     
     # Calculate average receivables days (simplified)
-    avg_receivables_days = 30  # Default assumption
-    if "Receivables" in df.columns:
-        avg_receivables = df["Receivables"].mean() if len(df) > 0 else 0
-        avg_receivables_days = (avg_receivables / (revenue / 365)) if revenue > 0 else 30
+    avg_receivables_days = DEFAULT_DAYS["Receivable"]
+    if "Receivable" in df.columns and revenue > 0:
+        avg_receivables = df["Receivable"].mean() if len(df) > 0 else 0
+        avg_receivables_days = avg_receivables / (revenue / 365)
     
     # Calculate average payables days
-    avg_payables_days = 45  # Default assumption
-    if "Payables" in df.columns:
-        avg_payables = df["Payables"].mean() if len(df) > 0 else 0
-        avg_payables_days = (avg_payables / (expenses / 365)) if expenses > 0 else 45
+    avg_payables_days = DEFAULT_DAYS["Payable"]
+    if "Payable" in df.columns and expenses > 0:
+        avg_payables = df["Payable"].mean() if len(df) > 0 else 0
+        avg_payables_days = avg_payables / (expenses / 365)
     
     # Calculate inventory days
-    inventory_days = 60  # Default assumption
-    if "Inventory" in df.columns:
+    inventory_days = DEFAULT_DAYS["Inventory"]
+    cogs = expenses * COGS_SHARE
+    if "Inventory" in df.columns and cogs > 0:
         avg_inventory = df["Inventory"].mean() if len(df) > 0 else 0
-        cogs = expenses * 0.6
-        inventory_days = (avg_inventory / (cogs / 365)) if cogs > 0 else 60
+        inventory_days = avg_inventory / (cogs / 365)
     
     # Calculate Cash Conversion Cycle
     cash_conversion_cycle = avg_receivables_days + inventory_days - avg_payables_days
@@ -72,6 +89,85 @@ def analyze_working_capital(df, revenue, expenses):
     return analysis
 
 
+@instrument("working_capital.working_capital_timeseries")
+def working_capital_timeseries(df, freq="MS", window=None, company_col="company_id", date_col="Date"):
+    """
+    Rolling receivable, payable and inventory days and cash conversion cycle
+    per period (freq="MS" monthly or "D" daily) for one or many companies.
+
+    Each period looks back over a trailing `window` of periods: days =
+    average balance / flow over the window * calendar days in the window.
+    Balances carry forward over periods without a new balance. A missing
+    balance column, or a window with no flow, takes the same DEFAULT_DAYS as
+    analyze_working_capital.
+    Returns a long frame [company_col, Date, receivables_days, payables_days,
+    inventory_days, cash_conversion_cycle]
+    """
+    window = window or DEFAULT_WINDOWS.get(freq, 3)
+    data = df if company_col in df.columns else df.assign(**{company_col: 0})
+    data = data.assign(**{date_col: pd.to_datetime(data[date_col])}).dropna(subset=[date_col])
+
+    flow_cols = [c for c in ("Revenue", "Expense") if c in data.columns]
+    balance_cols = [c for c in ("Receivable", "Payable", "Inventory") if c in data.columns]
+
+    # One pass over the ledger: flows summed and balances taken at period end,
+    # then pivoted to (periods x companies) so every window op covers all companies at once
+    grouped = data.groupby([pd.Grouper(key=date_col, freq=freq), company_col], sort=True)
+    flows = grouped[flow_cols].sum(min_count=1).unstack(company_col)
+    balances = grouped[balance_cols].last().unstack(company_col) if balance_cols else None
+
+    index = pd.date_range(flows.index.min(), flows.index.max(), freq=freq)
+    flows = flows.reindex(index)
+    revenue = flows["Revenue"]
+    companies = revenue.columns
+
+    # Periods outside a company's own first..last date stay NaN
+    seen = flows.notna().T.groupby(level=company_col).any().T
+    active = seen.cumsum().gt(0) & seen.iloc[::-1].cumsum().iloc[::-1].gt(0)
+
+    def flow(column):
+        return flows[column].fillna(0).where(active) if column in flow_cols else None
+
+    def balance(column):
+        if column not in balance_cols:
+            return None
+        return balances[column].reindex(index=index, columns=companies).ffill().where(active)
+
+    # Calendar days covered by each trailing window, counting only the company's active periods
+    days = pd.Series(index.days_in_month if freq == "MS" else 1, index=index, dtype=float)
+    window_days = active.mul(days, axis=0).rolling(window, min_periods=1).sum()
+
+    def turnover_days(balance_wide, flow_wide, default):
+        if balance_wide is None or flow_wide is None:
+            return pd.DataFrame(float(default), index=index, columns=companies).where(active)
+        avg_balance = balance_wide.rolling(window, min_periods=1).mean()
+        per_day = flow_wide.rolling(window, min_periods=1).sum() / window_days
+        return (avg_balance / per_day.where(per_day > 0)).mask(per_day <= 0, float(default)).where(active)
+
+    expense = flow("Expense")
+    receivable_days = turnover_days(balance("Receivable"), flow("Revenue"), DEFAULT_DAYS["Receivable"])
+    payable_days = turnover_days(balance("Payable"), expense, DEFAULT_DAYS["Payable"])
+    inventory_days = turnover_days(balance("Inventory"), expense * COGS_SHARE if expense is not None else None,
+                                   DEFAULT_DAYS["Inventory"])
+
+    frames = {
+        "receivables_days": receivable_days,
+        "payables_days": payable_days,
+        "inventory_days": inventory_days,
+        "cash_conversion_cycle": receivable_days + inventory_days - payable_days,
+    }
+    # Column-major ravel gives one contiguous block per company, in date order
+    mask = active.to_numpy().ravel(order="F")
+    result = pd.DataFrame({
+        company_col: np.repeat(companies.to_numpy(), len(index))[mask],
+        date_col: np.tile(index.to_numpy(), len(companies))[mask],
+        **{name: frame.to_numpy().ravel(order="F")[mask].round(2) for name, frame in frames.items()},
+    })
+    if company_col not in df.columns:
+        result = result.drop(columns=company_col)
+    return result
+
+
 def suggest_working_capital_products(analysis, revenue):
     """
     Recommends suitable working capital financing products